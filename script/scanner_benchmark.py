@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+#
+# This file is part of Supysonic.
+# Supysonic is a Python implementation of the Subsonic server API.
+#
+# Distributed under terms of the GNU AGPLv3 license.
+
+"""Measure scanner throughput against a generated library.
+
+Builds ``artists x albums x tracks`` tiny tagged files (FLAC, MP3 and Ogg in
+turn, one format per album) with an ``album.nfo`` and a cover per album, then
+runs the scenarios in order on the same database:
+
+* ``full``: first scan of the library
+* ``noop``: rescan with nothing changed
+* ``touch``: rescan after bumping the mtime of ``--change`` percent of the files
+* ``delete``: rescan after removing ``--change`` percent of the files
+
+Each scenario reports the audio files in the library per second of scan, the
+SQL statements the scanner issued per audio file and the peak RSS of the
+process so far. The covers and ``album.nfo`` files the scanner also goes
+through are listed apart as ``entries``, they are not part of the rates. With
+``--readers``, that many threads browse the library while the scanner runs and
+the latency of their queries is reported too, compare ``--sqlite-profile``
+values with it.
+
+The post-scan repair stage queries MusicBrainz, Last.fm and Spotify, it is left
+out unless ``--repair`` is given so that runs can be compared with each other.
+
+    python script/scanner_benchmark.py --artists 20 --albums 5 --tracks 10
+    python script/scanner_benchmark.py --readers 4 --sqlite-profile compatible
+    python script/scanner_benchmark.py --database-uri postgres://bench@localhost/bench
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import mutagen
+
+from peewee import OperationalError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supysonic import db  # noqa: E402
+from supysonic.config import DefaultConfig  # noqa: E402
+from supysonic.managers.folder import FolderManager  # noqa: E402
+from supysonic.nfo.nfo import NfoHandler  # noqa: E402
+from supysonic.scanner import Scanner  # noqa: E402
+
+ASSETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "assets")
+FORMATS = ("flac", "mp3", "ogg")
+SCENARIOS = ("full", "noop", "touch", "delete")
+FOLDER_NAME = "benchmark"
+
+
+def _tagFile(path, artist, album, title, number, year):
+    tags = mutagen.File(path, easy=True)
+    tags["artist"] = artist
+    tags["albumartist"] = artist
+    tags["album"] = album
+    tags["title"] = title
+    tags["tracknumber"] = str(number)
+    tags["discnumber"] = "1"
+    tags["date"] = str(year)
+    tags.save()
+
+
+def generateLibrary(root, artists, albums, tracks, seed=0):
+    """Write the synthetic library under ``root`` and return the paths of its tracks."""
+    rng = random.Random(seed)
+    cover = os.path.join(ASSETS, "cover.jpg")
+    formats = itertools.cycle(FORMATS)
+    paths = []
+
+    for a in range(1, artists + 1):
+        artist = f"Artist {a:04d}"
+        for b in range(1, albums + 1):
+            album = f"Album {a:04d}-{b:03d}"
+            year = rng.randint(1960, 2025)
+            ext = next(formats)
+            album_dir = os.path.join(root, artist, album)
+            os.makedirs(album_dir)
+            shutil.copyfile(cover, os.path.join(album_dir, "cover.jpg"))
+
+            nfo_tracks = []
+            for t in range(1, tracks + 1):
+                title = f"Track {t:02d} of {album}"
+                path = os.path.join(album_dir, f"{t:02d} - {title}.{ext}")
+                shutil.copyfile(os.path.join(ASSETS, "formats", f"silence.{ext}"), path)
+                _tagFile(path, artist, album, title, t, year)
+                nfo_tracks.append({"position": str(t), "cdnum": "1", "title": title})
+                paths.append(path)
+
+            NfoHandler.write(
+                {
+                    "album": {
+                        "title": album,
+                        "artist": artist,
+                        "albumartist": artist,
+                        "year": str(year),
+                        "track": nfo_tracks,
+                    }
+                },
+                os.path.join(album_dir, "album.nfo"),
+            )
+
+    return paths
+
+
+class QueryCounter:
+    """Count the statements going through ``execute_sql`` of the bound database."""
+
+    def __init__(self):
+        self.count = 0
+
+    @contextmanager
+    def counting(self):
+        database = db.db.obj
+        execute_sql = database.execute_sql
+        # Only the scanner's own statements, not those of the readers.
+        owner = threading.get_ident()
+
+        def counted(*args, **kwargs):
+            if threading.get_ident() == owner:
+                self.count += 1
+            return execute_sql(*args, **kwargs)
+
+        database.execute_sql = counted
+        try:
+            yield self
+        finally:
+            del database.execute_sql
+
+
+class ConcurrentReaders:
+    """Browse albums from ``count`` threads, each on its own connection, and time every read."""
+
+    def __init__(self, count, seed=0):
+        self.__count = count
+        self.__seed = seed
+        self.__stop = threading.Event()
+        self.__threads = []
+        self.latencies = []
+        self.errors = 0
+
+    def __enter__(self):
+        for i in range(self.__count):
+            thread = threading.Thread(target=self.__browse, args=(random.Random(self.__seed + i),))
+            thread.start()
+            self.__threads.append(thread)
+        return self
+
+    def __exit__(self, *exc):
+        self.__stop.set()
+        for thread in self.__threads:
+            thread.join()
+
+    def __browse(self, rng):
+        db.open_connection()
+        try:
+            while not self.__stop.is_set():
+                start = time.perf_counter()
+                try:
+                    page = db.Album.select(db.Album.id).order_by(db.Album.name).offset(rng.randint(0, 50))
+                    albums = list(page.limit(20))
+                    if albums:
+                        tracks = db.Track.select().where(db.Track.album == rng.choice(albums).id)
+                        list(tracks.order_by(db.Track.number))
+                except OperationalError:
+                    self.errors += 1
+                    continue
+                self.latencies.append(time.perf_counter() - start)
+                time.sleep(0.005)
+        finally:
+            db.close_connection()
+
+    def summary(self):
+        if not self.latencies:
+            return f"reads: none, {self.errors} errors"
+        latencies = sorted(self.latencies)
+        pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+        return (
+            f"reads: {len(latencies)} p50={pick(0.5):.1f}ms p95={pick(0.95):.1f}ms "
+            f"max={latencies[-1] * 1000:.1f}ms errors={self.errors}"
+        )
+
+
+def peakRss():
+    # Kilobytes on Linux, bytes on macOS.
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage * 1024 if sys.platform != "darwin" else usage
+
+
+def runScan(jobs, tracks, readers=0, seed=0):
+    scanner = Scanner(jobs=jobs)
+    scanner.queue_folder(FOLDER_NAME)
+    counter = QueryCounter()
+    browsing = ConcurrentReaders(readers, seed)
+    with counter.counting(), browsing:
+        start = time.perf_counter()
+        scanner.run()
+        elapsed = time.perf_counter() - start
+
+    stats = scanner.stats()
+    return {
+        "seconds": elapsed,
+        "tracks": tracks,
+        "entries": stats.scanned,
+        "added": stats.added.tracks,
+        "deleted": stats.deleted.tracks,
+        "queries": counter.count,
+        "errors": len(stats.errors),
+        "reads": browsing.summary() if readers else None,
+    }
+
+
+def _sample(paths, percent, rng):
+    return rng.sample(paths, max(1, len(paths) * percent // 100))
+
+
+def prepareScenario(name, paths, percent, rng):
+    if name == "touch":
+        for path in _sample(paths, percent, rng):
+            stat = os.stat(path)
+            # Whole seconds ahead, the scanner compares mtimes at that resolution.
+            os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    elif name == "delete":
+        for path in _sample(paths, percent, rng):
+            os.remove(path)
+            paths.remove(path)
+
+
+def formatReport(name, result):
+    tracks = result["tracks"]
+    return (
+        f"{name:<7} {result['seconds']:8.2f}s {tracks / result['seconds'] if result['seconds'] else 0:10.1f} tracks/s "
+        f"{result['queries'] / tracks if tracks else 0:8.2f} queries/track "
+        f"{peakRss() / 1024 / 1024:8.1f} MiB peak RSS "
+        f"(tracks={tracks} entries={result['entries']} added={result['added']} deleted={result['deleted']} "
+        f"errors={result['errors']})"
+        + (f"\n        {result['reads']}" if result["reads"] else "")
+    )
+
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scanner against a synthetic library.")
+    parser.add_argument("--artists", type=int, default=10)
+    parser.add_argument("--albums", type=int, default=5, help="Albums per artist")
+    parser.add_argument("--tracks", type=int, default=10, help="Tracks per album")
+    parser.add_argument("--change", type=int, default=1, help="Percent of the files touched or deleted")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Scanner jobs")
+    parser.add_argument(
+        "--database-uri",
+        help="Empty database to run against, a SQLite file in the work directory by default",
+    )
+    parser.add_argument(
+        "--sqlite-profile",
+        choices=["performance", "compatible"],
+        default="performance",
+        help="SQLite connection settings, see the sqlite_profile setting",
+    )
+    parser.add_argument("--readers", type=int, default=0, help="Threads browsing the library during the scans")
+    parser.add_argument("--workdir", help="Where the library is generated, kept after the run when given")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenarios to run, all by default")
+    parser.add_argument("--repair", action="store_true", help="Also run the online metadata repair stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parseArgs(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="supysonic-bench-")
+    library = os.path.join(workdir, "library")
+    DefaultConfig.BASE["tempdatafolder"] = os.path.join(workdir, "data")
+    if not args.repair:
+        Scanner.find_lost_information = lambda self, full=False: None
+
+    try:
+        start = time.perf_counter()
+        paths = generateLibrary(library, args.artists, args.albums, args.tracks, args.seed)
+        print(f"Generated {len(paths)} tracks in {time.perf_counter() - start:.2f}s under {library}")
+
+        db.init_database(
+            args.database_uri or "sqlite:///" + os.path.join(workdir, "supysonic.db"),
+            {"sqlite_profile": args.sqlite_profile},
+        )
+        try:
+            FolderManager.add(FOLDER_NAME, library)
+            rng = random.Random(args.seed)
+            for name in args.scenario or SCENARIOS:
+                prepareScenario(name, paths, args.change, rng)
+                print(formatReport(name, runScan(args.jobs, len(paths), args.readers, args.seed)))
+        finally:
+            db.release_database()
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
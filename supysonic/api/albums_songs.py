@@ -53,10 +53,9 @@ def rand_songs():
     return request.formatter(
         "randomSongs",
         {
-            "song": [
-                t.as_subsonic_child(request.user, request.client)
-                for t in query.order_by(random()).limit(size)
-            ]
+            "song": Track.as_subsonic_children(
+                query.order_by(random()).limit(size), request.user, request.client
+            )
         },
     )
 
@@ -150,10 +149,11 @@ def album_list_id3():
         return request.formatter(
             "albumList2",
             {
-                "album": [
-                    a.as_subsonic_album(request.user, request.client.client_name)
-                    for a in query.order_by(random()).limit(size)
-                ]
+                "album": Album.as_subsonic_albums(
+                    query.order_by(random()).limit(size),
+                    request.user,
+                    request.client.client_name,
+                )
             },
         )
     elif ltype == "newest":
@@ -177,9 +177,7 @@ def album_list_id3():
 
         for a in sorted_albums[:size]:
             if a.id not in added_albums:
-                result_albums.append(
-                    a.as_subsonic_album(request.user, request.client.client_name)
-                )
+                result_albums.append(a)
                 added_albums.add(a.id)
 
         if len(result_albums) >= size:
@@ -214,9 +212,7 @@ def album_list_id3():
             )
         for a in recent_albums:
             if a.id not in added_albums:
-                result_albums.append(
-                    a.as_subsonic_album(request.user, request.client.client_name)
-                )
+                result_albums.append(a)
                 added_albums.add(a.id)
     elif ltype == "starred":
         query = (
@@ -249,15 +245,17 @@ def album_list_id3():
     if len(result_albums) < size:
         for a in query.limit(size).offset(offset):
             if a.id not in added_albums:
-                result_albums.append(
-                    a.as_subsonic_album(request.user, request.client.client_name)
-                )
+                result_albums.append(a)
                 added_albums.add(a.id)
     else:
         result_albums = result_albums[offset:size]
     return request.formatter(
         "albumList2",
-        {"album": result_albums},
+        {
+            "album": Album.as_subsonic_albums(
+                result_albums, request.user, request.client.client_name
+            )
+        },
     )
 
 
@@ -276,10 +274,9 @@ def songs_by_genre():
     return request.formatter(
         "songsByGenre",
         {
-            "song": [
-                t.as_subsonic_child(request.user, request.client)
-                for t in query.limit(count).offset(offset)
-            ]
+            "song": Track.as_subsonic_children(
+                query.limit(count).offset(offset), request.user, request.client
+            )
         },
     )
 
@@ -325,7 +322,7 @@ def get_starred():
     arq = folders.having(fn.count(Track.id) == 0)
     alq = folders.having(fn.count(Track.id) > 0)
     trq = (
-        StarredTrack.select(StarredTrack.starred)
+        StarredTrack.select(StarredTrack.starred, Track)
         .join(Track)
         .where(StarredTrack.user == request.user)
         .order_by(-StarredTrack.date)
@@ -339,9 +336,9 @@ def get_starred():
         {
             "artist": [sf.starred.as_subsonic_artist(request.user) for sf in arq],
             "album": [sf.starred.as_subsonic_child(request.user) for sf in alq],
-            "song": [
-                st.starred.as_subsonic_child(request.user, request.client) for st in trq
-            ],
+            "song": Track.as_subsonic_children(
+                [st.starred for st in trq], request.user, request.client
+            ),
         },
     )
 
@@ -352,17 +349,17 @@ def get_starred_id3():
     root = get_root_folder(mfid)
 
     arq = (
-        StarredArtist.select(StarredArtist.starred)
+        StarredArtist.select(StarredArtist.starred, Artist)
         .join(Artist)
         .where(StarredArtist.user == request.user)
     )
     alq = (
-        StarredAlbum.select(StarredAlbum.starred)
+        StarredAlbum.select(StarredAlbum.starred, Album)
         .join(Album)
         .where(StarredAlbum.user == request.user)
     )
     trq = (
-        StarredTrack.select(StarredTrack.starred)
+        StarredTrack.select(StarredTrack.starred, Track)
         .join(Track)
         .where(StarredTrack.user == request.user)
         .order_by(-StarredTrack.date)
@@ -376,13 +373,14 @@ def get_starred_id3():
     return request.formatter(
         "starred2",
         {
-            "artist": [sa.starred.as_subsonic_artist(request.user) for sa in arq],
-            "album": [
-                sa.starred.as_subsonic_album(request.user, request.client.client_name)
-                for sa in alq
-            ],
-            "song": [
-                st.starred.as_subsonic_child(request.user, request.client) for st in trq
-            ],
+            "artist": Artist.as_subsonic_artists(
+                [sa.starred for sa in arq], request.user
+            ),
+            "album": Album.as_subsonic_albums(
+                [sa.starred for sa in alq], request.user, request.client.client_name
+            ),
+            "song": Track.as_subsonic_children(
+                [st.starred for st in trq], request.user, request.client
+            ),
         },
     )
@@ -12,7 +12,7 @@ import string
 from flask import current_app, request
 from peewee import fn
 from ..lastfm import LastFm
-from ..db import Folder, Artist, Album, Track
+from ..db import Folder, Artist, ArtistStats, Album, AlbumStats, Track, get_library_generation
 from ..TaskManger import get_task_manager, TaskManager
 from . import api_routing, get_entity, get_entity_by_id, get_entity_by_name, get_root_folder, log_api_event
 
@@ -76,6 +76,50 @@ def build_indexes(source):
     return indexes
 
 
+def build_sorted_indexes(source):
+    """``build_indexes`` as a list of ``(index, ids)``, both in display order."""
+    return [
+        (k, [item.id for item, _ in sorted(v, key=lambda t: t[1].lower())])
+        for k, v in sorted(build_indexes(source).items())
+    ]
+
+
+def cached_indexes(key, build):
+    """``build()``, cached per ignored articles setting until the library changes.
+
+    Only ids and counts are cached, the rows are loaded by each request: cover
+    art, play counts and the like change without a new library generation.
+    """
+    return current_app.index_cache.get(
+        key + (ignored_articles_str(),), get_library_generation(), build
+    )
+
+
+def load_rows(model, ids, chunk_size=500):
+    """``model`` rows of ``ids`` by id, without those deleted since."""
+    ids = list(ids)
+    rows = {}
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start : start + chunk_size]
+        query = model.select().where(model.id.in_(chunk))
+        rows.update((row.id, row) for row in query)
+    return rows
+
+
+def load_indexes(model, indexes):
+    """The ``(index, ids)`` pairs of ``build_sorted_indexes`` with the rows of the ids."""
+    rows = load_rows(model, (i for _, ids in indexes for i in ids))
+    return [(k, [rows[i] for i in ids if i in rows]) for k, ids in indexes]
+
+
+def format_indexes(indexes, serialized, tag):
+    # ``serialized`` holds the items of all the indexes, in order.
+    serialized = iter(serialized)
+    return [
+        {"name": k, tag: [next(serialized) for _ in items]} for k, items in indexes
+    ]
+
+
 @api_routing("/getIndexes")
 def list_indexes():
     musicFolderId = request.values.get("musicFolderId")
@@ -98,33 +142,33 @@ def list_indexes():
             },
         )
 
-    # The XSD lies, we don't return artists but a directory structure
-    artists = []
-    children = []
-    for f in folders:
-        artists += f.children[:]
-        children += f.tracks[:]
-
-    indexes = build_indexes(artists)
+    def build():
+        # The XSD lies, we don't return artists but a directory structure
+        artists = []
+        children = []
+        for f in folders:
+            artists += f.children[:]
+            children += f.tracks[:]
+        children = sorted(children, key=lambda t: t.sort_key())
+        return build_sorted_indexes(artists), [t.id for t in children]
+
+    indexes, children = cached_indexes(("indexes",) + tuple(sorted(f.id for f in folders)), build)
+    indexes = load_indexes(Folder, indexes)
+    tracks = load_rows(Track, children)
+    children = [tracks[i] for i in children if i in tracks]
     return request.formatter(
         "indexes",
         {
             "lastModified": last_modif * 1000,
             "ignoredArticles": ignored_articles_str(),
-            "index": [
-                {
-                    "name": k,
-                    "artist": [
-                        a.as_subsonic_artist(request.user)
-                        for a, _ in sorted(v, key=lambda t: t[1].lower())
-                    ],
-                }
-                for k, v in sorted(indexes.items())
-            ],
-            "child": [
-                c.as_subsonic_child(request.user, request.client)
-                for c in sorted(children, key=lambda t: t.sort_key())
-            ],
+            "index": format_indexes(
+                indexes,
+                Folder.as_subsonic_artists(
+                    [a for _, items in indexes for a in items], request.user
+                ),
+                "artist",
+            ),
+            "child": Track.as_subsonic_children(children, request.user, request.client),
         },
     )
 
@@ -185,10 +229,9 @@ def top_songs():
         return request.formatter(
             "topSongs",
             {
-                "song": [
-                    track.as_subsonic_child(request.user, request.client)
-                    for track in tracks
-                ]
+                "song": Track.as_subsonic_children(
+                    tracks, request.user, request.client
+                )
             },
         )
     if not lfm.get_enabled():
@@ -208,37 +251,41 @@ def top_songs():
         )
     # 获取该艺人下按播放次数排序的前 10 首歌曲
     tracks = all_tracks.order_by(Track.play_count.desc())
-    topSongs = [
-        track.as_subsonic_child(request.user, request.client) for track in tracks
-    ]
+    topSongs = Track.as_subsonic_children(tracks, request.user, request.client)
     return request.formatter("topSongs", {"song": topSongs})
 
 
 @api_routing("/getArtists")
 def list_artists():
     mfid = request.values.get("musicFolderId")
+    folder = get_root_folder(mfid) if mfid is not None else None
 
-    query = Artist.select().where(Artist.real_artist.is_null())
-    # query = Artist.select()# # 只选择主艺人
-    if mfid is not None:
-        folder = get_root_folder(mfid)
-        query = Artist.select().join(Track).where(Track.root_folder == folder)
+    def build():
+        query = Artist.select().where(Artist.real_artist.is_null())
+        if folder is not None:
+            query = (
+                Artist.select().join(Track).where(Track.root_folder == folder).distinct()
+            )
+        indexes = build_sorted_indexes(query)
+        # Album counts are library content too, they are cached along.
+        stats = ArtistStats.load(i for _, ids in indexes for i in ids)
+        return indexes, stats
 
-    indexes = build_indexes(query)
+    indexes, stats = cached_indexes(
+        ("artists", folder.id if folder is not None else None), build
+    )
+    indexes = load_indexes(Artist, indexes)
     return request.formatter(
         "artists",
         {
             "ignoredArticles": ignored_articles_str(),
-            "index": [
-                {
-                    "name": k,
-                    "artist": [
-                        a.as_subsonic_artist(request.user)
-                        for a, _ in sorted(v, key=lambda t: t[1].lower())
-                    ],
-                }
-                for k, v in sorted(indexes.items())
-            ],
+            "index": format_indexes(
+                indexes,
+                Artist.as_subsonic_artists(
+                    [a for _, items in indexes for a in items], request.user, stats
+                ),
+                "artist",
+            ),
         },
     )
 
@@ -250,10 +297,12 @@ def artist_info():
     albums = set(res.albums)
     albums |= {t.album for t in res.tracks}
     albums |= {rel.album_id for rel in res.artist_albums}
-    info["album"] = [
-        a.as_subsonic_album(request.user, request.client.client_name)
-        for a in sorted(albums, key=lambda a: a.sort_key())
-    ]
+    stats = AlbumStats.load(a.id for a in albums)
+    info["album"] = Album.as_subsonic_albums(
+        sorted(albums, key=lambda a: a.sort_key(stats.get(a.id))),
+        request.user,
+        request.client.client_name,
+    )
 
     return request.formatter("artist", info)
 
@@ -294,10 +343,9 @@ def artist_info2():
 def album_info():
     res = get_entity(Album)
     info = res.as_subsonic_album(request.user, request.client.client_name)
-    info["song"] = [
-        t.as_subsonic_child(request.user, request.client)
-        for t in sorted(res.tracks, key=lambda t: t.sort_key())
-    ]
+    info["song"] = Track.as_subsonic_children(
+        sorted(res.tracks, key=lambda t: t.sort_key()), request.user, request.client
+    )
     if "music" in request.client.client_name.lower():
         image_base_url = request.base_url.replace("/getAlbum", "/getCoverArt")
         info["cover_art"] = (
@@ -359,7 +407,7 @@ def list_tracks():
                 reason=e.__class__.__name__,
             )
 
-    result_info = [t.as_subsonic_child(request.user, request.client) for t in tracks]
+    result_info = Track.as_subsonic_children(tracks, request.user, request.client)
     return request.formatter("songs", {"song": result_info})
 
 # getSimilarSongs
@@ -376,10 +424,9 @@ def similar_songs():
         return request.formatter(
             "similarSongs",
             {
-                "song": [
-                    t.as_subsonic_child(request.user, request.client)
-                    for t in similar_songs
-                ]
+                "song": Track.as_subsonic_children(
+                    similar_songs, request.user, request.client
+                )
             },
         )
 
@@ -412,8 +459,8 @@ def similar_songs():
     return request.formatter(
         "similarSongs",
         {
-            "song": [
-                t.as_subsonic_child(request.user, request.client) for t in similar_songs
-            ]
+            "song": Track.as_subsonic_children(
+                similar_songs, request.user, request.client
+            )
         },
     )
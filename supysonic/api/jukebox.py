@@ -91,9 +91,9 @@ def jukebox_control():
                 playlist.append(Track.get(path=path))
             except Track.DoesNotExist:
                 pass
-        rv["entry"] = [
-            t.as_subsonic_child(request.user, request.client) for t in playlist
-        ]
+        rv["entry"] = Track.as_subsonic_children(
+            playlist, request.user, request.client
+        )
         return request.formatter("jukeboxPlaylist", rv)
     else:
         return request.formatter("jukeboxStatus", rv)
@@ -113,7 +113,7 @@ def show_playlist():
         raise Forbidden()
     if res == "default" and request.user:
         trq = (
-            StarredTrack.select(StarredTrack.starred)
+            StarredTrack.select(StarredTrack.starred, Track)
             .join(Track)
             .where(StarredTrack.user == request.user)
             .order_by(-StarredTrack.date)
@@ -131,15 +131,15 @@ def show_playlist():
         }
         if first_album:
             info["coverArt"] = f"al-{first_album.id}"
-        entry = [
-            st.starred.as_subsonic_child(request.user, request.client) for st in trq
-        ]
+        entry = Track.as_subsonic_children(
+            [st.starred for st in trq], request.user, request.client
+        )
         info["entry"] = entry
         return request.formatter("playlist", info)
     info = res.as_subsonic_playlist(request.user)
-    info["entry"] = [
-        t.as_subsonic_child(request.user, request.client) for t in res.get_tracks()
-    ]
+    info["entry"] = Track.as_subsonic_children(
+        res.get_tracks(), request.user, request.client
+    )
     return request.formatter("playlist", info)
 
 
@@ -234,10 +234,9 @@ def get_recommended_playlists():
             request.user,
             tracks=recommended_tracks,
         )
-        info["entry"] = [
-            t.as_subsonic_child(request.user, request.client)
-            for t in recommended_tracks
-        ]
+        info["entry"] = Track.as_subsonic_children(
+            recommended_tracks, request.user, request.client
+        )
         return request.formatter("playlist", info)
     else:
         # temp return a random playlist for the user if not exist
@@ -255,7 +254,7 @@ def get_recommended_playlists():
         first_track = trs[0] if trs else None
         if first_track:
             info["coverArt"] = f"al-{first_track.album.id}"
-        entry = [st.as_subsonic_child(request.user, request.client) for st in trs]
+        entry = Track.as_subsonic_children(trs, request.user, request.client)
         info["entry"] = entry
         return request.formatter("playlist", info)
 
@@ -13,19 +13,26 @@ from flask import current_app
 
 from ..daemon.client import DaemonClient
 from ..daemon.exceptions import DaemonUnavailableError
+from ..managers.folder import FolderManager
 
 from . import api_routing, log_api_event
 from .user import admin_only
-from .exceptions import ServerError
+from .exceptions import GenericError, ServerError
 from ..db import Folder, Artist, Album, Track
 
 
 @api_routing("/startScan")
 @admin_only
 def startScan():
+    # Extension: each ``path`` restricts the scan to that directory's subtree.
+    try:
+        paths = [FolderManager.resolve_scan_path(p) for p in request.values.getlist("path")]
+    except ValueError as e:
+        raise GenericError(str(e))
+
     try:
         daemonclient = DaemonClient(current_app.config["DAEMON"]["socket"])
-        daemonclient.scan()
+        daemonclient.scan(paths=paths)
         scanned = daemonclient.get_scanning_progress()
     except DaemonUnavailableError as e:
         log_api_event(
@@ -10,7 +10,7 @@ from datetime import datetime
 import logging
 from flask import request
 
-from ..db import Folder, Track, Artist, Album
+from ..db import Folder, Track, Artist, Album, SearchIndex
 
 from . import api_routing, get_root_folder
 from .exceptions import MissingParameter
@@ -19,6 +19,28 @@ from .exceptions import MissingParameter
 logger = logging.getLogger(__name__)
 
 
+def _matching(model, field, query):
+    """``model`` rows whose ``field`` matches ``query``, best matches first."""
+    ranked = SearchIndex.search(model, query)
+    if ranked is None:
+        # Nothing the index can look up, like punctuation only.
+        return model.select().where(field.contains(query))
+    return ranked
+
+
+def _artist_folders():
+    # Folders with a child folder holding tracks.
+    Child = Folder.alias()
+    return Child.select(Child.parent).join(Track, on=Track.folder == Child.id)
+
+
+def _serialize_matches(results):
+    # Folders always come before tracks in the results.
+    folders = [r.as_subsonic_child(request.user) for r in results if isinstance(r, Folder)]
+    tracks = [r for r in results if not isinstance(r, Folder)]
+    return folders + Track.as_subsonic_children(tracks, request.user, request.client)
+
+
 @api_routing("/search")
 def old_search():
     artist, album, title, anyf, count, offset, newer_than = map(
@@ -70,14 +92,7 @@ def old_search():
             {
                 "totalHits": folders.count() + tracks.count(),
                 "offset": offset,
-                "match": [
-                    (
-                        r.as_subsonic_child(request.user)
-                        if isinstance(r, Folder)
-                        else r.as_subsonic_child(request.user, request.client)
-                    )
-                    for r in res
-                ],
+                "match": _serialize_matches(res),
             },
         )
     else:
@@ -88,14 +103,7 @@ def old_search():
         {
             "totalHits": query.count(),
             "offset": offset,
-            "match": [
-                (
-                    r.as_subsonic_child(request.user)
-                    if isinstance(r, Folder)
-                    else r.as_subsonic_child(request.user, request.client)
-                )
-                for r in query[offset : offset + count]
-            ],
+            "match": _serialize_matches(query[offset : offset + count]),
         },
     )
 
@@ -132,27 +140,18 @@ def new_search():
     song_offset = int(song_offset) if song_offset else 0
     root = get_root_folder(mfid)
 
-    Child = Folder.alias()
-    artists = (
-        Folder.select()
-        .join(Child, on=Child.parent == Folder.id)
-        .join(Track, on=Track.folder == Child.id)
-        .where(Folder.name.contains(query))
-        .distinct()
-    )
-    albums = (
-        Folder.select()
-        .join(Track, on=Track.folder)
-        .where(Folder.name.contains(query))
-        .distinct()
-    )
-    songs = Track.select().where(Track.title.contains(query))
+    artist_folders = _artist_folders()
+    album_folders = Track.select(Track.folder)
+    songs = _matching(Track, Track.title, query)
 
     if root is not None:
-        artists = artists.where(Track.root_folder == root)
-        albums = albums.where(Track.root_folder == root)
+        artist_folders = artist_folders.where(Track.root_folder == root)
+        album_folders = album_folders.where(Track.root_folder == root)
         songs = songs.where(Track.root_folder == root)
 
+    artists = _matching(Folder, Folder.name, query).where(Folder.id.in_(artist_folders))
+    albums = _matching(Folder, Folder.name, query).where(Folder.id.in_(album_folders))
+
     artists = artists.limit(artist_count).offset(artist_offset)
     albums = albums.limit(album_count).offset(album_offset)
     songs = songs.limit(song_count).offset(song_offset)
@@ -161,11 +160,11 @@ def new_search():
         "searchResult2",
         OrderedDict(
             (
-                ("artist", [a.as_subsonic_artist(request.user) for a in artists]),
+                ("artist", Folder.as_subsonic_artists(artists, request.user)),
                 ("album", [f.as_subsonic_child(request.user) for f in albums]),
                 (
                     "song",
-                    [t.as_subsonic_child(request.user, request.client) for t in songs],
+                    Track.as_subsonic_children(songs, request.user, request.client),
                 ),
             )
         ),
@@ -204,27 +203,21 @@ def search_id3():
     song_offset = int(song_offset) if song_offset else 0
     root = get_root_folder(mfid)
     if query == '""' or not query:
-        artists = Artist.select()
-        albums = Album.select()
-        songs = Track.select().order_by(Track.created.desc())
+        artists = Artist.select().order_by(Artist.name, Artist.id)
+        albums = Album.select().order_by(Album.name, Album.id)
+        songs = Track.select().order_by(Track.created.desc(), Track.id)
     else:
-        artists = Artist.select().where(Artist.name.contains(query))
-        albums = Album.select().where(Album.name.contains(query))
-        songs = (
-            Track.select()
-            .where(Track.title.contains(query))
-            .order_by(Track.created.desc())
-        )
-    logger.debug(
-        "search3 query=%s raw_counts artists=%s albums=%s songs=%s",
-        query,
-        len(artists),
-        len(albums),
-        len(songs),
-    )
+        artists = _matching(Artist, Artist.name, query)
+        albums = _matching(Album, Album.name, query)
+        songs = _matching(Track, Track.title, query)
+    logger.debug("search3 query=%s", query)
     if root is not None:
-        artists = artists.join(Track).where(Track.root_folder == root)
-        albums = albums.join(Track).where(Track.root_folder == root)
+        artists = artists.where(
+            Artist.id.in_(Track.select(Track.artist).where(Track.root_folder == root))
+        )
+        albums = albums.where(
+            Album.id.in_(Track.select(Track.album).where(Track.root_folder == root))
+        )
         songs = songs.where(Track.root_folder == root)
 
     artists = artists.limit(artist_count).offset(artist_offset)
@@ -235,11 +228,16 @@ def search_id3():
         "searchResult3",
         OrderedDict(
             (
-                ("artist", [a.as_subsonic_artist(request.user) for a in artists]),
-                ("album", [a.as_subsonic_album(request.user,request.client.client_name) for a in albums]),
+                ("artist", Artist.as_subsonic_artists(artists, request.user)),
+                (
+                    "album",
+                    Album.as_subsonic_albums(
+                        albums, request.user, request.client.client_name
+                    ),
+                ),
                 (
                     "song",
-                    [t.as_subsonic_child(request.user, request.client) for t in songs],
+                    Track.as_subsonic_children(songs, request.user, request.client),
                 ),
             )
         ),
@@ -249,3 +249,35 @@ class Cache:
             return False
 
         return True
+
+
+class GenerationCache:
+    """Keeps values in memory for as long as the generation they were built for
+
+    Meant for structures derived from the whole library, with the generation
+    telling when the library changed (see db.get_library_generation).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, generation, build):
+        """Return the value cached for key, calling build if it is older than generation
+
+        Concurrent misses may build the same value more than once, the last one
+        built is kept.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+
+        value = build()
+        with self._lock:
+            self._entries[key] = (generation, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
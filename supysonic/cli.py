@@ -10,30 +10,56 @@ import logging
 import time
 
 from click.exceptions import ClickException
+from peewee import fn
 
 from .config import IniConfig
 from .daemon.client import DaemonClient
 from .daemon.exceptions import DaemonUnavailableError
-from .db import Folder, User, init_database, release_database
+from .db import Folder, Track, User, init_database, release_database
 from .logging_manager import build_web_logging_config, configure_web_logging
 from .managers.folder import FolderManager
 from .managers.user import UserManager
 from .scanner import Scanner
+from .scanner_func.scanner_hash import TrackHasher, resolveHashAlgorithm
 
 
 logger = logging.getLogger(__package__)
 
 
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
 class TimedProgressDisplay:
-    def __init__(self, interval=5):
+    """Progress line rewritten every ``interval`` seconds.
+
+    With ``totals``, the expected count for each name, the line also shows the
+    rate since that name was first reported and an estimate of the time left.
+    """
+
+    def __init__(self, interval=5, template="Scanning '{0}': {1} files scanned", totals=None):
+        self.__template = template
         self.__stdout = click.get_text_stream("stdout")
         self.__interval = interval
+        self.__totals = totals
         self.__last_display = 0
         self.__last_len = 0
+        self.__current = None
+        self.__started = 0
 
     def __call__(self, name, scanned):
+        if name != self.__current:
+            self.__current = name
+            self.__started = time.time()
+
         if time.time() - self.__last_display > self.__interval:
-            progress = f"Scanning '{name}': {scanned} files scanned"
+            progress = self.__template.format(name, scanned)
+            if self.__totals is not None:
+                progress += self.__rate(name, scanned)
+            # Pad over whatever is left of a longer previous line.
+            progress = progress.ljust(self.__last_len)
             self.__stdout.write("\b" * self.__last_len)
             self.__stdout.write(progress)
             self.__stdout.flush()
@@ -41,6 +67,17 @@ class TimedProgressDisplay:
             self.__last_len = len(progress)
             self.__last_display = time.time()
 
+    def __rate(self, name, scanned):
+        elapsed = time.time() - self.__started
+        if elapsed <= 0 or not scanned:
+            return ""
+
+        rate = scanned / elapsed
+        remaining = self.__totals.get(name, 0) - scanned
+        if remaining <= 0:
+            return f" ({rate:.1f} files/s)"
+        return f" ({rate:.1f} files/s, ETA {_format_duration(remaining / rate)})"
+
 
 @click.group()
 def cli():
@@ -125,19 +162,45 @@ def folder_delete(name):
     flag_value="foreground",
     help="Scan the folder(s) in the foreground, blocking the processus while the scan is running.",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of workers reading tags in parallel. Defaults to the 'scanner_jobs' setting.",
+)
+@click.option(
+    "-p",
+    "--path",
+    "paths",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Only scan this directory of a folder. Can be repeated.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Resume the interrupted scan even if it was started on other folders.",
+)
 @click.pass_obj
-def folder_scan(config, folder, force, mode):
+def folder_scan(config, folder, force, mode, jobs, paths, resume):
     """Run a scan on specified folders.
 
     FOLDER is the name of the folder to scan. Multiple can be specified. If ommitted,
-    all folders are scanned.
+    and no --path is given, all folders are scanned.
     """
 
+    try:
+        paths = [FolderManager.resolve_scan_path(p) for p in paths]
+    except ValueError as e:
+        raise ClickException(str(e)) from e
+
     daemon = DaemonClient(config.DAEMON["socket"])
 
     # quick and dirty shorthand calls
-    scan_bg = lambda: daemon.scan(folder, force)
-    scan_fg = lambda: _folder_scan_foreground(config, daemon, folder, force)
+    scan_bg = lambda: daemon.scan(folder, force, jobs, paths, resume)
+    scan_fg = lambda: _folder_scan_foreground(config, daemon, folder, force, jobs, paths, resume)
 
     auto = not mode
     if auto:
@@ -159,7 +222,112 @@ def folder_scan(config, folder, force, mode):
         scan_fg()
 
 
-def _folder_scan_foreground(config, daemon, folders, force):
+@folder.command("repair")
+@click.pass_obj
+def folder_repair(config):
+    """Repairs missing metadata across the whole library.
+
+    Scans only look up years, covers and artist information for the albums and
+    artists they touched. This runs that repair over every album and artist.
+    """
+
+    configure_web_logging(build_web_logging_config(config.WEBAPP), logger_name=logger.name)
+
+    scanner = Scanner()
+    scanner.find_lost_information(full=True)
+    stats = scanner.stats()
+
+    click.echo(
+        "Missing covers: {0.albums} albums, {0.artists} artists".format(stats.lost_covers)
+    )
+    click.echo(f"Missing years: {len(stats.lost_year_albums)} albums")
+
+
+@folder.command("hash")
+@click.option(
+    "--background",
+    "mode",
+    flag_value="background",
+    help="Hash in the background. Requires the daemon to be running.",
+)
+@click.option(
+    "--foreground",
+    "mode",
+    flag_value="foreground",
+    help="Hash in the foreground, blocking the processus until every track is hashed.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of processes reading files in parallel. Defaults to the 'scanner_jobs' setting.",
+)
+@click.option(
+    "-a",
+    "--algorithm",
+    type=click.Choice(["auto", "xxh3", "blake3", "blake2b", "md5"]),
+    default=None,
+    help="Hash algorithm. Defaults to the 'content_hash_algorithm' setting.",
+)
+@click.pass_obj
+def folder_hash(config, mode, jobs, algorithm):
+    """Hashes the content of tracks.
+
+    Only tracks whose file changed since it was last hashed are read again.
+    """
+
+    try:
+        algorithm = resolveHashAlgorithm(algorithm or config.BASE.get("content_hash_algorithm"))
+    except ValueError as e:
+        raise ClickException(str(e)) from e
+
+    daemon = DaemonClient(config.DAEMON["socket"])
+    hash_fg = lambda: _folder_hash_foreground(config, daemon, jobs, algorithm)
+
+    if mode == "foreground":
+        hash_fg()
+        return
+
+    try:
+        daemon.hash_tracks(jobs, algorithm)
+    except DaemonUnavailableError as e:
+        if mode == "background":
+            raise ClickException(
+                "Couldn't connect to the daemon, please use the '--foreground' option",
+            ) from e
+        click.echo("Couldn't connect to the daemon, hashing in foreground", err=True)
+        hash_fg()
+
+
+def _folder_hash_foreground(config, daemon, jobs, algorithm):
+    configure_web_logging(build_web_logging_config(config.WEBAPP), logger_name=logger.name)
+
+    try:
+        if daemon.get_hashing_progress() is not None:
+            raise ClickException("The daemon is currently hashing, can't start now")
+    except DaemonUnavailableError:
+        pass
+
+    hasher = TrackHasher(
+        jobs=jobs or config.BASE.get("scanner_jobs"),
+        algorithm=algorithm,
+        progress=TimedProgressDisplay(
+            template="Hashing: {0}/%d tracks checked, {1} hashed" % Track.select().count()
+        ),
+    )
+    hasher.hash_tracks()
+    stats = hasher.stats()
+
+    click.echo("\nHashing done")
+    click.echo(f"Hashed {stats.hashed} of {stats.checked} tracks with {hasher.algorithm}")
+    if stats.errors:
+        click.echo("Errors in:")
+        for err in stats.errors:
+            click.echo("- " + err)
+
+
+def _folder_scan_foreground(config, daemon, folders, force, jobs=None, paths=(), resume=False):
     configure_web_logging(build_web_logging_config(config.WEBAPP), logger_name=logger.name)
 
     try:
@@ -187,15 +355,27 @@ def _folder_scan_foreground(config, daemon, folders, force):
         except DaemonUnavailableError:
             pass
 
+    # Tracks found by the previous scans, what the estimate of the time left relies on.
+    totals = dict(
+        Folder.select(Folder.name, fn.COUNT(Track.id))
+        .join(Track, on=(Track.root_folder == Folder.id))
+        .where(Folder.root)
+        .group_by(Folder.name)
+        .tuples()
+    )
     scanner = Scanner(
         force=force,
         extensions=extensions,
         follow_symlinks=config.BASE["follow_symlinks"],
-        progress=TimedProgressDisplay(),
+        progress=TimedProgressDisplay(totals=totals),
         on_folder_start=unwatch_folder,
         on_folder_end=watch_folder,
+        jobs=jobs or config.BASE.get("scanner_jobs"),
+        resume=resume,
     )
 
+    for path in paths:
+        scanner.queue_path(path)
     if folders:
         fstrs = folders
         folders = [
@@ -209,7 +389,7 @@ def _folder_scan_foreground(config, daemon, folders, force):
             click.echo("No such folder(s): " + " ".join(notfound))
         for folder in folders:
             scanner.queue_folder(folder)
-    else:
+    elif not paths:
         for (folder,) in Folder.select(Folder.name).where(Folder.root).tuples():
             scanner.queue_folder(folder)
 
@@ -227,6 +407,13 @@ def _folder_scan_foreground(config, daemon, folders, force):
             stats.deleted
         )
     )
+    if stats.moved:
+        click.echo(f"Moved: {stats.moved} tracks")
+    timings = getattr(stats, "timings", None)
+    if timings is not None and timings.snapshot():
+        click.echo("Stages:")
+        for name, (seconds, calls) in timings.snapshot().items():
+            click.echo(f"  {name: <24}{seconds:10.3f}s {calls: >8} calls")
     if stats.errors:
         click.echo("Errors in:")
         for err in stats.errors:
@@ -370,7 +557,7 @@ def user_rename(name, newname):
 
 def main():
     config = IniConfig.from_common_locations()
-    init_database(config.BASE["database_uri"])
+    init_database(config.BASE["database_uri"], config.BASE)
     try:
         cli.main(obj=config)
     finally:
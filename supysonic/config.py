@@ -27,6 +27,21 @@ class DefaultConfig:
         "database_uri": "sqlite:///" + os.path.join(tempdir, "supysonic.db"),
         "scanner_extensions": None,
         "follow_symlinks": False,
+        "scanner_jobs": 1,
+        "scanner_workers": "thread",
+        "scanner_batch_files": 200,
+        "scanner_batch_ms": 2000,
+        "scanner_checkpoint_interval": 30,
+        "content_hash_algorithm": "auto",
+        "sqlite_profile": "compatible",
+        "sqlite_cache_size": None,
+        "sqlite_mmap_size": None,
+        "sqlite_busy_timeout": None,
+        "sqlite_read_routing": False,
+        "database_pool": False,
+        "database_max_connections": 20,
+        "database_stale_timeout": 300,
+        "database_pool_timeout": 10,
     }
     WEBAPP = {
         "cache_dir": tempdir,
@@ -73,6 +88,10 @@ class DefaultConfig:
         "recommend_playlist_retention_days": 5,
         "review_task_maintenance": True,
         "review_task_maintenance_interval": 300,
+        "library_repair": True,
+        "library_repair_interval": 86400,
+        "database_maintenance": True,
+        "database_maintenance_interval": 3600,
     }
     MUSICBRAINZ = {
         "api_url": "https://musicbrainz.org/ws/2",
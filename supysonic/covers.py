@@ -32,13 +32,13 @@ class CoverFile:
     def __clean_name(name):
         return CoverFile.__clean_regex.sub("", name.lower())
 
-    def __init__(self, name, album_name=None):
-        self.name = name
-        self.score = 0
+    @staticmethod
+    def naming_score(name):
+        return sum(score for part, score in NAMING_SCORE_RULES if part in name.lower())
 
-        for part, score in NAMING_SCORE_RULES:
-            if part in name.lower():
-                self.score += score
+    def __init__(self, name, album_name=None, score=None):
+        self.name = name
+        self.score = CoverFile.naming_score(name) if score is None else score
 
         if album_name:
             basename, _ = os.path.splitext(name)
@@ -77,6 +77,10 @@ def  find_cover_in_folder(path, album_name=None):
         cover = CoverFile(entry.name, album_name)
         candidates.append(cover)
 
+    return best_cover(candidates)
+
+
+def best_cover(candidates):
     if not candidates:
         return None
     if len(candidates) == 1:
@@ -53,7 +53,7 @@ def main():
     signal(SIGTERM, __terminate)
     signal(SIGINT, __terminate)
 
-    init_database(config.BASE["database_uri"])
+    init_database(config.BASE["database_uri"], config.BASE)
     daemon = Daemon(config)
     try:
         daemon.run()
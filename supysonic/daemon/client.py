@@ -56,17 +56,48 @@ class ScannerCommand(DaemonCommand):
 class ScannerProgressCommand(ScannerCommand):
     def apply(self, connection, daemon):
         scanner = daemon.scanner
-        rv = scanner.scanned if scanner is not None and scanner.is_alive() else None
-        connection.send(ScannerProgressResult(rv))
+        if scanner is None or not scanner.is_alive():
+            connection.send(ScannerProgressResult(None))
+            return
+
+        connection.send(
+            ScannerProgressResult(scanner.scanned, scanner.timings.snapshot(), scanner.timings.elapsed)
+        )
 
 
 class ScannerStartCommand(ScannerCommand):
-    def __init__(self, folders=[], force=False):
+    def __init__(self, folders=[], force=False, jobs=None, paths=[], resume=False):
         self.__folders = folders
         self.__force = force
+        self.__jobs = jobs
+        self.__paths = paths
+        self.__resume = resume
+
+    def apply(self, connection, daemon):
+        daemon.start_scan(self.__folders, self.__force, self.__jobs, self.__paths, self.__resume)
+
+
+class HasherCommand(DaemonCommand):
+    pass
+
+
+class HasherProgressCommand(HasherCommand):
+    def apply(self, connection, daemon):
+        hasher = daemon.hasher
+        if hasher is not None and hasher.is_alive():
+            stats = hasher.stats()
+            connection.send(HasherProgressResult(stats.checked, stats.hashed, stats.total))
+        else:
+            connection.send(HasherProgressResult(None, None, None))
+
+
+class HasherStartCommand(HasherCommand):
+    def __init__(self, jobs=None, algorithm=None):
+        self.__jobs = jobs
+        self.__algorithm = algorithm
 
     def apply(self, connection, daemon):
-        daemon.start_scan(self.__folders, self.__force)
+        daemon.start_hash(self.__jobs, self.__algorithm)
 
 
 class JukeboxCommand(DaemonCommand):
@@ -118,10 +149,26 @@ class DaemonCommandResult:
 
 
 class ScannerProgressResult(DaemonCommandResult):
-    def __init__(self, scanned):
+    def __init__(self, scanned, timings=None, elapsed=None):
         self.__scanned = scanned
+        self.__timings = timings or {}
+        self.__elapsed = elapsed
 
     scanned = property(lambda self: self.__scanned)
+    # Stage name to (seconds, calls), see ``scanner_timing.StageTimings``.
+    timings = property(lambda self: self.__timings)
+    elapsed = property(lambda self: self.__elapsed)
+
+
+class HasherProgressResult(DaemonCommandResult):
+    def __init__(self, checked, hashed, total):
+        self.__checked = checked
+        self.__hashed = hashed
+        self.__total = total
+
+    checked = property(lambda self: self.__checked)
+    hashed = property(lambda self: self.__hashed)
+    total = property(lambda self: self.__total)
 
 
 class JukeboxResult(DaemonCommandResult):
@@ -174,15 +221,30 @@ class DaemonClient:
             return c.recv()
 
     def get_scanning_progress(self):
+        return self.get_scanning_status().scanned
+
+    def get_scanning_status(self):
         with self.__get_connection() as c:
             c.send(ScannerProgressCommand())
-            return c.recv().scanned
+            return c.recv()
 
-    def scan(self, folders=[], force=False):
+    def scan(self, folders=[], force=False, jobs=None, paths=[], resume=False):
         if not isinstance(folders, (list, tuple)):
             raise TypeError("Expecting list, got " + str(type(folders)))
+        if not isinstance(paths, (list, tuple)):
+            raise TypeError("Expecting list, got " + str(type(paths)))
+        with self.__get_connection() as c:
+            c.send(ScannerStartCommand(folders, force, jobs, paths, resume))
+
+    def get_hashing_progress(self):
+        with self.__get_connection() as c:
+            c.send(HasherProgressCommand())
+            rv = c.recv()
+            return None if rv.checked is None else rv
+
+    def hash_tracks(self, jobs=None, algorithm=None):
         with self.__get_connection() as c:
-            c.send(ScannerStartCommand(folders, force))
+            c.send(HasherStartCommand(jobs, algorithm))
 
     def jukebox_control(self, action, *args):
         if not isinstance(action, str):
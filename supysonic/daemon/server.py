@@ -12,13 +12,14 @@ from multiprocessing.connection import Listener, Client
 from threading import Thread, Event
 
 from .client import DaemonCommand
-from ..db import Folder, open_connection, close_connection
+from ..db import Folder, open_connection, close_connection, optimize_database
 from ..jukebox import Jukebox
 from ..logging_utils import format_log_event
 from ..recommend import getRecommendationDay, refreshDailyRecommendPlaylists
 from ..scheduler import IntervalScheduler
 from ..scanner import Scanner
-from ..scanner_func.scanner_review_tasks import runReviewTaskMaintenance
+from ..scanner_func.scanner_hash import TrackHasher
+from ..scanner_func.scanner_review_tasks import createReviewTasks, runReviewTaskMaintenance
 from ..utils import get_secret_key
 from ..watcher import SupysonicWatcher
 
@@ -33,6 +34,7 @@ class Daemon:
         self.__listener = None
         self.__watcher = None
         self.__scanner = None
+        self.__hasher = None
         self.__jukebox = None
         self.__scheduler = IntervalScheduler()
         self.__lastRecommendRefreshDay = None
@@ -40,6 +42,7 @@ class Daemon:
 
     watcher = property(lambda self: self.__watcher)
     scanner = property(lambda self: self.__scanner)
+    hasher = property(lambda self: self.__hasher)
     jukebox = property(lambda self: self.__jukebox)
 
     def __handle_connection(self, connection):
@@ -105,6 +108,12 @@ class Daemon:
     def __get_review_task_maintenance_interval(self):
         return max(60, int(self.__config.DAEMON.get("review_task_maintenance_interval", 300)))
 
+    def __get_library_repair_interval(self):
+        return max(3600, int(self.__config.DAEMON.get("library_repair_interval", 86400)))
+
+    def __get_database_maintenance_interval(self):
+        return max(60, int(self.__config.DAEMON.get("database_maintenance_interval", 3600)))
+
     def __configure_scheduler(self):
         self.__scheduler.register(
             "review-task-maintenance",
@@ -118,10 +127,82 @@ class Daemon:
             self.__get_recommend_refresh_interval(),
             enabled=self.__config.DAEMON.get("recommend_daily_refresh", True),
         )
+        # Scans and watcher batches only repair what they touched, this sweep
+        # catches everything else, such as entries whose lookups failed before.
+        self.__scheduler.register(
+            "library-repair",
+            self.__run_library_repair,
+            self.__get_library_repair_interval(),
+            run_immediately=False,
+            enabled=self.__config.DAEMON.get("library_repair", True),
+        )
+        self.__scheduler.register(
+            "database-maintenance",
+            self.__run_database_maintenance,
+            self.__get_database_maintenance_interval(),
+            run_immediately=False,
+            enabled=self.__config.DAEMON.get("database_maintenance", True),
+        )
 
     def __run_review_task_maintenance(self):
         return runReviewTaskMaintenance()
 
+    def __run_library_repair(self):
+        if self.__scanner is not None and self.__scanner.is_alive():
+            logger.info(
+                format_log_event(
+                    "daemon",
+                    "library_repair_skipped",
+                    reason="scanner_running",
+                )
+            )
+            return False
+
+        opened = False
+        try:
+            opened = open_connection(True)
+            logger.info(format_log_event("daemon", "library_repair_started"))
+            scanner = Scanner()
+            scanner.find_lost_information(full=True)
+            createReviewTasks(scanner)
+            stats = scanner.stats()
+            logger.info(
+                format_log_event(
+                    "daemon",
+                    "library_repair_completed",
+                    lost_album_covers=stats.lost_covers.albums,
+                    lost_artist_covers=stats.lost_covers.artists,
+                    lost_album_years=len(stats.lost_year_albums),
+                )
+            )
+            return True
+        finally:
+            if opened:
+                close_connection()
+
+    def __run_database_maintenance(self):
+        # Truncating the write-ahead log waits for the writer, not worth it mid-scan.
+        scanning = self.__scanner is not None and self.__scanner.is_alive()
+        opened = False
+        try:
+            opened = open_connection(True)
+            checkpointed = optimize_database(truncate_wal=not scanning)
+        finally:
+            if opened:
+                close_connection()
+
+        if checkpointed is None:
+            return False
+        logger.info(
+            format_log_event(
+                "daemon",
+                "database_maintenance_completed",
+                checkpointed=checkpointed,
+                truncated=not scanning,
+            )
+        )
+        return True
+
     def __refresh_recommend_playlists_if_needed(self, current_day=None):
         recommendationDay = getRecommendationDay() if current_day is None else current_day
         if recommendationDay == self.__lastRecommendRefreshDay:
@@ -166,16 +247,18 @@ class Daemon:
             if opened:
                 close_connection()
 
-    def start_scan(self, folders=[], force=False):
+    def start_scan(self, folders=[], force=False, jobs=None, paths=[], resume=False):
         logger.info(
             format_log_event(
                 "daemon",
                 "scan_requested",
-                folders=len(folders) if folders else "all",
+                folders=len(folders) if folders or paths else "all",
                 force=force,
+                paths=len(paths),
             )
         )
-        if not folders:
+        # Without any target every root folder is scanned.
+        if not folders and not paths:
             open_connection()
             folders = [
                 t[0] for t in Folder.select(Folder.name).where(Folder.root).tuples()
@@ -185,6 +268,8 @@ class Daemon:
         if self.__scanner is not None and self.__scanner.is_alive():
             for f in folders:
                 self.__scanner.queue_folder(f)
+            for p in paths:
+                self.__scanner.queue_path(p)
             logger.info(
                 format_log_event(
                     "daemon",
@@ -192,6 +277,7 @@ class Daemon:
                     folders=len(folders),
                     force=force,
                     reason="scanner_already_running",
+                    paths=len(paths),
                 )
             )
             return
@@ -206,9 +292,13 @@ class Daemon:
             follow_symlinks=self.__config.BASE["follow_symlinks"],
             on_folder_start=self.__unwatch,
             on_folder_end=self.__watch,
+            jobs=jobs or self.__config.BASE.get("scanner_jobs"),
+            resume=resume,
         )
         for f in folders:
             self.__scanner.queue_folder(f)
+        for p in paths:
+            self.__scanner.queue_path(p)
 
         self.__scanner.start()
         logger.info(
@@ -217,6 +307,37 @@ class Daemon:
                 "scan_started",
                 folders=len(folders),
                 force=force,
+                paths=len(paths),
+            )
+        )
+
+    def start_hash(self, jobs=None, algorithm=None):
+        if self.__hasher is not None and self.__hasher.is_alive():
+            logger.info(
+                format_log_event(
+                    "daemon",
+                    "hash_skipped",
+                    reason="hasher_already_running",
+                )
+            )
+            return
+
+        try:
+            self.__hasher = TrackHasher(
+                jobs=jobs or self.__config.BASE.get("scanner_jobs"),
+                algorithm=algorithm or self.__config.BASE.get("content_hash_algorithm"),
+            )
+        except ValueError as e:
+            logger.warning(format_log_event("daemon", "hash_rejected", error=str(e)))
+            return
+
+        self.__hasher.start()
+        logger.info(
+            format_log_event(
+                "daemon",
+                "hash_started",
+                algorithm=self.__hasher.algorithm,
+                jobs=self.__hasher.jobs,
             )
         )
 
@@ -236,6 +357,9 @@ class Daemon:
         if self.__scanner is not None:
             self.__scanner.stop()
             self.__scanner.join()
+        if self.__hasher is not None:
+            self.__hasher.stop()
+            self.__hasher.join()
         if self.__watcher is not None:
             self.__watcher.stop()
         self.__scheduler.stop()
@@ -14,16 +14,25 @@ from .db_layer.annotations import (
     StarredTrack,
 )
 from .db_layer.client_releases import ClientRelease
-from .db_layer.core import Meta, PathMixin, PrimaryKeyField, db, now, random
+from .db_layer.core import Meta, PathMixin, PrimaryKeyField, db, now, path_hash, random
 from .db_layer.emo import EmoLocalQueue, EmoPlaybackState, EmoSessionQueue
 from .db_layer.library import (
     Album,
     AlbumArtist,
+    AlbumStats,
     Artist,
+    ArtistStats,
+    CoverCandidate,
     Folder,
     Image,
+    ScanCheckpoint,
     Track,
     TrackArtist,
+    TrackHash,
+    bump_identity_generation,
+    bump_library_generation,
+    get_identity_generation,
+    get_library_generation,
 )
 from .db_layer.misc import ChatMessage, RadioStation
 from .db_layer.music_requests import MusicRequest
@@ -31,11 +40,15 @@ from .db_layer.playlists import Playlist, SharedTrackLink
 from .db_layer.review_tasks import AlbumReviewTask, ReviewTask
 from .db_layer.runtime import (
     close_connection,
+    connection_context,
     init_database,
     open_connection,
+    optimize_database,
     release_database,
 )
+from .db_layer.routing import begin_read_routing, end_read_routing
 from .db_layer.schema import SCHEMA_VERSION, execute_sql_resource_script
+from .db_layer.search import SearchIndex, search_terms
 from .db_layer.users import (
     ClientPrefs,
     User,
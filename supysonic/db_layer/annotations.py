@@ -1,7 +1,7 @@
 from peewee import CompositeKey, DateTimeField, ForeignKeyField, IntegerField
 
 from .core import _Model, now
-from .library import Album, Artist, Folder, Track
+from .library import Album, Artist, Folder, Track, _unreferenced
 from .users import User
 
 
@@ -51,19 +51,9 @@ def delete_folder_annotations(folder_query: object) -> None:
     StarredFolder.delete().where(StarredFolder.starred.in_(folder_query)).execute()
 
 
-def delete_orphaned_artist_annotations(
-    album_artists: object,
-    track_artists: object,
-    album_multi_artists: object,
-    track_multi_artists: object,
-) -> None:
-    StarredArtist.delete().where(
-        StarredArtist.starred.not_in(album_artists),
-        StarredArtist.starred.not_in(track_artists),
-        StarredArtist.starred.not_in(album_multi_artists),
-        StarredArtist.starred.not_in(track_multi_artists),
-    ).execute()
+def delete_orphaned_artist_annotations(artist_fields: object) -> None:
+    StarredArtist.delete().where(*_unreferenced(StarredArtist.starred, *artist_fields)).execute()
 
 
-def delete_orphaned_album_annotations(album_query: object) -> None:
-    StarredAlbum.delete().where(StarredAlbum.starred.not_in(album_query)).execute()
+def delete_orphaned_album_annotations(album_field: object) -> None:
+    StarredAlbum.delete().where(*_unreferenced(StarredAlbum.starred, album_field)).execute()
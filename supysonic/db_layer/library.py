@@ -1,8 +1,12 @@
 import mimetypes
 import os
+import uuid
+
+from collections import Counter
 
 from peewee import (
     AutoField,
+    BigIntegerField,
     BlobField,
     BooleanField,
     CharField,
@@ -11,14 +15,20 @@ from peewee import (
     IntegerField,
     MySQLDatabase,
     OperationalError,
+    SQL,
     TextField,
     fn,
 )
 
-from .core import PathMixin, PrimaryKeyField, _Model, db, now
+from .core import Meta, PathMixin, PrimaryKeyField, _Model, db, now
 from ..tool import read_dict_from_json
 
 
+def _unreferenced(target, *fields):
+    """``NOT EXISTS`` conditions, one per field, each matching rows no ``field`` points at."""
+    return [~fn.EXISTS(field.model.select(SQL("1")).where(field == target)) for field in fields]
+
+
 def _path_tree_candidates(path: str):
     candidates = []
     for candidate in (os.path.normpath(path), os.path.abspath(path)):
@@ -64,6 +74,8 @@ class Folder(PathMixin, _Model):
     created = DateTimeField(default=now)
     cover_art = CharField(null=True)
     last_scan = IntegerField(default=0)
+    # Digest of the directory listing as of the last scan, see scanner_signature.
+    scan_signature = CharField(max_length=40, null=True)
 
     parent = ForeignKeyField("self", null=True, backref="children")
 
@@ -77,6 +89,12 @@ class Folder(PathMixin, _Model):
 
         return serialize_folder_artist(self, user)
 
+    @staticmethod
+    def as_subsonic_artists(folders, user):
+        from .serializers import serialize_folder_artists
+
+        return serialize_folder_artists(folders, user)
+
     def as_subsonic_directory(self, user, client):  # "Directory" type in XSD
         from .serializers import serialize_folder_directory
 
@@ -84,20 +102,25 @@ class Folder(PathMixin, _Model):
 
     @classmethod
     def prune(cls):
-        alias = cls.alias()
-        query = cls.select(cls.id).where(
-            ~cls.root,
-            Track.select(fn.count("*")).where(Track.folder == cls.id) == 0,
-            alias.select(fn.count("*")).where(alias.parent == cls.id) == 0,
-        )
-        total = 0
-        while True:
-            clone = query.clone()  # peewee caches results, clone to force refetch
-            for f in clone:
-                f.delete_instance(recursive=True)
-                total += 1
-            if not len(clone):
-                return total
+        # A folder is empty when it holds no track and all its children are
+        # empty. Peel empty leaves off the tree once instead of re-querying.
+        parents = dict(cls.select(cls.id, cls.parent).where(~cls.root).tuples())
+        with_tracks = {folder_id for (folder_id,) in Track.select(Track.folder).distinct().tuples()}
+        children = Counter(parents.values())
+
+        leaves = [f for f in parents if not children[f] and f not in with_tracks]
+        empty = []
+        while leaves:
+            folder_id = leaves.pop()
+            empty.append(folder_id)
+            parent = parents[folder_id]
+            children[parent] -= 1
+            if parent in parents and not children[parent] and parent not in with_tracks:
+                leaves.append(parent)
+
+        if empty:
+            cls.delete_by_ids(empty)
+        return len(empty)
 
     def delete_hierarchy(self):
         if self.root:
@@ -123,6 +146,14 @@ class Folder(PathMixin, _Model):
         folders = Folder.select(Folder.id).where(path_cond)
         delete_folder_annotations(folders)
 
+        album_ids = [
+            album_id
+            for (album_id,) in Track.select(Track.album)
+            .where(cond | Track.folder.in_(folders))
+            .distinct()
+            .tuples()
+        ]
+
         deleted_tracks = Track.delete().where(cond).execute()
 
         # Ensure tracks in all child folders are deleted.
@@ -137,6 +168,36 @@ class Folder(PathMixin, _Model):
         if isinstance(db.obj, MySQLDatabase):
             query = query.order_by(Folder.path.desc())
         query.execute()
+        AlbumStats.refresh(album_ids)
+
+        return deleted_tracks
+
+    # Delete non-root folders by id along with the tracks they still hold.
+    @classmethod
+    def delete_by_ids(cls, folder_ids, chunk_size=500):
+        from .annotations import delete_folder_annotations
+
+        folder_ids = list(folder_ids)
+        deleted_tracks = 0
+        for start in range(0, len(folder_ids), chunk_size):
+            chunk = folder_ids[start : start + chunk_size]
+            track_ids = [
+                track_id
+                for (track_id,) in Track.select(Track.id)
+                .where(Track.folder.in_(chunk))
+                .tuples()
+            ]
+            deleted_tracks += Track.delete_by_ids(track_ids, chunk_size)
+            delete_folder_annotations(chunk)
+
+        # Detach the folders first so the deletion order within a chunk, or
+        # across chunks, never trips the parent reference.
+        for start in range(0, len(folder_ids), chunk_size):
+            chunk = folder_ids[start : start + chunk_size]
+            cls.update(parent=None).where(cls.id.in_(chunk)).execute()
+        for start in range(0, len(folder_ids), chunk_size):
+            chunk = folder_ids[start : start + chunk_size]
+            cls.delete().where(cls.id.in_(chunk)).execute()
 
         return deleted_tracks
 
@@ -161,6 +222,12 @@ class Artist(_Model):
 
         return serialize_artist(self, user)
 
+    @staticmethod
+    def as_subsonic_artists(artists, user, stats=None):
+        from .serializers import serialize_artists
+
+        return serialize_artists(artists, user, stats)
+
     def get_info(self):
         info = {
             "biography": "",
@@ -193,27 +260,14 @@ class Artist(_Model):
     def prune(cls):
         from .annotations import delete_orphaned_artist_annotations
 
-        # Collect all referenced artist IDs.
-        album_artists = Album.select(Album.artist)
-        track_artists = Track.select(Track.artist)
-        album_multi_artists = AlbumArtist.select(AlbumArtist.artist_id)
-        track_multi_artists = TrackArtist.select(TrackArtist.artist_id)
-        delete_orphaned_artist_annotations(
-            album_artists,
-            track_artists,
-            album_multi_artists,
-            track_multi_artists,
-        )
+        # Fields referencing an artist, each checked with an indexed anti-join.
+        references = (Album.artist, Track.artist, AlbumArtist.artist_id)
+        delete_orphaned_artist_annotations(references + (TrackArtist.artist_id,))
 
         # Delete artist records that are no longer referenced.
         return (
             cls.delete()
-            .where(cls.real_artist.is_null())
-            .where(
-                cls.id.not_in(album_artists),
-                cls.id.not_in(track_artists),
-                cls.id.not_in(album_multi_artists),
-            )
+            .where(cls.real_artist.is_null(), *_unreferenced(cls.id, *references))
             .execute()
         )
 
@@ -253,18 +307,26 @@ class Album(_Model):
 
         return serialize_album(self, user, server_type)
 
-    def sort_key(self):
-        year = self.tracks.select(fn.min(Track.year)).scalar() or 9999
+    @staticmethod
+    def as_subsonic_albums(albums, user, server_type=None):
+        from .serializers import serialize_albums
+
+        return serialize_albums(albums, user, server_type)
+
+    def sort_key(self, stats=None):
+        # Sorting many albums, pass their rows from AlbumStats.load().
+        if stats is None:
+            stats = AlbumStats.load([self.id]).get(self.id)
+        year = (stats.min_year if stats is not None else None) or 9999
         return f"{year}{self.name.lower()}"
 
     @classmethod
     def prune(cls):
         from .annotations import delete_orphaned_album_annotations
 
-        albums = Track.select(Track.album)
-        delete_orphaned_album_annotations(albums)
-        AlbumArtist.delete().where(AlbumArtist.album_id.not_in(albums)).execute()
-        return cls.delete().where(cls.id.not_in(albums)).execute()
+        delete_orphaned_album_annotations(Track.album)
+        AlbumArtist.delete().where(*_unreferenced(AlbumArtist.album_id, Track.album)).execute()
+        return cls.delete().where(*_unreferenced(cls.id, Track.album)).execute()
 
 
 class AlbumArtist(_Model):
@@ -305,6 +367,9 @@ class Track(PathMixin, _Model):
     _path_hash = BlobField(column_name="path_hash", unique=True)
     created = DateTimeField(default=now)
     last_modification = IntegerField()
+    # Taken from the scan's stat, serialized instead of asking the file system.
+    size = BigIntegerField(null=True)
+    mtime_ns = BigIntegerField(null=True)
 
     play_count = IntegerField(default=0)
     play_count_web = IntegerField(default=0)
@@ -318,6 +383,12 @@ class Track(PathMixin, _Model):
 
         return serialize_track_child(self, user, prefs)
 
+    @staticmethod
+    def as_subsonic_children(tracks, user, prefs):
+        from .serializers import serialize_tracks
+
+        return serialize_tracks(tracks, user, prefs)
+
     @property
     def mimetype(self):
         return mimetypes.guess_type(self.path, False)[0] or "application/octet-stream"
@@ -336,6 +407,22 @@ class Track(PathMixin, _Model):
     def sort_key(self):
         return f"{self.album.artist.get_artist_name()}{self.album.name}{self.disc:02}{self.number:02}{self.title}".lower()
 
+    # Bulk counterpart of delete_instance(recursive=True): rows referencing the
+    # tracks are deleted, nullable references (User.last_play) are cleared.
+    @classmethod
+    def delete_by_ids(cls, track_ids, chunk_size=500):
+        track_ids = list(track_ids)
+        deleted = 0
+        for start in range(0, len(track_ids), chunk_size):
+            chunk = track_ids[start : start + chunk_size]
+            for field in cls._meta.backrefs:
+                if field.null and field.on_delete != "CASCADE":
+                    field.model.update({field: None}).where(field.in_(chunk)).execute()
+                else:
+                    field.model.delete().where(field.in_(chunk)).execute()
+            deleted += cls.delete().where(cls.id.in_(chunk)).execute()
+        return deleted
+
 
 class TrackArtist(_Model):
     """Many-to-many relation between tracks and artists."""
@@ -351,3 +438,266 @@ class TrackArtist(_Model):
             # Ensure each track-artist pair is unique.
             (('track', 'artist'), True),
         )
+
+
+class AlbumStats(_Model):
+    """Aggregates of an album's tracks, so listing albums doesn't go through them.
+
+    Kept current by the scanner for the albums it touched, see ``refresh()``.
+    Readers use ``load()``, which computes the rows still missing on the fly.
+    """
+
+    album = ForeignKeyField(Album, primary_key=True, backref="+", on_delete="CASCADE")
+    song_count = IntegerField()
+    duration = IntegerField()
+    created = DateTimeField()
+    min_year = IntegerField(null=True)
+    genres = TextField(null=True)  # Distinct genres of the tracks, comma separated.
+    cover_art = CharField(36, null=True)  # Id of a folder holding a cover, else of a track with embedded art.
+
+    class Meta:
+        table_name = "album_stats"
+
+    @classmethod
+    def compute(cls, album_ids, chunk_size=500):
+        """Unsaved rows, by album id, for those of ``album_ids`` having tracks."""
+        album_ids = list(album_ids)
+        stats = {}
+        for start in range(0, len(album_ids), chunk_size):
+            chunk = album_ids[start : start + chunk_size]
+            totals = (
+                Track.select(
+                    Track.album,
+                    fn.count(Track.id),
+                    fn.sum(Track.duration),
+                    fn.min(Track.created),
+                    fn.min(Track.year),
+                )
+                .where(Track.album.in_(chunk))
+                .group_by(Track.album)
+                .tuples()
+            )
+            for album_id, count, duration, created, year in totals:
+                stats[album_id] = cls(
+                    album=album_id,
+                    song_count=count,
+                    duration=duration,
+                    created=created,
+                    min_year=year,
+                )
+
+            genres = {}
+            for album_id, genre in (
+                Track.select(Track.album, Track.genre)
+                .where(Track.album.in_(chunk), Track.genre.is_null(False))
+                .distinct()
+                .order_by(Track.album, Track.genre)
+                .tuples()
+            ):
+                genres.setdefault(album_id, []).append(genre)
+
+            covers = {}
+            for album_id, folder_id in (
+                Track.select(Track.album, Track.folder)
+                .join(Folder, on=Track.folder == Folder.id)
+                .where(Track.album.in_(chunk), Folder.cover_art.is_null(False))
+                .distinct()
+                .tuples()
+            ):
+                covers.setdefault(album_id, str(folder_id))
+            uncovered = [a for a in chunk if a in stats and a not in covers]
+            if uncovered:
+                for album_id, track_id in (
+                    Track.select(Track.album, Track.id)
+                    .where(Track.album.in_(uncovered), Track.has_art)
+                    .tuples()
+                ):
+                    covers.setdefault(album_id, str(track_id))
+
+            for album_id in chunk:
+                if album_id in stats:
+                    stats[album_id].genres = ", ".join(genres.get(album_id, ())) or None
+                    stats[album_id].cover_art = covers.get(album_id)
+        return stats
+
+    @classmethod
+    def load(cls, album_ids, chunk_size=500):
+        """Rows by album id for ``album_ids``, with a computed one where none is stored."""
+        album_ids = list(album_ids)
+        stats = {}
+        for start in range(0, len(album_ids), chunk_size):
+            chunk = album_ids[start : start + chunk_size]
+            stats.update((row.album_id, row) for row in cls.select().where(cls.album.in_(chunk)))
+        stats.update(cls.compute([album_id for album_id in album_ids if album_id not in stats]))
+        return stats
+
+    @classmethod
+    def missing(cls):
+        """Ids of the albums without a stored row."""
+        query = Album.select(Album.id).where(*_unreferenced(Album.id, cls.album))
+        return [album_id for (album_id,) in query.tuples()]
+
+    @classmethod
+    def refresh(cls, album_ids, chunk_size=500):
+        """Recompute the rows of ``album_ids``, dropping those of albums left without tracks."""
+        album_ids = list(album_ids)
+        for start in range(0, len(album_ids), chunk_size):
+            chunk = album_ids[start : start + chunk_size]
+            rows = cls.compute(chunk, chunk_size)
+            cls.delete().where(cls.album.in_(chunk)).execute()
+            if rows:
+                cls.insert_many([row.__data__ for row in rows.values()]).execute()
+
+
+class ArtistStats(_Model):
+    """Number of albums of each artist, as album artist or through AlbumArtist.
+
+    Maintained like AlbumStats, for the artists of the albums the scanner touched.
+    """
+
+    artist = ForeignKeyField(Artist, primary_key=True, backref="+", on_delete="CASCADE")
+    album_count = IntegerField()
+
+    class Meta:
+        table_name = "artist_stats"
+
+    @classmethod
+    def compute(cls, artist_ids, chunk_size=500):
+        """Unsaved rows, by artist id, for those of ``artist_ids`` that still exist."""
+        artist_ids = list(artist_ids)
+        albums = {}
+        for start in range(0, len(artist_ids), chunk_size):
+            chunk = artist_ids[start : start + chunk_size]
+            albums.update(
+                (artist_id, set())
+                for (artist_id,) in Artist.select(Artist.id).where(Artist.id.in_(chunk)).tuples()
+            )
+            for query in (
+                Album.select(Album.artist, Album.id).where(Album.artist.in_(chunk)),
+                AlbumArtist.select(AlbumArtist.artist_id, AlbumArtist.album_id).where(
+                    AlbumArtist.artist_id.in_(chunk)
+                ),
+            ):
+                for artist_id, album_id in query.tuples():
+                    albums[artist_id].add(album_id)
+        return {
+            artist_id: cls(artist=artist_id, album_count=len(album_ids))
+            for artist_id, album_ids in albums.items()
+        }
+
+    @classmethod
+    def load(cls, artist_ids, chunk_size=500):
+        """Rows by artist id for ``artist_ids``, with a computed one where none is stored."""
+        artist_ids = list(artist_ids)
+        stats = {}
+        for start in range(0, len(artist_ids), chunk_size):
+            chunk = artist_ids[start : start + chunk_size]
+            stats.update((row.artist_id, row) for row in cls.select().where(cls.artist.in_(chunk)))
+        stats.update(cls.compute([artist_id for artist_id in artist_ids if artist_id not in stats]))
+        return stats
+
+    @classmethod
+    def missing(cls):
+        """Ids of the artists without a stored row."""
+        query = Artist.select(Artist.id).where(*_unreferenced(Artist.id, cls.artist))
+        return [artist_id for (artist_id,) in query.tuples()]
+
+    @classmethod
+    def refresh(cls, artist_ids, chunk_size=500):
+        """Recompute the rows of ``artist_ids``."""
+        artist_ids = list(artist_ids)
+        for start in range(0, len(artist_ids), chunk_size):
+            chunk = artist_ids[start : start + chunk_size]
+            rows = cls.compute(chunk, chunk_size)
+            cls.delete().where(cls.artist.in_(chunk)).execute()
+            if rows:
+                cls.insert_many([row.__data__ for row in rows.values()]).execute()
+
+
+class TrackHash(_Model):
+    """Content digest of a track's file as of its size and mtime, see scanner_hash."""
+
+    track = ForeignKeyField(Track, primary_key=True, backref="+", on_delete="CASCADE")
+    algorithm = CharField(16)
+    digest = CharField(64)
+    size = BigIntegerField()
+    mtime_ns = BigIntegerField()
+    updated = DateTimeField(default=now)
+
+    class Meta:
+        table_name = "track_hash"
+
+
+class CoverCandidate(_Model):
+    """Image file of a folder, with its validity and naming score as of its size and mtime.
+
+    See scanner_cover_index.
+    """
+
+    id = AutoField()
+    folder = ForeignKeyField(Folder, backref="+", on_delete="CASCADE")
+    name = CharField()
+    size = BigIntegerField()
+    mtime_ns = BigIntegerField()
+    valid = BooleanField()
+    score = IntegerField()  # Naming rules only, the album name bonus depends on the caller.
+
+    class Meta:
+        table_name = "cover_candidate"
+        indexes = ((("folder", "name"), True),)
+
+
+class ScanCheckpoint(_Model):
+    """Progress of an interrupted scan, see scanner_checkpoint."""
+
+    name = CharField(32, primary_key=True)
+    forced = BooleanField(default=False)
+    current_root = CharField(null=True)
+    queue_json = TextField(default="[]")  # Root folders still to scan.
+    cursor_json = TextField(default="[]")  # Completed directories of current_root.
+    root_scanned = IntegerField(default=0)
+    scanned = IntegerField(default=0)
+    stages_json = TextField(default="[]")  # Post-scan stages still to run.
+    dirty_json = TextField(default="{}")
+    updated = DateTimeField(default=now)
+
+    class Meta:
+        table_name = "scan_checkpoint"
+
+
+IDENTITY_GENERATION_KEY = "identity_generation"
+LIBRARY_GENERATION_KEY = "library_generation"
+
+
+def _bump_generation(key):
+    value = uuid.uuid4().hex
+    if not Meta.update(value=value).where(Meta.key == key).execute():
+        Meta.create(key=key, value=value)
+
+
+# Changes whenever artists or albums are merged or renamed outside the scanner,
+# so that caches of resolved rows (see scanner_lookup) know to start over.
+def get_identity_generation():
+    row = Meta.get_or_none(Meta.key == IDENTITY_GENERATION_KEY)
+    return row.value if row is not None else None
+
+
+def bump_identity_generation():
+    _bump_generation(IDENTITY_GENERATION_KEY)
+
+
+# Changes whenever tracks, albums, artists or folders were added, changed or
+# removed, by the scanner (see pruneLibrary) or the metadata editor. Together
+# with the identity generation, it dates what is built from the whole library,
+# like the artist indexes of the API.
+def get_library_generation():
+    values = dict(
+        Meta.select(Meta.key, Meta.value)
+        .where(Meta.key.in_((LIBRARY_GENERATION_KEY, IDENTITY_GENERATION_KEY)))
+        .tuples()
+    )
+    return values.get(LIBRARY_GENERATION_KEY), values.get(IDENTITY_GENERATION_KEY)
+
+
+def bump_library_generation():
+    _bump_generation(LIBRARY_GENERATION_KEY)
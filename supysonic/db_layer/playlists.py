@@ -27,21 +27,29 @@ class Playlist(_Model):
 
         return serialize_playlist(self, user, tracks)
 
-    def get_tracks(self):
+    def get_tracks(self, chunk_size=500):
         if not self.tracks:
             return []
 
-        tracks = []
+        ids = []
         should_fix = False
-
         for t in self.tracks.split(","):
             try:
-                tid = UUID(t)
-                track = Track[tid]
-                tracks.append(track)
-            except (ValueError, Track.DoesNotExist):
+                ids.append(UUID(t))
+            except ValueError:
                 should_fix = True
 
+        # Loaded in chunks, the playlist may hold the same track more than once.
+        found = {}
+        unique_ids = list(dict.fromkeys(ids))
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start : start + chunk_size]
+            found.update((track.id, track) for track in Track.select().where(Track.id.in_(chunk)))
+
+        tracks = [found[tid] for tid in ids if tid in found]
+        if len(tracks) < len(ids):
+            should_fix = True
+
         if should_fix:
             self.tracks = ",".join(str(t.id) for t in tracks)
             self.save()
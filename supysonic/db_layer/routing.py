@@ -0,0 +1,74 @@
+import os.path
+from threading import local
+from urllib.parse import quote
+
+from peewee import SelectBase
+from playhouse.pool import PooledDatabase
+
+from .core import db
+
+_routing = local()
+
+
+class ReadRoutingMixin:
+    """Send SELECT queries to ``reader`` on threads between ``begin_read_routing()``
+    and ``end_read_routing()``.
+
+    Queries issued while the write connection of the thread has a transaction
+    open stay on it, they may depend on what the transaction wrote.
+    """
+
+    reader = None
+
+    def execute(self, query, **context_options):
+        if (
+            self.reader is not None
+            and getattr(_routing, "active", False)
+            and isinstance(query, SelectBase)
+            and not self.in_transaction()
+        ):
+            return self.reader.execute(query, **context_options)
+        return super().execute(query, **context_options)
+
+
+def routed_sqlite_database(db_class, args, extra=None):
+    """A ``db_class`` instance for ``args`` whose reads can go through read-only
+    connections to the same file.
+    """
+    extra = extra or {}
+    routed = type(db_class.__name__, (ReadRoutingMixin, db_class), {})
+    database = routed(**args, **extra)
+
+    path = quote(os.path.abspath(database.database))
+    # The journal mode is the writer's business, a read-only connection can't change it.
+    pragmas = {
+        key: value
+        for key, value in args.get("pragmas", {}).items()
+        if key not in ("journal_mode", "synchronous")
+    }
+    pragmas["query_only"] = 1
+    reader_args = dict(args, database=f"file:{path}?mode=ro", uri=True, pragmas=pragmas)
+    database.reader = db_class(**reader_args, **extra)
+    return database
+
+
+def begin_read_routing():
+    _routing.active = True
+
+
+def end_read_routing():
+    """Stop routing the reads of the thread and give its read connection back."""
+    _routing.active = False
+    reader = getattr(db.obj, "reader", None)
+    if reader is not None and not reader.is_closed():
+        reader.close()
+
+
+def release_reader(database):
+    reader = getattr(database, "reader", None)
+    if reader is None:
+        return
+    if isinstance(reader, PooledDatabase):
+        reader.close_all()
+    else:
+        reader.close()
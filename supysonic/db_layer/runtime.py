@@ -1,14 +1,73 @@
 import importlib
 import os.path
+from contextlib import contextmanager
 from urllib.parse import urlparse
 
+from peewee import SqliteDatabase
 from playhouse.db_url import parseresult_to_dict, schemes
+from playhouse.pool import PooledDatabase
 
 from .core import Meta, db
+from .routing import release_reader, routed_sqlite_database
 from .schema import SCHEMA_VERSION, execute_sql_resource_script, list_migrations
-
-
-def init_database(database_uri):
+from .search import SEARCH_INDEX_VERSION, SearchIndex, install_search_index
+
+# PRAGMAs set on every SQLite connection, by ``sqlite_profile``. ``performance``
+# lets readers go on while a scan writes and waits on locks rather than failing,
+# it is opt-in as it moves the database to WAL mode.
+SQLITE_PROFILES = {
+    # WAL mode sticks to the database file, it has to be turned off explicitly.
+    "compatible": {"foreign_keys": 1, "journal_mode": "delete"},
+    "performance": {
+        "foreign_keys": 1,
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "temp_store": "memory",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "busy_timeout": 5000,
+    },
+}
+SQLITE_TUNABLES = ("cache_size", "mmap_size", "busy_timeout")
+
+
+def sqlite_pragmas(settings=None):
+    """PRAGMAs of the ``sqlite_profile`` in ``settings``, ``sqlite_<pragma>`` keys override them."""
+    settings = settings or {}
+    profile = settings.get("sqlite_profile") or "compatible"
+    if profile not in SQLITE_PROFILES:
+        raise RuntimeError(f"Unsupported SQLite profile: {profile}")
+
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for name in SQLITE_TUNABLES:
+        value = settings.get(f"sqlite_{name}")
+        if value is not None:
+            pragmas[name] = int(value)
+    return pragmas
+
+
+def pool_arguments(settings=None):
+    """Arguments of the ``playhouse.pool`` database classes, ``None`` when pooling is off."""
+    settings = settings or {}
+    if not settings.get("database_pool"):
+        return None
+    return {
+        "max_connections": int(settings.get("database_max_connections") or 20),
+        "stale_timeout": int(settings.get("database_stale_timeout") or 300),
+        "timeout": int(settings.get("database_pool_timeout") or 10),
+    }
+
+
+def _is_memory_database(database):
+    return not database or database == ":memory:" or "mode=memory" in database
+
+
+def init_database(database_uri, settings=None):
+    """Bind ``db`` to ``database_uri``, creating or migrating the schema.
+
+    ``settings`` is the ``[base]`` configuration section: the connection pool
+    and, for SQLite, the connection PRAGMAs and read routing.
+    """
     uri = urlparse(database_uri)
     args = parseresult_to_dict(uri)
     if uri.scheme.startswith("mysql"):
@@ -21,17 +80,35 @@ def init_database(database_uri):
         provider = "postgres"
     elif uri.scheme.startswith("sqlite"):
         provider = "sqlite"
-        args["pragmas"] = {"foreign_keys": 1}
+        args["pragmas"] = sqlite_pragmas(settings)
     else:
         raise RuntimeError(f"Unsupported database: {uri.scheme}")
 
     db_class = schemes.get(uri.scheme)
     temp = db_class(**args)
-    if uri.scheme == "sqlite":
+    pool_args = pool_arguments(settings)
+    read_routing = provider == "sqlite" and bool((settings or {}).get("sqlite_read_routing"))
+    if provider == "sqlite":
         database_dir = os.path.dirname(temp.database)
         if database_dir:
             os.makedirs(database_dir, exist_ok=True)
-    db.initialize(db_class(**args))
+        # Every connection to an in-memory database is a database of its own.
+        if _is_memory_database(temp.database):
+            pool_args = None
+            read_routing = False
+        elif pool_args is not None:
+            # A pooled connection is handed to another thread once released.
+            pool_args["check_same_thread"] = False
+
+    # Migrations connect on their own from ``args``, pool arguments stay out of it.
+    if pool_args is not None and not uri.scheme.endswith("+pool"):
+        db_class = schemes[f"{uri.scheme}+pool"]
+    else:
+        pool_args = {}
+    if read_routing:
+        db.initialize(routed_sqlite_database(db_class, args, pool_args))
+    else:
+        db.initialize(db_class(**args, **pool_args))
     db.connect()
 
     # Check if we should create the tables
@@ -64,12 +141,24 @@ def init_database(database_uri):
                 )
                 m.apply(args.copy())
 
+        # Index the libraries scanned before the search index existed, once
+        # with the migration rather than on every start.
+        if version.value < SEARCH_INDEX_VERSION:
+            with db.atomic():
+                SearchIndex.fill()
+
         version.value = SCHEMA_VERSION
         version.save()
 
+    install_search_index()
+
 
 def release_database():
-    db.close()
+    release_reader(db.obj)
+    if isinstance(db.obj, PooledDatabase):
+        db.close_all()
+    else:
+        db.close()
     db.initialize(None)
 
 
@@ -79,3 +168,35 @@ def open_connection(reuse=False):
 
 def close_connection():
     db.close()
+
+
+@contextmanager
+def connection_context():
+    """Run a block on the thread's connection, checking one out only if it has none.
+
+    A connection the thread already held, such as the one of a web request, is
+    left open for its owner.
+    """
+    opened = db.connect(reuse_if_open=True)
+    try:
+        yield
+    finally:
+        if opened:
+            db.close()
+
+
+def optimize_database(truncate_wal=False):
+    """Checkpoint the SQLite write-ahead log and let SQLite refresh its statistics.
+
+    The log is only truncated when ``truncate_wal`` is set, as that waits for
+    readers and writers to be done. Returns the number of pages moved back to
+    the database, ``None`` for other databases.
+    """
+    if not isinstance(db.obj, SqliteDatabase):
+        return None
+
+    mode = "TRUNCATE" if truncate_wal else "PASSIVE"
+    # (busy, log pages, checkpointed pages), -1 when not in WAL mode.
+    _, _, checkpointed = db.execute_sql(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    db.execute_sql("PRAGMA optimize")
+    return max(checkpointed, 0)
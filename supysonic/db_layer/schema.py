@@ -2,7 +2,7 @@ import sys
 
 from .core import db
 
-SCHEMA_VERSION = "20260608"
+SCHEMA_VERSION = "20261025"
 RESOURCE_PACKAGE = "supysonic"
 
 
@@ -0,0 +1,277 @@
+import logging
+import unicodedata
+
+from peewee import (
+    AutoField,
+    Column,
+    Expression,
+    ForeignKeyField,
+    MySQLDatabase,
+    OperationalError,
+    PostgresqlDatabase,
+    SqliteDatabase,
+    Table,
+    TextField,
+    fn,
+)
+from playhouse.mysql_ext import Match
+
+from .core import _Model, db
+from .library import Album, Artist, Folder, Track, _unreferenced
+
+logger = logging.getLogger(__name__)
+
+# Scripts without spaces between words. Their runs are indexed as overlapping
+# character pairs so that any part of a name can be looked up.
+_CJK_RANGES = (
+    (0x2E80, 0x2FDF),  # radicals
+    (0x3040, 0x30FF),  # hiragana, katakana
+    (0x3100, 0x31FF),  # bopomofo, hangul compatibility jamo, katakana extensions
+    (0x3400, 0x4DBF),  # ideographs extension A
+    (0x4E00, 0x9FFF),  # unified ideographs
+    (0xA960, 0xA97F),  # hangul jamo extended A
+    (0xAC00, 0xD7FF),  # hangul syllables, jamo extended B
+    (0xF900, 0xFAFF),  # compatibility ideographs
+    (0x20000, 0x3FFFF),  # ideographs extensions B and later
+)
+
+
+def _is_cjk(char):
+    code = ord(char)
+    return any(low <= code <= high for low, high in _CJK_RANGES)
+
+
+def _fold(char):
+    # Kana voicing marks and the like are part of the character, only other
+    # scripts lose their accents.
+    if _is_cjk(char):
+        return char
+    decomposed = unicodedata.normalize("NFKD", char)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _runs(text):
+    """``(is_cjk, run)`` pairs of the letters and digits of ``text``."""
+    run, run_cjk = [], False
+    for char in unicodedata.normalize("NFKC", text or "").casefold():
+        for folded in _fold(char):
+            if not folded.isalnum():
+                if run:
+                    yield run_cjk, "".join(run)
+                run = []
+                continue
+            cjk = _is_cjk(folded)
+            if run and cjk != run_cjk:
+                yield run_cjk, "".join(run)
+                run = []
+            run.append(folded)
+            run_cjk = cjk
+    if run:
+        yield run_cjk, "".join(run)
+
+
+def search_terms(text, query=False):
+    """Words of ``text`` as stored in, or looked up from, the search index.
+
+    Case and accents are dropped. CJK runs become overlapping pairs of
+    characters, the index also gets the last character of each run on its own
+    so that every character starts a term prefix searches can reach.
+    """
+    terms = []
+    for cjk, run in _runs(text):
+        if not cjk or len(run) == 1:
+            terms.append(run)
+            continue
+        terms.extend(run[i : i + 2] for i in range(len(run) - 1))
+        if not query:
+            terms.append(run[-1])
+    return terms
+
+
+class SearchIndex(_Model):
+    """Normalized name of a folder, artist, album or track, see ``search_terms``.
+
+    Exactly one of the references is set. Rows go away with what they index,
+    the scanner and the metadata editor refresh those whose name changed.
+    """
+
+    id = AutoField()
+    folder = ForeignKeyField(Folder, null=True, backref="+", on_delete="CASCADE")
+    artist = ForeignKeyField(Artist, null=True, backref="+", on_delete="CASCADE")
+    album = ForeignKeyField(Album, null=True, backref="+", on_delete="CASCADE")
+    track = ForeignKeyField(Track, null=True, backref="+", on_delete="CASCADE")
+    terms = TextField()
+
+    class Meta:
+        table_name = "search_index"
+
+    @classmethod
+    def _source(cls, field):
+        return {
+            "folder": (Folder, Folder.name),
+            "artist": (Artist, Artist.name),
+            "album": (Album, Album.name),
+            "track": (Track, Track.title),
+        }[field.name]
+
+    @classmethod
+    def _field(cls, model):
+        return {Folder: cls.folder, Artist: cls.artist, Album: cls.album, Track: cls.track}[model]
+
+    @classmethod
+    def compute(cls, field, ids, chunk_size=500):
+        """Unsaved rows for those of ``ids`` that still exist, ``field`` telling what they are."""
+        model, name = cls._source(field)
+        ids = list(ids)
+        rows = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            for entity_id, value in model.select(model.id, name).where(model.id.in_(chunk)).tuples():
+                rows.append(cls(**{field.name: entity_id, "terms": " ".join(search_terms(value))}))
+        return rows
+
+    @classmethod
+    def missing(cls, field):
+        """Ids of what ``field`` references that has no row yet."""
+        model, _ = cls._source(field)
+        query = model.select(model.id).where(*_unreferenced(model.id, field))
+        return [entity_id for (entity_id,) in query.tuples()]
+
+    @classmethod
+    def refresh(cls, field, ids, chunk_size=500):
+        """Recompute the rows of ``ids``."""
+        ids = list(ids)
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start : start + chunk_size]
+            rows = cls.compute(field, chunk, chunk_size)
+            cls.delete().where(field.in_(chunk)).execute()
+            if rows:
+                cls.insert_many([row.__data__ for row in rows]).execute()
+
+    @classmethod
+    def fill(cls):
+        """Add the rows of everything not indexed yet."""
+        for field in (cls.folder, cls.artist, cls.album, cls.track):
+            cls.refresh(field, cls.missing(field))
+
+    @classmethod
+    def search(cls, model, query):
+        """``model`` rows matching every word of ``query``, best matches first.
+
+        Each word also matches the words it starts. ``None`` when ``query`` has
+        nothing to look up, like punctuation only.
+        """
+        terms = search_terms(query, query=True)
+        if not terms:
+            return None
+        field = cls._field(model)
+        matches = search_backend().matches(field, terms).alias("matches")
+        return (
+            model.select()
+            .join(matches, on=(model.id == matches.c.entity))
+            .order_by(matches.c.rank, model.id)
+        )
+
+
+# The backends rank best matches lowest.
+
+
+class LikeSearch:
+    """Pattern matching over the terms column, for SQLite builds without FTS5."""
+
+    def matches(self, field, terms):
+        conditions = [
+            SearchIndex.terms.startswith(term) | SearchIndex.terms.contains(" " + term)
+            for term in terms
+        ]
+        # Shorter names have fewer words the query left out.
+        rank = fn.LENGTH(SearchIndex.terms)
+        return SearchIndex.select(field.alias("entity"), rank.alias("rank")).where(
+            field.is_null(False), *conditions
+        )
+
+
+class SqliteSearch:
+    """FTS5 table over ``search_index``, kept in sync by triggers."""
+
+    fts = Table("search_fts")
+
+    def matches(self, field, terms):
+        expression = " ".join(f'"{term}"*' for term in terms)
+        return (
+            SearchIndex.select(field.alias("entity"), self.fts.c.rank.alias("rank"))
+            .join(self.fts, on=(self.fts.c.rowid == SearchIndex.id))
+            .where(field.is_null(False), Expression(self.fts.c.search_fts, "MATCH", expression))
+        )
+
+
+class PostgresSearch:
+    """Generated ``tsvector`` column of ``search_index`` with a GIN index."""
+
+    def matches(self, field, terms):
+        document = Column(SearchIndex._meta.table, "document")
+        query = fn.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        return SearchIndex.select(
+            field.alias("entity"), (fn.ts_rank(document, query) * -1).alias("rank")
+        ).where(field.is_null(False), Expression(document, "@@", query))
+
+
+class MySQLSearch:
+    """FULLTEXT index of ``search_index``, queried in boolean mode."""
+
+    def matches(self, field, terms):
+        match = Match(SearchIndex.terms, " ".join(f"+{term}*" for term in terms), "IN BOOLEAN MODE")
+        return SearchIndex.select(field.alias("entity"), (match * -1).alias("rank")).where(
+            field.is_null(False), match
+        )
+
+
+_SQLITE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+    "terms, content='search_index', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS search_index_insert AFTER INSERT ON search_index BEGIN "
+    "INSERT INTO search_fts(rowid, terms) VALUES (new.id, new.terms); END",
+    "CREATE TRIGGER IF NOT EXISTS search_index_delete AFTER DELETE ON search_index BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, terms) VALUES ('delete', old.id, old.terms); END",
+    "CREATE TRIGGER IF NOT EXISTS search_index_update AFTER UPDATE ON search_index BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, terms) VALUES ('delete', old.id, old.terms); "
+    "INSERT INTO search_fts(rowid, terms) VALUES (new.id, new.terms); END",
+)
+
+
+def _install_sqlite_fts(database):
+    # Statements with triggers don't fit the ';' separated schema scripts, and
+    # not every SQLite build comes with FTS5.
+    created = not database.table_exists("search_fts")
+    try:
+        with database.atomic():
+            for statement in _SQLITE_FTS:
+                database.execute_sql(statement)
+            if created:
+                database.execute_sql("INSERT INTO search_fts(search_fts) VALUES ('rebuild')")
+    except OperationalError as e:
+        logger.warning("Full-text search unavailable, falling back to pattern matching: %s", e)
+        return False
+    return True
+
+
+# Schema version that added ``search_index``, migrating past it fills the table.
+SEARCH_INDEX_VERSION = "20261025"
+
+
+def install_search_index():
+    """Set up the full-text search of the bound database."""
+    database = db.obj
+    if isinstance(database, SqliteDatabase):
+        database.search_fts = _install_sqlite_fts(database)
+
+
+def search_backend():
+    database = db.obj
+    if isinstance(database, PostgresqlDatabase):
+        return PostgresSearch()
+    if isinstance(database, MySQLDatabase):
+        return MySQLSearch()
+    if getattr(database, "search_fts", False):
+        return SqliteSearch()
+    return LikeSearch()
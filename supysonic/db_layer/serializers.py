@@ -50,21 +50,39 @@ def serialize_folder_child(folder, user):
 
 
 def serialize_folder_artist(folder, user):
-    from .annotations import StarredFolder
+    return serialize_folder_artists([folder], user)[0]
 
-    info = {"id": str(folder.id), "name": folder.name}
 
-    try:
-        starred = StarredFolder[user.id, folder.id]
-        info["starred"] = starred.date.isoformat()
-    except StarredFolder.DoesNotExist:
-        pass
+def serialize_folder_artists(folders, user):
+    """``serialize_folder_artist`` for each of ``folders``, in order."""
+    from .annotations import StarredFolder
 
-    return info
+    # A user stars few folders, reading them all beats an IN () as long as the index.
+    starred = dict(
+        StarredFolder.select(StarredFolder.starred, StarredFolder.date)
+        .where(StarredFolder.user == user.id)
+        .tuples()
+    )
+
+    result = []
+    for folder in folders:
+        info = {"id": str(folder.id), "name": folder.name}
+        if folder.id in starred:
+            info["starred"] = starred[folder.id].isoformat()
+        result.append(info)
+    return result
 
 
 def serialize_folder_directory(folder, user, client):
-    from .library import Folder
+    from .library import Album, Artist, Folder, Track
+
+    # Albums and their artists come along, the sort key needs them.
+    tracks = (
+        Track.select(Track, Album, Artist)
+        .join(Album)
+        .join(Artist)
+        .where(Track.folder == folder)
+    )
 
     info = {
         "id": str(folder.id),
@@ -73,10 +91,7 @@ def serialize_folder_directory(folder, user, client):
             f.as_subsonic_child(user)
             for f in folder.children.order_by(fn.lower(Folder.name))
         ]
-        + [
-            t.as_subsonic_child(user, client)
-            for t in sorted(folder.tracks, key=lambda t: t.sort_key())
-        ],
+        + serialize_tracks(sorted(tracks, key=lambda t: t.sort_key()), user, client),
     }
     if not folder.root:
         info["parent"] = str(folder.parent.id)
@@ -85,198 +100,320 @@ def serialize_folder_directory(folder, user, client):
 
 
 def serialize_artist(artist, user):
+    return serialize_artists([artist], user)[0]
+
+
+def serialize_artists(artists, user, stats=None):
+    """``serialize_artist`` for each of ``artists``, in order.
+
+    Album counts come from the artists' statistics, pass ``stats`` when they
+    are at hand already (see ``ArtistStats.load()``).
+    """
     from .annotations import StarredArtist
-    from .library import Album, AlbumArtist
-
-    album_count = (
-        Album.select()
-        .distinct()
-        .join(
-            AlbumArtist,
-            join_type="LEFT OUTER JOIN",
-            on=(Album.id == AlbumArtist.album_id),
-        )
-        .where(
-            (Album.artist == artist)
-            | (AlbumArtist.artist_id == artist)
-        )
-        .count()
+    from .library import ArtistStats
+
+    artists = list(artists)
+    if not artists:
+        return []
+    if stats is None:
+        stats = ArtistStats.load(artist.id for artist in artists)
+    # Same as for folders, the stars of the user are fewer than the artists listed.
+    starred = dict(
+        StarredArtist.select(StarredArtist.starred, StarredArtist.date)
+        .where(StarredArtist.user == user.id)
+        .tuples()
     )
 
-    info = {
-        "id": str(artist.id),
-        "name": artist.name,
-        "coverArt": "ar-" + str(artist.id),
-        "albumCount": album_count,
-    }
-
-    try:
-        starred = StarredArtist[user.id, artist.id]
-        info["starred"] = starred.date.isoformat()
-    except StarredArtist.DoesNotExist:
-        pass
-    return info
+    result = []
+    for artist in artists:
+        artist_stats = stats.get(artist.id)
+        info = {
+            "id": str(artist.id),
+            "name": artist.name,
+            "coverArt": "ar-" + str(artist.id),
+            "albumCount": artist_stats.album_count if artist_stats is not None else 0,
+        }
+        if artist.id in starred:
+            info["starred"] = starred[artist.id].isoformat()
+        result.append(info)
+    return result
 
 
 def serialize_album(album, user, server_type=None):
+    return serialize_albums([album], user, server_type)[0]
+
+
+def serialize_albums(albums, user, server_type=None):
+    """``serialize_album`` for each of ``albums``, in order.
+
+    Song count, duration, genres and cover come from the albums' statistics,
+    artists and stars are loaded for all the albums together.
+    """
     from .annotations import StarredAlbum
-    from .library import Folder, Track
+    from .library import AlbumArtist, AlbumStats
 
+    albums = list(albums)
+    if not albums:
+        return []
+    album_ids = [album.id for album in albums]
     server_name = (server_type or "").lower()
     is_music_client = "music" in server_name
-    duration, created = album.tracks.select(
-        fn.sum(Track.duration), fn.min(Track.created)
-    ).scalar(as_tuple=True)
-    all_artists = album.get_all_artists()
-    info = {
-        "id": str(album.id),
-        "name": str(album.name),
-        "artist": str(album.artist.get_artist_name()),
-        "artistId": str(album.artist.id),
-        "songCount": album.tracks.count(),
-        "duration": duration,
-        "created": created.isoformat(),
-    }
 
+    stats = AlbumStats.load(album_ids)
+    participants = {}
     if is_music_client:
-        info["albumArtist"] = str(album.artist.get_artist_name())
-        info["albumArtistId"] = str(album.artist.id)
-        info["smallImageUrl"] = ""
-        info["mediumImageUrl"] = ""
-        info["largeImageUrl"] = ""
-        participants = {"albumartist": [], "artist": []}
-
-        for artist in all_artists:
-            participants["artist"].append(
-                {"id": str(artist.id), "name": str(artist.get_artist_name())}
-            )
-        info["participants"] = participants
-        info["coverArt"] = "al-" + str(album.id)
-    else:
-        track_with_cover = (
-            album.tracks.join(Folder).where(Folder.cover_art.is_null(False)).first()
+        for album_id, artist_id in _select_in(
+            AlbumArtist.select(AlbumArtist.album_id, AlbumArtist.artist_id)
+            .order_by(AlbumArtist.position)
+            .tuples(),
+            AlbumArtist.album_id,
+            album_ids,
+        ):
+            participants.setdefault(album_id, []).append(artist_id)
+    artist_names = _artist_names(
+        {album.artist_id for album in albums}.union(*participants.values())
+    )
+    starred = dict(
+        _select_in(
+            StarredAlbum.select(StarredAlbum.starred, StarredAlbum.date)
+            .where(StarredAlbum.user == user.id)
+            .tuples(),
+            StarredAlbum.starred,
+            album_ids,
         )
-        if track_with_cover is not None:
-            info["coverArt"] = str(track_with_cover.folder.id)
-        else:
-            track_with_cover = album.tracks.where(Track.has_art).first()
-            if track_with_cover is not None:
-                info["coverArt"] = str(track_with_cover.id)
-    if album.year:
-        info["year"] = album.year
-
-    album_info = {}
-    if album.album_info_json:
-        try:
-            album_info_value = json.loads(album.album_info_json)
-        except (TypeError, ValueError):
-            album_info_value = {}
-        if isinstance(album_info_value, dict):
-            album_info = album_info_value
+    )
 
-    if is_music_client:
-        if album.release_date:
-            info["releaseDate"] = album.release_date
-        if album.release_type:
-            info["releaseType"] = album.release_type
-
-        styles = album_info.get("styles")
-        if isinstance(styles, list) and styles:
-            info["styles"] = [str(style) for style in styles if style]
-
-        musicbrainz_id = album_info.get("musicbrainz_id")
-        if musicbrainz_id:
-            info["musicBrainzId"] = str(musicbrainz_id)
-
-        discogs_id = album_info.get("discogs_id")
-        if discogs_id:
-            info["discogsId"] = str(discogs_id)
-
-    genre = ", ".join(
-        g
-        for (g,) in album.tracks.select(Track.genre)
-        .where(Track.genre.is_null(False))
-        .distinct()
-        .tuples()
+    result = []
+    for album in albums:
+        album_stats = stats.get(album.id)
+        artist_name = artist_names[album.artist_id]
+        info = {
+            "id": str(album.id),
+            "name": str(album.name),
+            "artist": str(artist_name),
+            "artistId": str(album.artist_id),
+            "songCount": album_stats.song_count if album_stats is not None else 0,
+            "duration": album_stats.duration if album_stats is not None else 0,
+        }
+        # An album without tracks is only waiting to be pruned.
+        if album_stats is not None:
+            info["created"] = album_stats.created.isoformat()
+
+        if is_music_client:
+            info["albumArtist"] = str(artist_name)
+            info["albumArtistId"] = str(album.artist_id)
+            info["smallImageUrl"] = ""
+            info["mediumImageUrl"] = ""
+            info["largeImageUrl"] = ""
+            info["participants"] = {
+                "albumartist": [],
+                "artist": [
+                    {"id": str(artist_id), "name": str(artist_names[artist_id])}
+                    for artist_id in participants.get(album.id, [album.artist_id])
+                ],
+            }
+            info["coverArt"] = "al-" + str(album.id)
+        elif album_stats is not None and album_stats.cover_art:
+            info["coverArt"] = album_stats.cover_art
+        if album.year:
+            info["year"] = album.year
+
+        album_info = {}
+        if album.album_info_json:
+            try:
+                album_info_value = json.loads(album.album_info_json)
+            except (TypeError, ValueError):
+                album_info_value = {}
+            if isinstance(album_info_value, dict):
+                album_info = album_info_value
+
+        if is_music_client:
+            if album.release_date:
+                info["releaseDate"] = album.release_date
+            if album.release_type:
+                info["releaseType"] = album.release_type
+
+            styles = album_info.get("styles")
+            if isinstance(styles, list) and styles:
+                info["styles"] = [str(style) for style in styles if style]
+
+            musicbrainz_id = album_info.get("musicbrainz_id")
+            if musicbrainz_id:
+                info["musicBrainzId"] = str(musicbrainz_id)
+
+            discogs_id = album_info.get("discogs_id")
+            if discogs_id:
+                info["discogsId"] = str(discogs_id)
+
+        if album_stats is not None and album_stats.genres:
+            info["genre"] = album_stats.genres
+
+        if album.id in starred:
+            info["starred"] = starred[album.id].isoformat()
+
+        result.append(info)
+    return result
+
+
+def _select_in(query, field, ids, chunk_size=500):
+    # Keeps each IN () under the bound parameter limit of SQLite.
+    ids = list(ids)
+    for start in range(0, len(ids), chunk_size):
+        yield from query.where(field.in_(ids[start : start + chunk_size]))
+
+
+def _artist_names(artist_ids):
+    """Display names by id, aliases resolved to their real artist."""
+    from .library import Artist
+
+    artists = {
+        artist_id: (name, real_artist_id)
+        for artist_id, name, real_artist_id in _select_in(
+            Artist.select(Artist.id, Artist.name, Artist.real_artist).tuples(),
+            Artist.id,
+            artist_ids,
+        )
+    }
+    real_names = dict(
+        _select_in(
+            Artist.select(Artist.id, Artist.name).tuples(),
+            Artist.id,
+            {real_id for _, real_id in artists.values() if real_id is not None},
+        )
     )
-    if genre:
-        info["genre"] = genre
+    return {
+        artist_id: real_names.get(real_id, name) if real_id is not None else name
+        for artist_id, (name, real_id) in artists.items()
+    }
 
-    try:
-        starred = StarredAlbum[user.id, album.id]
-        info["starred"] = starred.date.isoformat()
-    except StarredAlbum.DoesNotExist:
-        pass
 
-    return info
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return -1
 
 
 def serialize_track_child(track, user, prefs):
-    from .annotations import RatingTrack, StarredTrack
+    return serialize_tracks([track], user, prefs)[0]
 
-    info = {
-        "id": str(track.id),
-        "parent": str(track.folder.id),
-        "isDir": False,
-        "title": track.title,
-        "album": track.album.name,
-        "artist": track.artist.get_artist_name(),
-        "track": track.number,
-        "size": os.path.getsize(track.path) if os.path.isfile(track.path) else -1,
-        "contentType": track.mimetype,
-        "suffix": track.suffix(),
-        "duration": track.duration,
-        "bitRate": track.bitrate,
-        "path": track.path[len(track.root_folder.path) + 1 :],
-        "isVideo": False,
-        "discNumber": track.disc,
-        "created": track.created.isoformat(),
-        "albumId": str(track.album.id),
-        "artistId": str(track.artist.id),
-        "type": "music",
-    }
 
-    if track.year:
-        info["year"] = track.year
-    if track.genre:
-        info["genre"] = track.genre
-    if track.has_art:
-        info["coverArt"] = str(track.id)
-    elif track.folder.cover_art:
-        info["coverArt"] = str(track.folder.id)
+def serialize_tracks(tracks, user, prefs):
+    """``serialize_track_child`` for each of ``tracks``, in order.
 
-    try:
-        starred = StarredTrack[user.id, track.id]
-        info["starred"] = starred.date.isoformat()
-    except StarredTrack.DoesNotExist:
-        pass
-
-    try:
-        rating = RatingTrack[user.id, track.id]
-        info["userRating"] = rating.rating
-    except RatingTrack.DoesNotExist:
-        pass
-
-    avgRating = (
-        RatingTrack.select(fn.avg(RatingTrack.rating, coerce=False))
-        .where(RatingTrack.rated == track)
-        .scalar()
+    The folders, albums, artists, stars and ratings of all the tracks are loaded
+    together, the number of queries doesn't grow with the number of tracks.
+    """
+    from .annotations import RatingTrack, StarredTrack
+    from .library import Album, Folder
+
+    tracks = list(tracks)
+    if not tracks:
+        return []
+    track_ids = [track.id for track in tracks]
+
+    folders = {
+        folder_id: (path, cover_art)
+        for folder_id, path, cover_art in _select_in(
+            Folder.select(Folder.id, Folder.path, Folder.cover_art).tuples(),
+            Folder.id,
+            {track.folder_id for track in tracks} | {track.root_folder_id for track in tracks},
+        )
+    }
+    albums = dict(
+        _select_in(
+            Album.select(Album.id, Album.name).tuples(),
+            Album.id,
+            {track.album_id for track in tracks},
+        )
+    )
+    artist_names = _artist_names({track.artist_id for track in tracks})
+
+    starred = dict(
+        _select_in(
+            StarredTrack.select(StarredTrack.starred, StarredTrack.date)
+            .where(StarredTrack.user == user.id)
+            .tuples(),
+            StarredTrack.starred,
+            track_ids,
+        )
+    )
+    ratings = dict(
+        _select_in(
+            RatingTrack.select(RatingTrack.rated, RatingTrack.rating)
+            .where(RatingTrack.user == user.id)
+            .tuples(),
+            RatingTrack.rated,
+            track_ids,
+        )
+    )
+    average_ratings = dict(
+        _select_in(
+            RatingTrack.select(RatingTrack.rated, fn.avg(RatingTrack.rating, coerce=False))
+            .group_by(RatingTrack.rated)
+            .tuples(),
+            RatingTrack.rated,
+            track_ids,
+        )
     )
-    if avgRating:
-        info["averageRating"] = avgRating
 
-    if (
-        prefs is not None
-        and prefs.format is not None
-        and prefs.format != track.suffix()
-    ):
-        info["transcodedSuffix"] = prefs.format
-        info["transcodedContentType"] = (
+    transcoded = None
+    if prefs is not None and prefs.format is not None:
+        transcoded = (
+            prefs.format,
             mimetypes.guess_type("dummyname." + prefs.format, False)[0]
-            or "application/octet-stream"
+            or "application/octet-stream",
         )
 
-    return info
+    result = []
+    for track in tracks:
+        _, folder_cover = folders[track.folder_id]
+        root_path, _ = folders[track.root_folder_id]
+        info = {
+            "id": str(track.id),
+            "parent": str(track.folder_id),
+            "isDir": False,
+            "title": track.title,
+            "album": albums[track.album_id],
+            "artist": artist_names[track.artist_id],
+            "track": track.number,
+            # From the last scan, which updates it when the file changes. Only
+            # the rows scanned before sizes were stored stat the file.
+            "size": track.size if track.size is not None else _file_size(track.path),
+            "contentType": track.mimetype,
+            "suffix": track.suffix(),
+            "duration": track.duration,
+            "bitRate": track.bitrate,
+            "path": track.path[len(root_path) + 1 :],
+            "isVideo": False,
+            "discNumber": track.disc,
+            "created": track.created.isoformat(),
+            "albumId": str(track.album_id),
+            "artistId": str(track.artist_id),
+            "type": "music",
+        }
+
+        if track.year:
+            info["year"] = track.year
+        if track.genre:
+            info["genre"] = track.genre
+        if track.has_art:
+            info["coverArt"] = str(track.id)
+        elif folder_cover:
+            info["coverArt"] = str(track.folder_id)
+
+        if track.id in starred:
+            info["starred"] = starred[track.id].isoformat()
+        if track.id in ratings:
+            info["userRating"] = ratings[track.id]
+        if average_ratings.get(track.id):
+            info["averageRating"] = average_ratings[track.id]
+
+        if transcoded is not None and transcoded[0] != track.suffix():
+            info["transcodedSuffix"], info["transcodedContentType"] = transcoded
+
+        result.append(info)
+    return result
 
 
 def serialize_user(user):
@@ -5,7 +5,7 @@ import time
 from flask import current_app, request, session
 from flask_socketio import Namespace, SocketIO, emit
 
-from ..db import close_connection, open_connection
+from ..db import connection_context
 from ..logging_utils import format_log_event
 from ..managers.user import UserManager
 from .ws_store import (
@@ -174,13 +174,11 @@ def _get_session_user():
     user_id = session.get("userid")
     if not user_id:
         return None
-    open_connection(reuse=True)
-    try:
-        return UserManager.get(user_id)
-    except Exception:  # pragma: nocover
-        return None
-    finally:
-        close_connection()
+    with connection_context():
+        try:
+            return UserManager.get(user_id)
+        except Exception:  # pragma: nocover
+            return None
 
 
 def _authenticate(payload):
@@ -193,11 +191,8 @@ def _authenticate(payload):
     if not user_name or not password:
         return None
 
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         return UserManager.try_auth(user_name, password)
-    finally:
-        close_connection()
 
 
 def _broadcast_clients(user_name):
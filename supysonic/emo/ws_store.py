@@ -4,15 +4,13 @@ from ..db import (
     EmoLocalQueue,
     EmoPlaybackState,
     EmoSessionQueue,
-    close_connection,
+    connection_context,
     now,
-    open_connection,
 )
 
 
 def getQueueState(session_id):
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         record = EmoSessionQueue.get_or_none(EmoSessionQueue.session_id == session_id)
         if record is None:
             return None
@@ -24,14 +22,11 @@ def getQueueState(session_id):
             "sourceClientId": record.owner_client_id,
             "updatedAt": record.updated_at.timestamp(),
         }
-    finally:
-        close_connection()
 
 
 def saveQueueState(session_id, user_name, client_id, queue_song_ids, current_index, position_ms):
     payload = json.dumps(list(queue_song_ids), ensure_ascii=True)
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         record = EmoSessionQueue.get_or_none(EmoSessionQueue.session_id == session_id)
         if record is None:
             EmoSessionQueue.create(
@@ -52,13 +47,10 @@ def saveQueueState(session_id, user_name, client_id, queue_song_ids, current_ind
         record.version += 1
         record.updated_at = now()
         record.save()
-    finally:
-        close_connection()
 
 
 def getLocalQueueState(session_id, client_id):
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         record = EmoLocalQueue.get_or_none(
             (EmoLocalQueue.session_id == session_id)
             & (EmoLocalQueue.owner_client_id == client_id)
@@ -73,13 +65,10 @@ def getLocalQueueState(session_id, client_id):
             "positionMs": record.position_ms,
             "updatedAt": record.updated_at.timestamp(),
         }
-    finally:
-        close_connection()
 
 
 def getLocalQueueStates(session_id):
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         payloads = []
         query = EmoLocalQueue.select().where(EmoLocalQueue.session_id == session_id)
         for record in query:
@@ -94,14 +83,11 @@ def getLocalQueueStates(session_id):
                 }
             )
         return payloads
-    finally:
-        close_connection()
 
 
 def saveLocalQueueState(session_id, client_id, queue_song_ids, current_index, position_ms):
     payload = json.dumps(list(queue_song_ids), ensure_ascii=True)
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         record = EmoLocalQueue.get_or_none(
             (EmoLocalQueue.session_id == session_id)
             & (EmoLocalQueue.owner_client_id == client_id)
@@ -121,13 +107,10 @@ def saveLocalQueueState(session_id, client_id, queue_song_ids, current_index, po
         record.position_ms = position_ms
         record.updated_at = now()
         record.save()
-    finally:
-        close_connection()
 
 
 def getPlaybackState(session_id, client_id):
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         record = EmoPlaybackState.get_or_none(
             (EmoPlaybackState.session_id == session_id)
             & (EmoPlaybackState.owner_client_id == client_id)
@@ -148,13 +131,10 @@ def getPlaybackState(session_id, client_id):
             }
         )
         return payload
-    finally:
-        close_connection()
 
 
 def getPlaybackStates(session_id):
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         payloads = []
         query = EmoPlaybackState.select().where(EmoPlaybackState.session_id == session_id)
         for record in query:
@@ -172,8 +152,6 @@ def getPlaybackStates(session_id):
             )
             payloads.append(payload)
         return payloads
-    finally:
-        close_connection()
 
 
 def savePlaybackState(session_id, user_name, client_id, playback_state):
@@ -185,8 +163,7 @@ def savePlaybackState(session_id, user_name, client_id, playback_state):
     payload.pop("sessionId", None)
     payload.pop("updatedAt", None)
 
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         record = EmoPlaybackState.get_or_none(
             (EmoPlaybackState.session_id == session_id)
             & (EmoPlaybackState.owner_client_id == client_id)
@@ -213,5 +190,3 @@ def savePlaybackState(session_id, user_name, client_id, playback_state):
         record.playback_json = json.dumps(payload, ensure_ascii=True)
         record.updated_at = now()
         record.save()
-    finally:
-        close_connection()
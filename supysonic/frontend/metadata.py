@@ -9,7 +9,21 @@ from peewee import fn
 from ..config import get_current_config
 from ..daemon.client import DaemonClient
 from ..daemon.exceptions import DaemonUnavailableError
-from ..db import AlbumArtist, ClientPrefs, User, Artist, Album, Track, TrackArtist, db
+from ..db import (
+    AlbumArtist,
+    AlbumStats,
+    ArtistStats,
+    ClientPrefs,
+    SearchIndex,
+    User,
+    Artist,
+    Album,
+    Track,
+    TrackArtist,
+    bump_identity_generation,
+    bump_library_generation,
+    db,
+)
 from ..lastfm import LastFm
 from ..listenbrainz import ListenBrainz
 from ..logging_utils import format_log_event
@@ -664,6 +678,13 @@ def update_metadata_review_task_album(task_id):
             changed_fields.append("artist")
     album.save()
     syncAlbumArtists(album, previousArtistId=previous_artist_id)
+    if "artist" in changed_fields:
+        ArtistStats.refresh([previous_artist_id, album.artist_id])
+        SearchIndex.refresh(SearchIndex.artist, [album.artist_id])
+    if "name" in changed_fields:
+        SearchIndex.refresh(SearchIndex.album, [album.id])
+    if "name" in changed_fields or "artist" in changed_fields:
+        bump_identity_generation()
 
     logMetadataEvent(
         logging.INFO,
@@ -735,6 +756,10 @@ def update_metadata_review_task_tracks(task_id):
                 track.artist = resolvePrimaryArtist(track_artist)
             track.save()
             syncTrackArtists(track, previousArtistId=previous_artist_id)
+        AlbumStats.refresh([task.album.id])
+        SearchIndex.refresh(SearchIndex.track, [track.id for track, _, _ in track_updates])
+        SearchIndex.refresh(SearchIndex.artist, {track.artist_id for track, _, _ in track_updates})
+    bump_library_generation()
 
     logMetadataEvent(
         logging.INFO,
@@ -937,6 +962,8 @@ def remove_metadata_review_task_artist(task_id, artist_id):
             track.artist = task.album.artist
             track.save()
             syncTrackArtists(track, previousArtistId=previous_artist_id)
+        ArtistStats.refresh([target_artist.id])
+    bump_library_generation()
 
     logMetadataEvent(
         logging.INFO,
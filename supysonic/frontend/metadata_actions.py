@@ -1,9 +1,8 @@
 import os
-from contextlib import nullcontext
 
 from PIL import Image
 
-from supysonic.db import AlbumArtist, TrackArtist, db
+from supysonic.db import AlbumArtist, ArtistStats, SearchIndex, TrackArtist, bump_identity_generation, db
 from supysonic.tool import read_dict_from_json, write_dict_to_json
 
 
@@ -94,9 +93,7 @@ def assignPrimaryArtist(oldArtist, primaryArtist):
   if oldArtistId == resolvedPrimaryArtistId:
     raise ValueError("Primary artist must be different from the current artist")
 
-  transactionContext = db.atomic() if getattr(db, "obj", None) is not None else nullcontext()
-
-  with transactionContext:
+  with db.atomic():
     for album in list(oldArtist.albums):
       album.artist = resolvedPrimaryArtist
       album.save()
@@ -141,4 +138,7 @@ def assignPrimaryArtist(oldArtist, primaryArtist):
 
     oldArtist.real_artist = resolvedPrimaryArtist
     oldArtist.save()
+    ArtistStats.refresh([oldArtistId, resolvedPrimaryArtistId])
+    SearchIndex.refresh(SearchIndex.artist, [resolvedPrimaryArtistId])
+    bump_identity_generation()
   return resolvedPrimaryArtist
@@ -9,7 +9,18 @@ import os.path
 
 from ..daemon.client import DaemonClient
 from ..daemon.exceptions import DaemonUnavailableError
-from ..db import Folder, Artist, Album
+from ..db import (
+    Folder,
+    Artist,
+    Album,
+    AlbumArtist,
+    AlbumStats,
+    ArtistStats,
+    Track,
+    bump_identity_generation,
+    bump_library_generation,
+    db,
+)
 
 
 class FolderManager:
@@ -32,7 +43,7 @@ class FolderManager:
 
         path = os.path.abspath(os.path.expanduser(path))
         if not os.path.isdir(path):
-            raise ValueError("The path doesn't exits or isn't a directory")
+            raise ValueError("The path doesn't exist or isn't a directory")
 
         try:
             Folder.get(path=path)
@@ -49,6 +60,7 @@ class FolderManager:
             raise ValueError("This path contains a folder that is already registered")
 
         folder = Folder.create(root=True, name=name, path=path)
+        bump_identity_generation()
         try:
             DaemonClient().add_watched_folder(path)
         except DaemonUnavailableError:
@@ -56,6 +68,17 @@ class FolderManager:
 
         return folder
 
+    @staticmethod
+    def resolve_scan_path(path):
+        path = os.path.abspath(os.path.expanduser(path))
+        if not os.path.isdir(path):
+            raise ValueError("The path doesn't exist or isn't a directory")
+
+        for (root,) in Folder.select(Folder.path).where(Folder.root).tuples():
+            if path == root or path.startswith(root + os.sep):
+                return path
+        raise ValueError("This path isn't inside a registered folder")
+
     @staticmethod
     def delete(id):
         folder = FolderManager.get(id)
@@ -67,9 +90,23 @@ class FolderManager:
         except DaemonUnavailableError:
             pass
 
+        # Albums left with tracks of other folders and their artists have
+        # statistics to refresh once this one is gone.
+        albums = Track.select(Track.album).where(Track.root_folder == folder)
+        album_ids = [album_id for (album_id,) in albums.distinct().tuples()]
+        artists = Album.select(Album.artist).where(Album.id.in_(albums)).union(
+            AlbumArtist.select(AlbumArtist.artist_id).where(AlbumArtist.album_id.in_(albums))
+        )
+        artist_ids = [artist_id for (artist_id,) in artists.tuples()]
+
         folder.delete_hierarchy()
         Album.prune()
         Artist.prune()
+        with db.atomic():
+            AlbumStats.refresh(album_ids)
+            ArtistStats.refresh(artist_ids)
+        bump_identity_generation()
+        bump_library_generation()
 
     @staticmethod
     def delete_by_name(name):
@@ -55,13 +55,18 @@ class Scanner(Thread):
         on_folder_start: FolderCallback = None,
         on_folder_end: FolderCallback = None,
         on_done: DoneCallback = None,
+        jobs: Optional[int] = None,
+        resume: bool = False,
     ) -> None:
         super().__init__()
 
         if extensions is not None and not isinstance(extensions, list):
             raise TypeError("Invalid extensions type")
+        if jobs is not None and not isinstance(jobs, int):
+            raise TypeError("Invalid jobs type")
 
         self.__force = force
+        self.__resume = resume
         self.__extensions = extensions
         self.__follow_symlinks = follow_symlinks
 
@@ -74,12 +79,24 @@ class Scanner(Thread):
         self.__queue = ScanQueue()
         self.__stats = Stats()
         self.__config = IniConfig.from_common_locations()
+        self.__jobs = max(1, jobs or int(self.__config.BASE.get("scanner_jobs") or 1))
+        self.__worker_mode = self.__config.BASE.get("scanner_workers") or "thread"
+        self.__batch_files = int(self.__config.BASE.get("scanner_batch_files") or 0)
+        self.__batch_interval = int(self.__config.BASE.get("scanner_batch_ms") or 0)
+        self.__checkpoint_interval = int(self.__config.BASE.get("scanner_checkpoint_interval") or 0)
 
     scanned = property(lambda self: self.__stats.scanned)
+    timings = property(lambda self: self.__stats.timings)
     force_scan = property(lambda self: self.__force)
+    resume_scan = property(lambda self: self.__resume)
     follow_symlinks = property(lambda self: self.__follow_symlinks)
     scan_config = property(lambda self: self.__config)
     stop_requested = property(lambda self: self.__stopped.is_set())
+    scan_jobs = property(lambda self: self.__jobs)
+    scan_worker_mode = property(lambda self: self.__worker_mode)
+    scan_batch_files = property(lambda self: self.__batch_files)
+    scan_batch_interval = property(lambda self: self.__batch_interval)
+    scan_checkpoint_interval = property(lambda self: self.__checkpoint_interval)
 
     def report_progress(self, folder_name: str, scanned: int) -> None:
         if self.__progress is None:
@@ -105,12 +122,22 @@ class Scanner(Thread):
 
         self.__queue.put(folder_name)
 
+    def queue_path(self, path: str) -> None:
+        # Only the subtree under ``path`` is scanned, it must lie in a root folder.
+        if not isinstance(path, str):
+            raise TypeError("Expecting string, got " + str(type(path)))
+
+        self.__queue.put(os.path.abspath(path))
+
     def next_queued_folder(self) -> Optional[str]:
         try:
             return self.__queue.get(False)
         except QueueEmpty:
             return None
 
+    def queued_folders(self) -> List[str]:
+        return self.__queue.snapshot()
+
     def run(self) -> None:
         runScanner(self, logger)
 
@@ -146,10 +173,10 @@ class Scanner(Thread):
     def add_cover(self, path: str) -> None:
         addCover(path, logger)
 
-    def find_lost_information(self) -> None:
+    def find_lost_information(self, full: bool = False) -> None:
         # Post-scan enrichment is centralized in scanner_enrich so the
         # main scanner loop stays focused on traversal and persistence.
-        findLostInformation(self, logger=logger)
+        findLostInformation(self, logger=logger, full=full)
 
     def decideAllPositions(self) -> None:
         decideAllPositions(self)
@@ -161,5 +188,5 @@ class Scanner(Thread):
         return self.__stats
 
 
-def renow_track_hash() -> None:
-    renowTrackHash(logger)
+def renow_track_hash(jobs: Optional[int] = None, algorithm: Optional[str] = None) -> None:
+    renowTrackHash(logger, jobs, algorithm)
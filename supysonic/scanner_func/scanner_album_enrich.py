@@ -8,9 +8,11 @@ import logging
 from typing import Any, Dict, Iterable, List, Optional
 
 from ..MusicBrainz import get_musicbrainz_album, search_musicbrainz_album
-from ..db import Album, Track, now
+from ..db import Album, AlbumStats, Track, bump_library_generation, db, now
 from ..discogs import DiscogsClient
 from ..logging_utils import format_log_event
+from .scanner_dirty import selectByIds
+from .scanner_timing import timedClient
 
 logger = logging.getLogger(__name__)
 
@@ -276,9 +278,12 @@ def _record_provider_attempt(
     album.save()
 
 
-def collectAlbumsNeedingEnrichment(discogs_enabled: bool = True) -> List[Album]:
+def collectAlbumsNeedingEnrichment(
+    discogs_enabled: bool = True,
+    album_ids: Optional[Iterable[Any]] = None,
+) -> List[Album]:
     albums = []
-    for album in Album.select():
+    for album in selectByIds(Album.select(), Album.id, album_ids):
         album_info = getAlbumInfo(album)
         artist_name = album.artist.get_artist_name()
         needs_musicbrainz = (
@@ -507,22 +512,25 @@ def runAlbumEnrichmentPass(
     musicbrainz_client=None,
     discogs_client=None,
     logger: Optional[logging.Logger] = None,
+    album_ids: Optional[Iterable[Any]] = None,
 ) -> None:
     trace_logger = logger or globals()["logger"]
-    musicbrainz_client = musicbrainz_client or MusicBrainzClient()
+    musicbrainz_client = timedClient(scanner, musicbrainz_client or MusicBrainzClient(), "musicbrainz")
     if discogs_client is None and hasattr(scanner, "scan_config"):
         discogs_client = DiscogsClient(getattr(scanner.scan_config, "DISCOGS", {}))
+    discogs_client = timedClient(scanner, discogs_client, "discogs")
     discogs_enabled = _isDiscogsEnabled(trace_logger, discogs_client)
     album_list = (
         list(albums)
         if albums is not None
-        else collectAlbumsNeedingEnrichment(discogs_enabled=discogs_enabled)
+        else collectAlbumsNeedingEnrichment(discogs_enabled=discogs_enabled, album_ids=album_ids)
     )
     processed = 0
     matched = 0
     applied = 0
     skipped = 0
     failed = 0
+    retagged = set()
 
     trace_logger.info(
         format_log_event(
@@ -716,6 +724,8 @@ def runAlbumEnrichmentPass(
                 applied += 1
                 _logAlbumApplied(trace_logger, album, artist_name, enrichment, changes)
                 _rememberEnrichedAlbum(scanner, album)
+                if changes["tracks"]["year"] or changes["tracks"]["genre"]:
+                    retagged.add(album.id)
             else:
                 skipped += 1
                 if enrichment:
@@ -724,6 +734,13 @@ def runAlbumEnrichmentPass(
             failed += 1
             _logAlbumFailure(trace_logger, album, exc)
 
+    # Enrichment runs once the scan refreshed the statistics, those of the
+    # albums whose track years or genres it filled in are behind.
+    if retagged:
+        with db.atomic():
+            AlbumStats.refresh(retagged)
+        bump_library_generation()
+
     trace_logger.info(
         format_log_event(
             "scanner",
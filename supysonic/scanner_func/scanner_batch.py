@@ -0,0 +1,103 @@
+"""Group the writes of consecutive scanned files into shared transactions."""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple, TYPE_CHECKING
+
+from peewee import IntegrityError
+
+from ..db import db
+from .scanner_lookup import clearIdentityCache, getIdentityCache
+from .scanner_timing import timedStage
+
+if TYPE_CHECKING:
+    from ..scanner import Scanner
+    from .scanner_state import Stats
+
+
+def _countersOf(stats: Stats) -> Tuple[int, dict, dict]:
+    return stats.moved, dict(vars(stats.added)), dict(vars(stats.deleted))
+
+
+def _resetCounters(stats: Stats, counters: Tuple[int, dict, dict]) -> None:
+    moved, added, deleted = counters
+    stats.moved = moved
+    vars(stats.added).update(added)
+    vars(stats.deleted).update(deleted)
+
+
+class ScanBatch:
+    """Commit once every ``files`` files or ``interval`` milliseconds.
+
+    Each file runs in its own savepoint so a constraint failure only discards
+    that file's rows, the rest of the batch is kept. The added, deleted and
+    moved counts the file bumped are rolled back with it.
+    """
+
+    def __init__(self, scanner: Scanner, transaction, files: int, interval: int) -> None:
+        self.__scanner = scanner
+        self.__transaction = transaction
+        self.__files = files
+        self.__interval = interval / 1000.0
+        self.__pending = 0
+        self.__started = time.monotonic()
+
+    @contextmanager
+    def file(self, path: str) -> Iterator[None]:
+        stats = self.__scanner.stats()
+        counters = _countersOf(stats)
+        try:
+            with db.atomic():
+                yield
+        except IntegrityError:
+            clearIdentityCache(self.__scanner)
+            _resetCounters(stats, counters)
+            stats.errors.append(path)
+        except BaseException:
+            # Rows created in the discarded savepoint may already be cached.
+            clearIdentityCache(self.__scanner)
+            _resetCounters(stats, counters)
+            raise
+
+        self.__pending += 1
+        if self.__pending >= self.__files or time.monotonic() - self.__started >= self.__interval:
+            self.commit()
+
+    def commit(self) -> None:
+        self.__transaction.commit()
+        self.__pending = 0
+        self.__started = time.monotonic()
+        # Concurrent writers, such as the metadata editor, may only have
+        # landed between two of our transactions.
+        getIdentityCache(self.__scanner).validate(force=True)
+
+
+@contextmanager
+def openScanBatch(scanner: Scanner) -> Iterator[Optional[ScanBatch]]:
+    files = getattr(scanner, "scan_batch_files", 0)
+    if files <= 0:
+        yield None
+        return
+
+    with db.atomic() as transaction:
+        scanner.scan_batch = ScanBatch(scanner, transaction, files, getattr(scanner, "scan_batch_interval", 1000))
+        try:
+            yield scanner.scan_batch
+        finally:
+            scanner.scan_batch = None
+
+
+@contextmanager
+def batchedFile(scanner: Scanner, path: str) -> Iterator[None]:
+    # Everything a file costs besides reading its tags and its album.nfo, those
+    # are timed on their own and taken off this stage.
+    batch = getattr(scanner, "scan_batch", None)
+    with timedStage(scanner, "db"):
+        if batch is None:
+            yield
+            return
+
+        with batch.file(path):
+            yield
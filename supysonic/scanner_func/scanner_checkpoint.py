@@ -0,0 +1,177 @@
+"""Persist the progress of a scan so an interrupted one resumes where it stopped."""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from typing import Any, List, Optional, Set, TYPE_CHECKING
+
+from ..db import ScanCheckpoint, now
+from .scanner_dirty import getDirtySet
+
+if TYPE_CHECKING:
+    from ..scanner import Scanner
+
+CHECKPOINT_NAME = "scanner"
+
+# Run in this order once every queued root folder has been walked.
+SCAN_STAGES = ("positions", "prune", "repair", "review_tasks")
+
+
+def _loadIds(values: List[str]) -> Set[Any]:
+    # Album and artist ids are UUIDs, keep them comparable with the live dirty set.
+    return {uuid.UUID(value) for value in values}
+
+
+class ScanCheckpointer:
+    """The persisted state of the running scan: its root folders, the directories
+    already completed in the current one and the post-scan stages still to run.
+
+    Directories only reach the database once their files have been persisted and
+    in the same transaction, so a resumed scan never skips uncommitted work.
+    """
+
+    def __init__(self, scanner: Scanner, interval: int) -> None:
+        self.__scanner = scanner
+        self.__interval = interval
+        self.__last_flush = time.monotonic()
+        self.__resume_root: Optional[str] = None
+        self.__resume_cursor: Set[str] = set()
+        self.__resume_scanned = 0
+
+        self.current_root: Optional[str] = None
+        self.completed: Set[str] = set()
+        self.root_scanned = 0
+        self.stages: List[str] = list(SCAN_STAGES)
+        self.resumed = False
+
+    def matches(self, row: ScanCheckpoint) -> bool:
+        """Whether the queued request covers every root the interrupted scan had left."""
+        roots = set(json.loads(row.queue_json))
+        if row.current_root is not None:
+            roots.add(row.current_root)
+        return roots <= set(self.__scanner.queued_folders())
+
+    def restore(self, row: ScanCheckpoint) -> None:
+        scanner = self.__scanner
+        self.resumed = True
+        queue = json.loads(row.queue_json)
+        if row.current_root is not None:
+            queue.append(row.current_root)
+            # Directories completed by a regular scan still need a forced one.
+            if row.forced or not getattr(scanner, "force_scan", False):
+                self.__resume_root = row.current_root
+                self.__resume_cursor = set(json.loads(row.cursor_json))
+                self.__resume_scanned = row.root_scanned
+
+        # A scan with roots left to walk runs every stage, only one stopped
+        # during the stages resumes from the pending ones.
+        if not queue and not scanner.queued_folders():
+            self.stages = [stage for stage in json.loads(row.stages_json) if stage in SCAN_STAGES]
+        for name in queue:
+            scanner.queue_folder(name)
+
+        scanner.stats().scanned += row.scanned
+        self.__restoreDirty(row)
+
+    def discard(self, row: ScanCheckpoint) -> None:
+        """Drop the progress of ``row``, only keeping what its committed changes left to refresh."""
+        self.__restoreDirty(row)
+        self.clear()
+
+    def __restoreDirty(self, row: ScanCheckpoint) -> None:
+        dirty = json.loads(row.dirty_json)
+        getDirtySet(self.__scanner).albums.update(_loadIds(dirty.get("albums", [])))
+        getDirtySet(self.__scanner).artists.update(_loadIds(dirty.get("artists", [])))
+
+    def start_root(self, name: str) -> None:
+        self.current_root = name
+        if name == self.__resume_root:
+            self.completed = self.__resume_cursor
+            self.root_scanned = self.__resume_scanned
+            self.__resume_root = None
+        else:
+            self.completed = set()
+            self.root_scanned = 0
+        self.save()
+
+    def finish_root(self) -> None:
+        self.current_root = None
+        self.completed = set()
+        self.root_scanned = 0
+        self.save()
+
+    def is_complete(self, path: str) -> bool:
+        return path in self.completed
+
+    def complete(self, path: str, root_scanned: int) -> None:
+        """Mark a directory whose files were all handed to the scanner."""
+        self.completed.add(path)
+        self.root_scanned = root_scanned
+        if time.monotonic() - self.__last_flush >= self.__interval:
+            self.flush()
+
+    def flush(self) -> None:
+        # Tags still being read on the pool belong to completed directories too.
+        pool = getattr(self.__scanner, "scan_pool", None)
+        if pool is not None:
+            pool.drain()
+        self.save()
+        batch = getattr(self.__scanner, "scan_batch", None)
+        if batch is not None:
+            batch.commit()
+
+    def finish_stage(self, stage: str) -> None:
+        self.stages.remove(stage)
+        self.save()
+
+    def save(self) -> None:
+        dirty = getDirtySet(self.__scanner)
+        values = {
+            ScanCheckpoint.forced: getattr(self.__scanner, "force_scan", False),
+            ScanCheckpoint.current_root: self.current_root,
+            ScanCheckpoint.queue_json: json.dumps(self.__scanner.queued_folders()),
+            ScanCheckpoint.cursor_json: json.dumps(sorted(self.completed)),
+            ScanCheckpoint.root_scanned: self.root_scanned,
+            ScanCheckpoint.scanned: self.__scanner.stats().scanned,
+            ScanCheckpoint.stages_json: json.dumps(self.stages),
+            ScanCheckpoint.dirty_json: json.dumps(
+                {
+                    "albums": [str(value) for value in dirty.albums],
+                    "artists": [str(value) for value in dirty.artists],
+                }
+            ),
+            ScanCheckpoint.updated: now(),
+        }
+        if not ScanCheckpoint.update(values).where(ScanCheckpoint.name == CHECKPOINT_NAME).execute():
+            ScanCheckpoint.insert({ScanCheckpoint.name: CHECKPOINT_NAME, **values}).execute()
+        self.__last_flush = time.monotonic()
+
+    def clear(self) -> None:
+        ScanCheckpoint.delete().where(ScanCheckpoint.name == CHECKPOINT_NAME).execute()
+
+
+def openScanCheckpoint(scanner: Scanner) -> Optional[ScanCheckpointer]:
+    """Attach the scan's checkpointer, resuming the one left by an interrupted scan.
+
+    The interrupted scan is resumed when asked to or when the queued request
+    covers the roots it had left, a scan of other folders starts afresh.
+    """
+    interval = getattr(scanner, "scan_checkpoint_interval", 0)
+    if interval <= 0:
+        return None
+
+    checkpoint = ScanCheckpointer(scanner, interval)
+    row = ScanCheckpoint.get_or_none(ScanCheckpoint.name == CHECKPOINT_NAME)
+    if row is not None:
+        if getattr(scanner, "resume_scan", False) or checkpoint.matches(row):
+            checkpoint.restore(row)
+        else:
+            checkpoint.discard(row)
+    scanner.scan_checkpoint = checkpoint
+    return checkpoint
+
+
+def getScanCheckpoint(scanner: Scanner) -> Optional[ScanCheckpointer]:
+    return getattr(scanner, "scan_checkpoint", None)
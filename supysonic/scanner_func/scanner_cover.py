@@ -4,15 +4,18 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import List, Optional, TYPE_CHECKING
+from typing import Any, Iterable, List, Optional, TYPE_CHECKING
 
 import mediafile
 
 from ..covers import find_cover_in_folder
-from ..db import Album, Folder, Image, Track
+from ..db import Album, AlbumStats, Folder, Image, Track
 from ..lastfm import LastFm
 from ..tool import download_image
 from ..MusicBrainz import get_musicbrainz_album_image_info, search_musicbrainz_album
+from .scanner_cover_index import findIndexedCover
+from .scanner_dirty import getDirtySet, selectByIds
+from .scanner_timing import timedStage
 from .scanner_trace import logTrace
 
 if TYPE_CHECKING:
@@ -32,6 +35,10 @@ def _syncFolderCoverArt(folder: Folder, cover_name: Optional[str]) -> None:
 
     folder.cover_art = cover_name
     folder.save()
+    # The albums of the folder may take their cover from it, or stop doing so.
+    AlbumStats.refresh(
+        album_id for (album_id,) in Track.select(Track.album).where(Track.folder == folder).distinct().tuples()
+    )
 
 
 def _syncAlbumCoverImage(album: Album, image_path: Optional[str]) -> None:
@@ -55,27 +62,31 @@ def _syncAlbumCoverImage(album: Album, image_path: Optional[str]) -> None:
         primary_cover.save()
 
 
-def _syncFolderCover(folder: Folder, album: Optional[Album]) -> Optional[str]:
+def _syncFolderCover(folder: Folder, album: Optional[Album], sync_album: bool = True) -> Optional[str]:
     album_name = album.name if album is not None else None
-    cover = find_cover_in_folder(folder.path, album_name)
+    cover = findIndexedCover(folder, album_name)
     cover_name = cover.name if cover else None
+    changed = folder.cover_art != cover_name
     _syncFolderCoverArt(folder, cover_name)
 
-    if album is not None:
+    # The album image only follows the folder's cover, or the album's tracks.
+    if album is not None and (changed or sync_album):
         image_path = os.path.join(folder.path, cover_name) if cover_name else None
         _syncAlbumCoverImage(album, image_path)
 
     return cover_name
 
 
-def collectAlbumsMissingCover(scanner: Scanner) -> List[Album]:
+def collectAlbumsMissingCover(scanner: Scanner, album_ids: Optional[Iterable[Any]] = None) -> List[Album]:
     lost_cover_album: List[Album] = []
-    for album in Album.select():
-        if (
-            Image.select()
-            .where(Image.related_id == album.id, Image.image_type == "album")
-            .exists()
-        ):
+    if album_ids is not None:
+        album_ids = list(album_ids)
+    # Image.related_id holds the album id as text, so match it in Python rather than in SQL.
+    images = Image.select(Image.related_id).where(Image.image_type == "album").tuples()
+    related_ids = None if album_ids is None else [str(album_id) for album_id in album_ids]
+    covered = {related_id for (related_id,) in selectByIds(images, Image.related_id, related_ids)}
+    for album in selectByIds(Album.select(), Album.id, album_ids):
+        if str(album.id) in covered:
             continue
         lost_cover_album.append(album)
         scanner.stats().lost_covers_albums[album.name] = ""
@@ -98,7 +109,13 @@ def findCover(scanner: Scanner, dirpath: str) -> None:
     album = track.album if track is not None else None
 
     # This path handles folder-level cover discovery during scans and watcher updates.
-    _syncFolderCover(folder, album)
+    sync_album = album is not None and album.id in getDirtySet(scanner).albums
+    try:
+        _syncFolderCover(folder, album, sync_album)
+    except OSError:
+        # A folder that can't be listed keeps the cover it had, the walk
+        # already reported it.
+        return
 
 
 def addCover(path: str, logger: logging.Logger) -> None:
@@ -226,21 +243,24 @@ def repairAlbumCover(
     if get_cover_interner and not cover and lfm:
         dl_status = False
         album_artist_name = album.artist.get_artist_name()
-        search_musicbrainz_album(artist_name=album_artist_name, album_name=album.name)
+        with timedStage(scanner, "provider.musicbrainz"):
+            search_musicbrainz_album(artist_name=album_artist_name, album_name=album.name)
         lastfm_album = lfm.get_albuminfo(artist_name=album_artist_name, album_name=album.name)
         album_mbid = lastfm_album.get('album', {}).get('mbid', "")
         if album_mbid:
-            musicbrainz_image_json = get_musicbrainz_album_image_info(mb_album_id=album_mbid)
+            with timedStage(scanner, "provider.musicbrainz"):
+                musicbrainz_image_json = get_musicbrainz_album_image_info(mb_album_id=album_mbid)
             if musicbrainz_image_json:
                 for image in musicbrainz_image_json.get('images', []):
                     if image.get('front', False):
                         dl_url = image['image']
-                        image_path = download_image(
-                            save_folder=os.path.dirname(track.path),
-                            save_name="cover.png",
-                            url=dl_url,
-                            logger=logger,
-                        )
+                        with timedStage(scanner, "provider.download"):
+                            image_path = download_image(
+                                save_folder=os.path.dirname(track.path),
+                                save_name="cover.png",
+                                url=dl_url,
+                                logger=logger,
+                            )
                         if image_path:
                             Image.create(image_type="album", related_id=album.id, path=image_path)
                             if logger:
@@ -268,12 +288,13 @@ def repairAlbumCover(
                 dl_url = image['#text']
                 if not dl_url:
                     continue
-                image_path = download_image(
-                    save_folder=save_folder,
-                    save_name="cover.png",
-                    url=dl_url,
-                    logger=logger,
-                )
+                with timedStage(scanner, "provider.download"):
+                    image_path = download_image(
+                        save_folder=save_folder,
+                        save_name="cover.png",
+                        url=dl_url,
+                        logger=logger,
+                    )
                 if image_path:
                     Image.create(image_type="album", related_id=album.id, path=image_path)
                     if logger:
@@ -0,0 +1,57 @@
+"""Remember which images of a folder are valid covers so rescans don't reopen them."""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from ..covers import EXTENSIONS, CoverFile, best_cover, is_valid_cover
+from ..db import CoverCandidate, Folder, db
+
+
+def _recordCandidate(
+    folder: Folder, entry: os.DirEntry, stat: os.stat_result, row: Optional[CoverCandidate]
+) -> CoverCandidate:
+    if row is None:
+        row = CoverCandidate(folder=folder.id, name=entry.name)
+    row.size = stat.st_size
+    row.mtime_ns = stat.st_mtime_ns
+    row.valid = is_valid_cover(entry.path)
+    row.score = CoverFile.naming_score(entry.name)
+    row.save()
+    return row
+
+
+def findIndexedCover(folder: Folder, album_name: Optional[str] = None) -> Optional[CoverFile]:
+    """``find_cover_in_folder`` backed by the folder's ``CoverCandidate`` rows.
+
+    Only images that are new, or whose size or mtime changed, are decoded again.
+    """
+    if not os.path.isdir(folder.path):
+        raise ValueError("Invalid path")
+
+    entries = list(os.scandir(folder.path))
+    known = {row.name: row for row in CoverCandidate.select().where(CoverCandidate.folder == folder.id)}
+    candidates = []
+    with db.atomic():
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() not in EXTENSIONS:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            row = known.pop(entry.name, None)
+            if row is None or row.size != stat.st_size or row.mtime_ns != stat.st_mtime_ns:
+                row = _recordCandidate(folder, entry, stat, row)
+            if row.valid:
+                candidates.append(CoverFile(entry.name, album_name, row.score))
+
+        # Whatever is left was deleted or renamed since the last lookup.
+        if known:
+            CoverCandidate.delete().where(CoverCandidate.id.in_([row.id for row in known.values()])).execute()
+
+    return best_cover(candidates)
@@ -0,0 +1,98 @@
+"""Remember the albums and artists a scan touched so post-scan repair stays local."""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, List, Optional, Set, TYPE_CHECKING
+
+from ..db import Album, AlbumArtist, Track, TrackArtist
+
+if TYPE_CHECKING:
+    from ..scanner import Scanner
+
+# Keeps ``IN (...)`` lists well under SQLite's bound parameter limit.
+DIRTY_CHUNK_SIZE = 500
+
+
+def chunkIds(ids: Iterable[Any], size: int = DIRTY_CHUNK_SIZE) -> Iterator[List[Any]]:
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def selectByIds(query, field, ids: Optional[Iterable[Any]]) -> Iterator[Any]:
+    """Run ``query`` over the whole table, or restricted to ``ids`` chunk by chunk."""
+    if ids is None:
+        yield from query
+        return
+
+    for chunk in chunkIds(ids):
+        yield from query.where(field.in_(chunk))
+
+
+class ScanDirtySet:
+    """Album and artist ids whose tracks were added, changed, moved or removed.
+
+    Only the ids met directly are recorded while scanning, the other artists of
+    those albums are resolved in bulk once repair starts.
+    """
+
+    def __init__(self) -> None:
+        self.albums: Set[Any] = set()
+        self.artists: Set[Any] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.albums or self.artists)
+
+    def mark_removed(self, condition) -> None:
+        """Record the albums and artists of the tracks matching ``condition``, before they go."""
+        query = Track.select(Track.album, Track.artist).where(condition).distinct()
+        for album_id, artist_id in query.tuples():
+            self.albums.add(album_id)
+            self.artists.add(artist_id)
+
+    def mark_track(self, track: Track) -> None:
+        album_id = getattr(track, "album_id", None)
+        artist_id = getattr(track, "artist_id", None)
+        if album_id is not None:
+            self.albums.add(album_id)
+        if artist_id is not None:
+            self.artists.add(artist_id)
+
+    def album_ids(self) -> List[Any]:
+        return list(self.albums)
+
+    def artist_ids(self) -> List[Any]:
+        artists = set(self.artists)
+        for chunk in chunkIds(self.albums):
+            artists.update(a for (a,) in Album.select(Album.artist).where(Album.id.in_(chunk)).tuples())
+            artists.update(
+                a
+                for (a,) in AlbumArtist.select(AlbumArtist.artist_id)
+                .where(AlbumArtist.album_id.in_(chunk))
+                .tuples()
+            )
+            artists.update(
+                a
+                for (a,) in TrackArtist.select(TrackArtist.artist_id)
+                .join(Track, on=TrackArtist.track_id == Track.id)
+                .where(Track.album.in_(chunk))
+                .tuples()
+            )
+        return list(artists)
+
+
+def getDirtySet(scanner: Scanner) -> ScanDirtySet:
+    if not hasattr(scanner, "dirty_set"):
+        scanner.dirty_set = ScanDirtySet()
+    return scanner.dirty_set
+
+
+def markTrackDirty(scanner: Scanner, track: Track) -> None:
+    getDirtySet(scanner).mark_track(track)
+
+
+def takeDirtySet(scanner: Scanner) -> ScanDirtySet:
+    # Repair consumes the set so a scanner reused for another batch starts clean.
+    dirty = getDirtySet(scanner)
+    scanner.dirty_set = ScanDirtySet()
+    return dirty
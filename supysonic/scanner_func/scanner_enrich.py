@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import List, Optional, Tuple, TYPE_CHECKING
+from typing import Any, Iterable, List, Optional, Tuple, TYPE_CHECKING
 
 from ..db import Album, Artist, Track, User
 from ..lastfm import LastFm
@@ -13,6 +13,8 @@ from ..tool import download_image, extract_year, read_dict_from_json, write_dict
 from ..MusicBrainz import get_musicbrainz_album, search_musicbrainz_album
 from .scanner_album_enrich import runAlbumEnrichmentPass
 from .scanner_cover import collectAlbumsMissingCover, repairAlbumCover
+from .scanner_dirty import selectByIds, takeDirtySet
+from .scanner_timing import timedClient, timedStage
 from .scanner_trace import logTrace
 
 if TYPE_CHECKING:
@@ -28,14 +30,15 @@ def buildExternalMetadataClients(
     user = User.get_or_none(User.name == "root")
     if not (user and user.lastfm_status and scanner.scan_config.SPOTIFY['client_id']):
         return user, False, None, None
-    return user, True, LastFm(scanner.scan_config.LASTFM, user), MySpotify(scanner.scan_config.SPOTIFY)
+    lfm = timedClient(scanner, LastFm(scanner.scan_config.LASTFM, user), "lastfm")
+    sp = timedClient(scanner, MySpotify(scanner.scan_config.SPOTIFY), "spotify")
+    return user, True, lfm, sp
 
 
-def collectAlbumsMissingYear(scanner: Scanner) -> List[Album]:
+def collectAlbumsMissingYear(scanner: Scanner, album_ids: Optional[Iterable[Any]] = None) -> List[Album]:
     lost_year_albums: List[Album] = []
-    for album in Album.select():
-        if album.year:
-            continue
+    query = Album.select().where(Album.year.is_null() | (Album.year == ""))
+    for album in selectByIds(query, Album.id, album_ids):
         track = Track.select().where(Track.album == album.id).first()
         lost_year_albums.append(album)
         scanner.stats().lost_year_albums[album.name] = os.path.dirname(track.path) if track else ""
@@ -56,9 +59,11 @@ def repairAlbumYear(
     else:
         trace_details.append("year source: track metadata miss")
         album_artist_name = album.artist.get_artist_name()
-        musicbrainz_album = search_musicbrainz_album(artist_name=album_artist_name, album_name=album.name)
+        with timedStage(scanner, "provider.musicbrainz"):
+            musicbrainz_album = search_musicbrainz_album(artist_name=album_artist_name, album_name=album.name)
         if musicbrainz_album and musicbrainz_album.get('id'):
-            result = get_musicbrainz_album(mb_album_id=musicbrainz_album['id'])
+            with timedStage(scanner, "provider.musicbrainz"):
+                result = get_musicbrainz_album(mb_album_id=musicbrainz_album['id'])
             year = extract_year(result.get('date'))
             if year:
                 logger.info("Resolved album year %s for %s from MusicBrainz", year, album.name)
@@ -109,11 +114,10 @@ def repairAlbumYear(
     return False
 
 
-def collectArtistsMissingInfo(scanner: Scanner) -> List[Artist]:
+def collectArtistsMissingInfo(scanner: Scanner, artist_ids: Optional[Iterable[Any]] = None) -> List[Artist]:
     lost_cover_artist: List[Artist] = []
-    for artist in Artist.select():
-        if artist.artist_info_json:
-            continue
+    query = Artist.select().where(Artist.artist_info_json.is_null() | (Artist.artist_info_json == ""))
+    for artist in selectByIds(query, Artist.id, artist_ids):
         lost_cover_artist.append(artist)
         scanner.stats().lost_covers.artists += 1
         scanner.stats().lost_covers_artists.append(artist.get_artist_name())
@@ -130,8 +134,8 @@ def repairArtistProfiles(
     if not (get_cover_interner and user and user.lastfm_status and scanner.scan_config.SPOTIFY['client_id']):
         return
 
-    sp = MySpotify(scanner.scan_config.SPOTIFY, user)
-    lfm = LastFm(scanner.scan_config.LASTFM, user)
+    sp = timedClient(scanner, MySpotify(scanner.scan_config.SPOTIFY, user), "spotify")
+    lfm = timedClient(scanner, LastFm(scanner.scan_config.LASTFM, user), "lastfm")
     for artist in lost_cover_artist:
         trace_details = ["repair type: artist profile"]
         if artist.get_artist_name() == "Various Artists" or len(artist.get_artist_name()) < 2:
@@ -169,12 +173,13 @@ def repairArtistProfiles(
                     else:
                         size = "small"
                     dl_url = element['url']
-                    image_path = download_image(
-                        save_folder=artists_folder,
-                        save_name=size,
-                        url=dl_url,
-                        logger=logger,
-                    )
+                    with timedStage(scanner, "provider.download"):
+                        image_path = download_image(
+                            save_folder=artists_folder,
+                            save_name=size,
+                            url=dl_url,
+                            logger=logger,
+                        )
                     if image_path:
                         result_json['image'][size] = image_path
                         scanner.stats().lost_covers.artists -= 1
@@ -236,12 +241,16 @@ def repairMissingArtistImages(
     get_cover_interner: bool = False,
     user: Optional[User] = None,
     logger: Optional[logging.Logger] = None,
+    artist_ids: Optional[Iterable[Any]] = None,
 ) -> None:
     if not (get_cover_interner and user and user.lastfm_status and scanner.scan_config.SPOTIFY['client_id']):
         return
 
-    sp = MySpotify(scanner.scan_config.SPOTIFY, user)
-    for artist in Artist.select().where(Artist.artist_info_json.is_null(False)):
+    sp = timedClient(scanner, MySpotify(scanner.scan_config.SPOTIFY, user), "spotify")
+    artists = Artist.select().where(Artist.artist_info_json.is_null(False))
+    if artist_ids is not None:
+        artists = selectByIds(artists, Artist.id, artist_ids)
+    for artist in artists:
         if not os.path.exists(artist.artist_info_json):
             continue
         info = read_dict_from_json(artist.artist_info_json)
@@ -266,12 +275,14 @@ def repairMissingArtistImages(
                     else:
                         size = "small"
                     dl_url = element['url']
-                    if download_image(
-                        save_folder=artists_folder,
-                        save_name=size,
-                        url=dl_url,
-                        logger=logger,
-                    ):
+                    with timedStage(scanner, "provider.download"):
+                        downloaded = download_image(
+                            save_folder=artists_folder,
+                            save_name=size,
+                            url=dl_url,
+                            logger=logger,
+                        )
+                    if downloaded:
                         info['image'][size] = os.path.join(artists_folder, f"{size}.png")
                         write_dict_to_json(
                             data=info,
@@ -296,16 +307,35 @@ def repairMissingArtistImages(
             )
 
 
-def findLostInformation(scanner: Scanner, logger: Optional[logging.Logger] = None) -> None:
+def findLostInformation(
+    scanner: Scanner,
+    logger: Optional[logging.Logger] = None,
+    full: bool = False,
+) -> None:
+    # By default only the albums and artists this scanner touched are repaired,
+    # ``full`` sweeps the whole library.
+    album_ids = artist_ids = None
+    if not full:
+        dirty = takeDirtySet(scanner)
+        if not dirty:
+            return
+        album_ids, artist_ids = dirty.album_ids(), dirty.artist_ids()
+
     user, get_cover_interner, lfm, sp = buildExternalMetadataClients(scanner)
-    runAlbumEnrichmentPass(scanner, logger=logger)
+    runAlbumEnrichmentPass(scanner, logger=logger, album_ids=album_ids)
 
-    for album in list(collectAlbumsMissingYear(scanner)):
+    for album in list(collectAlbumsMissingYear(scanner, album_ids)):
         repairAlbumYear(scanner, album, lfm=lfm, sp=sp)
 
-    for album in collectAlbumsMissingCover(scanner):
+    for album in collectAlbumsMissingCover(scanner, album_ids):
         repairAlbumCover(scanner, album, get_cover_interner=get_cover_interner, lfm=lfm, logger=logger)
 
-    lost_cover_artist = collectArtistsMissingInfo(scanner)
+    lost_cover_artist = collectArtistsMissingInfo(scanner, artist_ids)
     repairArtistProfiles(scanner, lost_cover_artist, get_cover_interner=get_cover_interner, user=user, logger=logger)
-    repairMissingArtistImages(scanner, get_cover_interner=get_cover_interner, user=user, logger=logger)
+    repairMissingArtistImages(
+        scanner,
+        get_cover_interner=get_cover_interner,
+        user=user,
+        logger=logger,
+        artist_ids=artist_ids,
+    )
@@ -3,14 +3,15 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING, Union
+from typing import Any, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING, Union
 
 import mediafile
 
-from ..db import Album, Track
+from ..db import Album, Track, path_hash
 from .scanner_common import sanitizeString, tryLoadTag
-from .scanner_nfo import readNfo
+from .scanner_nfo import readCachedNfo
 from .scanner_relations import recordAlbumArtists
+from .scanner_timing import timedStage
 from .scanner_types import ScanTarget
 
 if TYPE_CHECKING:
@@ -49,32 +50,97 @@ def getScanTargetInfo(path_or_direntry: Union[str, os.DirEntry]) -> Optional[Sca
     )
 
 
+def findTrackForScan(
+    scanner: Scanner,
+    path: str,
+    mtime: int,
+) -> Tuple[Optional[Track], bool]:
+    index = getattr(scanner, "track_index", None)
+    if index is None:
+        track = Track.get_or_none(path=path)
+    else:
+        digest = path_hash(path)
+        known = index.last_modification(digest)
+        if known is not None and not mtime > known:
+            return None, False
+        track = Track.get_or_none(Track._path_hash == digest)
+
+    if track is not None and not scanner.force_scan and not mtime > track.last_modification:
+        return track, False
+    return track, True
+
+
+def fileStatData(stat: Optional[os.stat_result]) -> Dict[str, int]:
+    mtime_ns = getattr(stat, "st_mtime_ns", None)
+    if mtime_ns is None:
+        return {}
+    return {"size": stat.st_size, "mtime_ns": mtime_ns}
+
+
+def refreshTrackStat(
+    scanner: Scanner,
+    path: str,
+    stat: Optional[os.stat_result],
+    track: Optional[Track] = None,
+) -> None:
+    """Store the stat data of a file whose tags are up to date but whose size isn't.
+
+    That is a row scanned before the size was stored, or a file rewritten within
+    the second of its last scan. ``track`` is the row when the scan loaded it,
+    the track index knows the others.
+    """
+    data = fileStatData(stat)
+    if not data:
+        return
+
+    digest = path_hash(path)
+    if track is not None:
+        known = track.mtime_ns
+    else:
+        index = getattr(scanner, "track_index", None)
+        known = index.mtime_ns(digest) if index is not None else None
+    if known == data["mtime_ns"]:
+        return
+    Track.update(data).where(Track._path_hash == digest).execute()
+
+
+def newTrackData(
+    track: Optional[Track], path: str, stat: Optional[os.stat_result] = None
+) -> Dict[str, Any]:
+    data = {} if track is not None else {"path": path}
+    data.update(fileStatData(stat))
+    return data
+
+
 def loadTrackForScan(
     scanner: Scanner,
     path: str,
     mtime: int,
+    stat: Optional[os.stat_result] = None,
 ) -> Tuple[Optional[Track], Optional[mediafile.MediaFile], Optional[Dict[str, Any]]]:
-    track = Track.get_or_none(path=path)
-    if track is not None and not scanner.force_scan and not mtime > track.last_modification:
+    track, needs_scan = findTrackForScan(scanner, path, mtime)
+    if not needs_scan:
+        refreshTrackStat(scanner, path, stat, track)
         return track, None, None
 
-    tag = tryLoadTag(path)
+    with timedStage(scanner, "tags"):
+        tag = tryLoadTag(path)
     if tag is None:
         if track is not None:
             scanner.remove_file(path)
         return track, None, None
 
-    track_data = {} if track is not None else {"path": path}
-    return track, tag, track_data
+    return track, tag, newTrackData(track, path, stat)
 
 
 def resolveAlbumContext(
     scanner: Scanner,
     path: str,
     tag: mediafile.MediaFile,
-) -> Tuple[Dict[str, Any], List[str], Album, Dict[str, Any]]:
+) -> Tuple[Mapping[str, Any], List[str], Album, Dict[str, Any]]:
     album_info_path = os.path.join(os.path.dirname(path), "album.nfo")
-    nfo_data = readNfo(album_info_path)
+    with timedStage(scanner, "nfo"):
+        nfo_data = readCachedNfo(scanner, album_info_path)
     raw = getattr(tag, "mgfile", {})
     raw_artists = _coerceArtistList(raw.get("artist", [])) if hasattr(raw, "get") else []
     raw_albumartists = _coerceArtistList(raw.get("albumartist", [])) if hasattr(raw, "get") else []
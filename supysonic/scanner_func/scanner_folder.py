@@ -5,18 +5,57 @@ from __future__ import annotations
 import logging
 import os
 import time
-from typing import TYPE_CHECKING
+from functools import partial
+from typing import Callable, Optional, TYPE_CHECKING
 
-from ..db import Folder, Track
+from ..db import Folder, Track, db, path_hash
 from ..logging_utils import format_log_event
+from .scanner_batch import batchedFile, openScanBatch
+from .scanner_checkpoint import ScanCheckpointer, getScanCheckpoint
+from .scanner_dirty import chunkIds, getDirtySet
+from .scanner_index import folderTracks, openTrackPathIndex
+from .scanner_lookup import clearIdentityCache, findRootFolder
+from .scanner_moves import MovedTracks
+from .scanner_signature import FolderSignatures, openFolderSignatures
+from .scanner_timing import timedStage
+from .scanner_types import SeenEntries
+from .scanner_workers import openScanWorkerPool
 
 if TYPE_CHECKING:
     from ..scanner import Scanner
 
 
-def _scanFolderEntries(scanner: Scanner, folder: Folder) -> None:
+def _scanFolderEntries(scanner: Scanner, folder: Folder) -> SeenEntries:
+    # The pool is closed, and its last results persisted, before the batch commits
+    # and before the directory signatures are saved.
+    with openFolderSignatures(scanner, folder) as signatures, openTrackPathIndex(
+        scanner, folder
+    ), openScanBatch(scanner), openScanWorkerPool(scanner) as pool:
+        scan_file = pool.submit if pool is not None else partial(_scanBatchedFile, scanner)
+        return _walkFolderEntries(
+            scanner, folder, scan_file, signatures, getScanCheckpoint(scanner), MovedTracks(scanner, folder)
+        )
+
+
+def _scanBatchedFile(scanner: Scanner, entry: os.DirEntry) -> None:
+    with batchedFile(scanner, entry.path):
+        scanner.scan_file(entry)
+
+
+def _walkFolderEntries(
+    scanner: Scanner,
+    folder: Folder,
+    scan_file: Callable[[os.DirEntry], None],
+    signatures: Optional[FolderSignatures] = None,
+    checkpoint: Optional[ScanCheckpointer] = None,
+    moves: Optional[MovedTracks] = None,
+) -> SeenEntries:
     toScan = [folder.path]
-    scanned = 0
+    # A resumed root keeps counting from where the interrupted scan stopped.
+    scanned = checkpoint.root_scanned if checkpoint is not None else 0
+    seen = SeenEntries()
+    # Directories holding files kept for ``moves``, completed once those are resolved.
+    held = []
 
     # Walk the filesystem first so changed media files are indexed before cleanup.
     while not scanner.stop_requested and toScan:
@@ -26,7 +65,9 @@ def _scanFolderEntries(scanner: Scanner, folder: Folder) -> None:
         except OSError:
             scanner.stats().errors.append(path)
             continue
+        seen.folders.add(path)
 
+        media = []
         for entry in entries:
             try:
                 if entry.name.startswith("."):
@@ -37,55 +78,131 @@ def _scanFolderEntries(scanner: Scanner, folder: Folder) -> None:
                     toScan.append(entry.path)
                     continue
                 if entry.is_file() and scanner.should_scan_extension(entry.path):
-                    scanner.scan_file(entry)
+                    media.append(entry)
+            except OSError:
+                scanner.stats().errors.append(entry.path)
+
+        # Files of a directory completed before the scan was interrupted are
+        # already persisted and counted.
+        if checkpoint is not None and checkpoint.is_complete(path):
+            seen.files.update(path_hash(entry.path) for entry in media)
+            continue
+
+        # Subdirectories are still walked, an unchanged parent says nothing about them.
+        unchanged = signatures is not None and signatures.check(path, len(entries), media)
+        if unchanged:
+            seen.unchanged.add(path)
+            seen.files.update(path_hash(entry.path) for entry in media)
+            scanner.stats().scanned += len(media)
+            scanned += len(media)
+            scanner.report_progress(folder.name, scanned)
+        else:
+            for entry in media:
+                try:
+                    seen.files.add(path_hash(entry.path))
+                    # A moved file takes its old row over before the old path is pruned.
+                    if moves is None or not moves.hold(entry):
+                        scan_file(entry)
+                    elif not held or held[-1] != path:
+                        held.append(path)
                     scanner.stats().scanned += 1
                     scanned += 1
                     scanner.report_progress(folder.name, scanned)
-            except OSError:
-                scanner.stats().errors.append(entry.path)
+                except OSError:
+                    scanner.stats().errors.append(entry.path)
 
+        if checkpoint is not None and (not held or held[-1] != path):
+            checkpoint.complete(path, scanned)
 
-def _removeDeletedFolders(scanner: Scanner, folder: Folder) -> None:
-    folders = [folder]
-    while not scanner.stop_requested and folders:
-        currentFolder = folders.pop()
-        if not currentFolder.root and not os.path.isdir(currentFolder.path):
-            scanner.stats().deleted.tracks += currentFolder.delete_hierarchy()
-            continue
+    # Only now is it known which tracks the walk didn't meet.
+    if moves and not scanner.stop_requested:
+        moves.resolve(seen, scan_file)
+        if checkpoint is not None and not scanner.stop_requested:
+            for path in held:
+                checkpoint.complete(path, scanned)
 
-        folders += currentFolder.children[:]
+    return seen
 
 
-def _removeDeletedTracks(scanner: Scanner, folder: Folder) -> None:
+# Anything the walk did not meet is only a candidate: it may sit in a hidden
+# directory or one that failed to list, so it is checked on disk before going.
+def _removeDeletedFolders(scanner: Scanner, folder: Folder, seen: SeenEntries) -> None:
     if scanner.stop_requested:
         return
 
-    # Keep DB rows aligned with the files that still exist under this root folder.
-    for track in Track.select().where(Track.root_folder == folder):
-        if not os.path.exists(track.path) or not scanner.should_scan_extension(track.path):
-            scanner.remove_file(track.path)
+    missing = [
+        folderId
+        for folderId, path in Folder.select(Folder.id, Folder.path)
+        .where(~Folder.root, Folder.path.startswith(folder.path + os.sep))
+        .tuples()
+        if path not in seen.folders and not os.path.isdir(path)
+    ]
+    if not missing:
+        return
+
+    dirty = getDirtySet(scanner)
+    for chunk in chunkIds(missing):
+        dirty.mark_removed(Track.folder.in_(chunk))
+
+    with db.atomic():
+        scanner.stats().deleted.tracks += Folder.delete_by_ids(missing)
+    clearIdentityCache(scanner)
 
 
-def _refreshFolderCovers(scanner: Scanner, folder: Folder) -> None:
+def _removeDeletedTracks(scanner: Scanner, folder: Folder, seen: SeenEntries) -> None:
+    if scanner.stop_requested:
+        return
+
+    # Keep DB rows aligned with the files that still exist under the scanned folder.
+    query = Track.select(Track.id, Track._path_hash, Track.path, Track.album, Track.artist).where(
+        folderTracks(folder)
+    )
+    missing = []
+    dirty = getDirtySet(scanner)
+    for trackId, digest, path, albumId, artistId in query.tuples():
+        if bytes(digest) in seen.files:
+            continue
+        if os.path.exists(path) and scanner.should_scan_extension(path):
+            continue
+        missing.append(trackId)
+        dirty.albums.add(albumId)
+        dirty.artists.add(artistId)
+    if not missing:
+        return
+
+    with db.atomic():
+        scanner.stats().deleted.tracks += Track.delete_by_ids(missing)
+
+
+def _refreshFolderCovers(scanner: Scanner, folder: Folder, seen: SeenEntries) -> None:
     folders = [folder]
     while not scanner.stop_requested and folders:
         currentFolder = folders.pop()
-        scanner.find_cover(currentFolder.path)
+        if currentFolder.path not in seen.unchanged:
+            with timedStage(scanner, "covers"):
+                scanner.find_cover(currentFolder.path)
         folders += currentFolder.children[:]
 
 
 def scanFolder(scanner: Scanner, folder: Folder, logger: logging.Logger) -> None:
+    """Scan a root folder, or only the subtree of one of its directories.
+
+    Deletions are only looked for under ``folder``. The folder callbacks always
+    get the root, that is what the watcher follows.
+    """
     logger.info(format_log_event("scanner", "folder_start", folder=folder.name, path=folder.path))
-    scanner.handle_folder_start(folder)
+    root = folder if folder.root else findRootFolder(os.path.join(folder.path, ""), scanner)
+    scanner.handle_folder_start(root)
 
-    _scanFolderEntries(scanner, folder)
-    _removeDeletedFolders(scanner, folder)
-    _removeDeletedTracks(scanner, folder)
-    _refreshFolderCovers(scanner, folder)
+    seen = _scanFolderEntries(scanner, folder)
+    _removeDeletedTracks(scanner, folder, seen)
+    _removeDeletedFolders(scanner, folder, seen)
+    _refreshFolderCovers(scanner, folder, seen)
 
     if not scanner.stop_requested:
         folder.last_scan = int(time.time())
-        folder.save()
+        # This instance predates the scan, leave the columns the scan wrote alone.
+        folder.save(only=[Folder.last_scan])
 
     logger.info(
         format_log_event(
@@ -95,4 +212,4 @@ def scanFolder(scanner: Scanner, folder: Folder, logger: logging.Logger) -> None
             stopped=scanner.stop_requested,
         )
     )
-    scanner.handle_folder_end(folder)
+    scanner.handle_folder_end(root)
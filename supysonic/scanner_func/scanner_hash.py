@@ -0,0 +1,263 @@
+"""Hash track contents on a process pool, skipping files unchanged since their last hash."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from threading import Event, Thread
+from typing import Callable, Dict, List, Optional, Tuple
+
+from peewee import JOIN
+
+from ..config import IniConfig
+from ..db import Track, TrackHash, close_connection, db, now, open_connection
+from ..logging_utils import format_log_event
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+logger = logging.getLogger(__name__)
+
+# Fastest first, "auto" picks the first one available.
+HASH_ALGORITHMS = ("xxh3", "blake3", "blake2b", "md5")
+
+READ_BUFFER_SIZE = 1024 * 1024
+HASH_PAGE_SIZE = 1000
+HASH_BATCH_SIZE = 500
+IN_FLIGHT_PER_WORKER = 4
+
+HashedFile = Tuple[str, int, int]
+ProgressCallback = Optional[Callable[[int, int], None]]
+
+
+def availableHashAlgorithms() -> List[str]:
+    unavailable = {"xxh3": xxhash is None, "blake3": blake3 is None}
+    return [name for name in HASH_ALGORITHMS if not unavailable.get(name)]
+
+
+def resolveHashAlgorithm(name: Optional[str] = None) -> str:
+    if not name or name == "auto":
+        return availableHashAlgorithms()[0]
+    if name not in HASH_ALGORITHMS:
+        raise ValueError(f"Unsupported content hash algorithm: {name}")
+    if name not in availableHashAlgorithms():
+        raise ValueError(f"Content hash algorithm '{name}' requires a module that isn't installed")
+    return name
+
+
+def _newHash(algorithm: str):
+    if algorithm == "xxh3":
+        return xxhash.xxh3_128()
+    if algorithm == "blake3":
+        return blake3.blake3()
+    if algorithm == "blake2b":
+        return hashlib.blake2b(digest_size=16)
+    return hashlib.md5()
+
+
+def hashFile(path: str, algorithm: str) -> HashedFile:
+    """Return the hex digest of ``path`` with the size and mtime it was read at.
+
+    Runs on pool workers: no database access and only picklable results.
+    """
+    digest = _newHash(algorithm)
+    buffer = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        stat = os.fstat(f.fileno())
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest(), stat.st_size, stat.st_mtime_ns
+
+
+class HashProgress:
+    def __init__(self) -> None:
+        self.total = 0
+        self.checked = 0
+        self.hashed = 0
+        self.errors = []
+
+
+class TrackHasher(Thread):
+    """Refresh ``TrackHash`` rows for the tracks whose file changed since their last hash.
+
+    Files are read on ``jobs`` worker processes, the results are written by the
+    calling thread in batches of ``HASH_BATCH_SIZE`` rows.
+    """
+
+    def __init__(
+        self,
+        jobs: Optional[int] = None,
+        algorithm: Optional[str] = None,
+        progress: ProgressCallback = None,
+    ) -> None:
+        super().__init__()
+
+        if jobs is not None and not isinstance(jobs, int):
+            raise TypeError("Invalid jobs type")
+
+        config = IniConfig.from_common_locations()
+        self.__jobs = max(1, jobs or int(config.BASE.get("scanner_jobs") or 1))
+        self.__algorithm = resolveHashAlgorithm(algorithm or config.BASE.get("content_hash_algorithm"))
+        self.__progress = progress
+        self.__stopped = Event()
+        self.__stats = HashProgress()
+        self.__pending: Dict[Future, Tuple[str, str]] = {}
+        self.__results: List[dict] = []
+
+    algorithm = property(lambda self: self.__algorithm)
+    jobs = property(lambda self: self.__jobs)
+    stop_requested = property(lambda self: self.__stopped.is_set())
+
+    def stats(self) -> HashProgress:
+        return self.__stats
+
+    def stop(self) -> None:
+        self.__stopped.set()
+
+    def run(self) -> None:
+        opened = open_connection(True)
+        try:
+            self.hash_tracks()
+        finally:
+            if opened:
+                close_connection()
+
+    def hash_tracks(self) -> None:
+        stats = self.__stats
+        stats.total = Track.select().count()
+        logger.info(
+            format_log_event(
+                "hasher", "run_start", algorithm=self.__algorithm, jobs=self.__jobs, tracks=stats.total
+            )
+        )
+
+        executor = None
+        if self.__jobs > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.__jobs,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        try:
+            for trackId, path in self.__changedTracks():
+                if executor is None:
+                    try:
+                        self.__record(trackId, hashFile(path, self.__algorithm))
+                    except OSError:
+                        self.__stats.errors.append(path)
+                else:
+                    future = executor.submit(hashFile, path, self.__algorithm)
+                    self.__pending[future] = (trackId, path)
+                    if len(self.__pending) >= self.__jobs * IN_FLIGHT_PER_WORKER:
+                        self.__collectCompleted()
+            self.__finish()
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        logger.info(
+            format_log_event(
+                "hasher",
+                "run_end",
+                checked=stats.checked,
+                hashed=stats.hashed,
+                errors=len(stats.errors),
+                stopped=self.stop_requested,
+            )
+        )
+
+    def __changedTracks(self):
+        last = None
+        while not self.stop_requested:
+            query = (
+                Track.select(Track.id, Track.path, TrackHash.algorithm, TrackHash.size, TrackHash.mtime_ns)
+                .join(TrackHash, JOIN.LEFT_OUTER, on=(TrackHash.track == Track.id))
+                .order_by(Track.id)
+                .limit(HASH_PAGE_SIZE)
+            )
+            if last is not None:
+                query = query.where(Track.id > last)
+            rows = list(query.tuples())
+            if not rows:
+                return
+
+            for trackId, path, algorithm, size, mtime_ns in rows:
+                if self.stop_requested:
+                    return
+                self.__stats.checked += 1
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    self.__stats.errors.append(path)
+                    continue
+                if algorithm == self.__algorithm and size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+                    continue
+                yield trackId, path
+            last = rows[-1][0]
+            self.__reportProgress()
+
+    def __collectCompleted(self) -> None:
+        done, _ = wait(list(self.__pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            trackId, path = self.__pending.pop(future)
+            try:
+                self.__record(trackId, future.result())
+            except OSError:
+                self.__stats.errors.append(path)
+
+    def __record(self, trackId, hashed: HashedFile) -> None:
+        digest, size, mtime_ns = hashed
+        self.__results.append(
+            {
+                "track": trackId,
+                "algorithm": self.__algorithm,
+                "digest": digest,
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "updated": now(),
+            }
+        )
+        if len(self.__results) >= HASH_BATCH_SIZE:
+            self.__flush()
+
+    def __finish(self) -> None:
+        if self.stop_requested:
+            for future in list(self.__pending):
+                if future.cancel():
+                    del self.__pending[future]
+        while self.__pending:
+            self.__collectCompleted()
+        self.__flush()
+        self.__reportProgress()
+
+    def __flush(self) -> None:
+        if not self.__results:
+            return
+
+        rows, self.__results = self.__results, []
+        ids = [row["track"] for row in rows]
+        with db.atomic():
+            # Tracks removed by a scan running alongside have nothing left to describe.
+            existing = {t for t, in Track.select(Track.id).where(Track.id.in_(ids)).tuples()}
+            rows = [row for row in rows if row["track"] in existing]
+            TrackHash.delete().where(TrackHash.track.in_(ids)).execute()
+            if rows:
+                TrackHash.insert_many(rows).execute()
+        self.__stats.hashed += len(rows)
+
+    def __reportProgress(self) -> None:
+        if self.__progress is not None:
+            self.__progress(self.__stats.checked, self.__stats.hashed)
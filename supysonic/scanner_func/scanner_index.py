@@ -0,0 +1,65 @@
+"""Preload the known tracks of a root folder so unchanged files skip the database."""
+
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple, TYPE_CHECKING
+
+from ..db import Folder, Track
+
+if TYPE_CHECKING:
+    from ..scanner import Scanner
+
+
+def folderTracks(folder: Folder):
+    """Condition matching the tracks stored under ``folder``, a root or any directory below one."""
+    if folder.root:
+        return Track.root_folder == folder
+    folders = Folder.select(Folder.id).where(
+        (Folder.id == folder.id) | Folder.path.startswith(folder.path + os.sep)
+    )
+    return Track.folder.in_(folders)
+
+
+class TrackPathIndex:
+    """``path_hash -> last_modification`` for every track under one scanned folder.
+
+    Only the modification times are kept: they are all an unchanged file needs,
+    and the few changed files load their row by hash afterwards.
+    """
+
+    def __init__(self, folder: Folder) -> None:
+        query = (
+            Track.select(Track._path_hash, Track.last_modification, Track.mtime_ns)
+            .where(folderTracks(folder))
+            .tuples()
+        )
+        self.__mtimes: Dict[bytes, Tuple[int, Optional[int]]] = {
+            bytes(digest): (mtime, mtime_ns) for digest, mtime, mtime_ns in query
+        }
+
+    def __len__(self) -> int:
+        return len(self.__mtimes)
+
+    def last_modification(self, digest: bytes) -> Optional[int]:
+        mtimes = self.__mtimes.get(digest)
+        return mtimes[0] if mtimes is not None else None
+
+    def mtime_ns(self, digest: bytes) -> Optional[int]:
+        mtimes = self.__mtimes.get(digest)
+        return mtimes[1] if mtimes is not None else None
+
+
+@contextmanager
+def openTrackPathIndex(scanner: Scanner, folder: Folder) -> Iterator[Optional[TrackPathIndex]]:
+    # A forced scan reloads every file anyway.
+    if getattr(scanner, "force_scan", False):
+        yield None
+        return
+
+    scanner.track_index = TrackPathIndex(folder)
+    try:
+        yield scanner.track_index
+    finally:
+        scanner.track_index = None
@@ -3,46 +3,126 @@
 from __future__ import annotations
 
 import os
+import time
 
 from datetime import datetime
-from typing import Any, Dict, List, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
-from ..db import Album, Artist, Folder
+from ..db import Album, Artist, Folder, get_identity_generation
 from .scanner_review_tasks import rememberNewArtist
 
 if TYPE_CHECKING:
     from ..scanner import Scanner
 
+# How long a scan trusts its cached rows before checking whether the metadata
+# editor merged or renamed something meanwhile.
+IDENTITY_RECHECK_SECONDS = 1.0
+
+
+class ScanIdentityCache:
+    """Artist, Album and Folder rows resolved during a scan.
+
+    Rows are looked up or created once per distinct name or path, then reused
+    for every following track. The whole cache is dropped when the identity
+    generation stored in the database changes, or when the scan itself removes
+    rows it may hold.
+    """
+
+    def __init__(self) -> None:
+        self.artists: Dict[str, Artist] = {}
+        self.albums: Dict[Tuple[str, Any], Album] = {}
+        self.folders: Dict[str, Folder] = {}
+        self.root_folders: Optional[List[Tuple[str, Folder]]] = None
+        self.__generation = get_identity_generation()
+        self.__checked = time.monotonic()
+
+    def validate(self, force: bool = False) -> None:
+        if not force and time.monotonic() - self.__checked < IDENTITY_RECHECK_SECONDS:
+            return
+
+        self.__checked = time.monotonic()
+        generation = get_identity_generation()
+        if generation != self.__generation:
+            self.clear()
+            self.__generation = generation
+
+    def clear(self) -> None:
+        self.artists.clear()
+        self.albums.clear()
+        self.folders.clear()
+        self.root_folders = None
+
+
+def getIdentityCache(scanner: Optional[Scanner]) -> Optional[ScanIdentityCache]:
+    if scanner is None:
+        return None
+    if not hasattr(scanner, "identity_cache"):
+        scanner.identity_cache = ScanIdentityCache()
+    else:
+        scanner.identity_cache.validate()
+    return scanner.identity_cache
+
+
+def clearIdentityCache(scanner: Scanner) -> None:
+    cache = getattr(scanner, "identity_cache", None)
+    if cache is not None:
+        cache.clear()
+
 
 def findAlbum(scanner: Scanner, artist: str, album: str) -> Album:
     artistRow = findArtist(scanner, artist)
-    albumRow = artistRow.albums.where(Album.name == album).first()
-    if albumRow:
-        return albumRow
+    return getOrCreateAlbum(scanner, album, artistRow)[0]
 
-    scanner.stats().added.albums += 1
-    return Album.create(name=album, artist=artistRow)
+
+def getOrCreateAlbum(scanner: Scanner, album: str, artist: Artist) -> Tuple[Album, bool]:
+    cache = getIdentityCache(scanner)
+    key = (album, artist.id)
+    albumRow = cache.albums.get(key)
+    if albumRow is not None:
+        return albumRow, False
+
+    albumRow, created = Album.get_or_create(name=album, artist=artist)
+    if created:
+        scanner.stats().added.albums += 1
+    cache.albums[key] = albumRow
+    return albumRow, created
 
 
 def findArtist(scanner: Scanner, artist: str) -> Artist:
+    cache = getIdentityCache(scanner)
+    artistRow = cache.artists.get(artist)
+    if artistRow is not None:
+        return artistRow
+
     try:
         artistRow = Artist.get(name=artist)
         if artistRow.real_artist:
-            return artistRow.real_artist
-        return artistRow
+            artistRow = artistRow.real_artist
     except Artist.DoesNotExist:
         scanner.stats().added.artists += 1
-        artist_row = Artist.create(name=artist)
-        rememberNewArtist(scanner, artist_row)
-        return artist_row
+        artistRow = Artist.create(name=artist)
+        rememberNewArtist(scanner, artistRow)
+
+    cache.artists[artist] = artistRow
+    return artistRow
 
 
-def findRootFolder(path: str) -> Folder:
+def _loadRootFolders(scanner: Optional[Scanner]) -> List[Tuple[str, Folder]]:
+    cache = getIdentityCache(scanner)
+    if cache is not None and cache.root_folders is not None:
+        return cache.root_folders
+
+    rootFolders = [(os.path.abspath(folder.path), folder) for folder in Folder.select().where(Folder.root)]
+    if cache is not None:
+        cache.root_folders = rootFolders
+    return rootFolders
+
+
+def findRootFolder(path: str, scanner: Optional[Scanner] = None) -> Folder:
     currentPath = os.path.abspath(os.path.dirname(path))
     matchedFolder = None
     matchedPathLength = -1
-    for folder in Folder.select().where(Folder.root):
-        folderPath = os.path.abspath(folder.path)
+    for folderPath, folder in _loadRootFolders(scanner):
         try:
             if os.path.commonpath([currentPath, folderPath]) != folderPath:
                 continue
@@ -63,13 +143,23 @@ def findRootFolder(path: str) -> Folder:
     )
 
 
-def findFolder(path: str) -> Folder:
+def findDirectoryFolder(path: str, scanner: Optional[Scanner] = None) -> Folder:
+    # ``findFolder`` resolves the directory holding a file, a trailing separator
+    # makes ``path`` that directory.
+    return findFolder(os.path.join(path, ""), scanner)
+
+
+def findFolder(path: str, scanner: Optional[Scanner] = None) -> Folder:
+    cache = getIdentityCache(scanner)
     children: List[Dict[str, Any]] = []
     drive, _ = os.path.splitdrive(path)
     currentPath = os.path.dirname(path)
     folder = None
 
     while currentPath not in (drive, "/"):
+        if cache is not None and currentPath in cache.folders:
+            folder = cache.folders[currentPath]
+            break
         try:
             folder = Folder.get(path=currentPath)
             break
@@ -91,4 +181,6 @@ def findFolder(path: str) -> Folder:
     while children:
         folder = Folder.create(parent=folder, **children.pop())
 
+    if cache is not None:
+        cache.folders[os.path.dirname(path)] = folder
     return folder
@@ -0,0 +1,132 @@
+"""Recognise files that were moved while nobody watched and keep their track rows."""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from ..db import Folder, Track, TrackHash, path_hash
+from .scanner_batch import batchedFile
+from .scanner_common import tryLoadTag
+from .scanner_file import buildTrackData, newTrackData
+from .scanner_hash import availableHashAlgorithms, hashFile
+from .scanner_index import folderTracks
+from .scanner_pipeline import openScanTarget, persistScannedTrack
+from .scanner_records import moveFile
+from .scanner_timing import timedStage
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from ..scanner import Scanner
+    from .scanner_types import SeenEntries
+
+# Fields of a track a move leaves alone, compared when no content hash is known.
+FINGERPRINT_FIELDS = ("title", "disc", "number", "duration", "bitrate")
+
+
+class MovedTracks:
+    """Match files new to the library against tracks of the scanned folder whose file disappeared.
+
+    A file without a row is held back while a track under the folder has its
+    size and modification time, which a rename or a move keeps. Once the walk
+    is over, a candidate the walk didn't meet and whose file is gone is
+    confirmed with the track's content hash when it has one, its tags (duration
+    included) otherwise. Matched rows are re-pointed with ``moveFile`` so their
+    plays, stars, ratings and playlist entries survive and the file isn't parsed
+    again. The other held back files are scanned, from the tags already read
+    when there are some.
+    """
+
+    def __init__(self, scanner: Scanner, folder: Folder) -> None:
+        self.__scanner = scanner
+        self.__folder = folder
+        self.__by_mtime: Optional[Dict[int, List[Tuple[UUID, str, Optional[int]]]]] = None
+        self.__held: List[os.DirEntry] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.__held)
+
+    def hold(self, entry: os.DirEntry) -> bool:
+        """Keep ``entry`` for ``resolve`` if it may be one of the folder's tracks, moved."""
+        digest = path_hash(entry.path)
+        index = getattr(self.__scanner, "track_index", None)
+        if index is not None:
+            if index.last_modification(digest) is not None:
+                return False
+        elif Track.select(Track.id).where(Track._path_hash == digest).exists():
+            return False
+
+        if not self.__candidates(entry.stat()):
+            return False
+        self.__held.append(entry)
+        return True
+
+    def resolve(self, seen: SeenEntries, scan_file: Callable[[os.DirEntry], None]) -> None:
+        held, self.__held = self.__held, []
+        for entry in held:
+            if self.__scanner.stop_requested:
+                return
+            try:
+                self.__resolve(entry, seen, scan_file)
+            except OSError:
+                self.__scanner.stats().errors.append(entry.path)
+
+    def __resolve(self, entry: os.DirEntry, seen: SeenEntries, scan_file: Callable[[os.DirEntry], None]) -> None:
+        stat = entry.stat()
+        mtime = int(stat.st_mtime)
+        tag, data = None, None
+        for candidate in self.__candidates(stat):
+            trackId, path, _ = candidate
+            if path_hash(path) in seen.files or os.path.exists(path):
+                continue
+
+            known = TrackHash.get_or_none(TrackHash.track == trackId)
+            if known is not None and known.algorithm in availableHashAlgorithms():
+                if known.size != stat.st_size or hashFile(entry.path, known.algorithm)[0] != known.digest:
+                    continue
+            else:
+                if tag is None:
+                    with timedStage(self.__scanner, "tags"):
+                        tag = tryLoadTag(entry.path)
+                    if tag is None:
+                        # Neither a move nor anything the scan could read.
+                        return
+                    data = buildTrackData(self.__scanner, entry.name, mtime, tag)
+                track = Track.get_by_id(trackId)
+                if any(data[name] != getattr(track, name) for name in FINGERPRINT_FIELDS):
+                    continue
+
+            with batchedFile(self.__scanner, entry.path):
+                moveFile(self.__scanner, path, entry.path)
+                self.__scanner.stats().moved += 1
+            self.__by_mtime[mtime].remove(candidate)
+            return
+
+        if tag is None:
+            scan_file(entry)
+            return
+
+        opened = openScanTarget(self.__scanner, entry)
+        if opened is None:
+            return
+        with batchedFile(self.__scanner, entry.path):
+            persistScannedTrack(
+                self.__scanner, entry.path, entry.name, mtime, None, tag, newTrackData(None, entry.path, stat), data
+            )
+
+    def __candidates(self, stat: os.stat_result) -> List[Tuple[UUID, str, Optional[int]]]:
+        # Only built once a scan meets a new file, unchanged rescans never pay for it.
+        if self.__by_mtime is None:
+            self.__by_mtime = {}
+            query = Track.select(Track.id, Track.path, Track.last_modification, Track.size).where(
+                folderTracks(self.__folder)
+            )
+            for trackId, path, mtime, size in query.tuples():
+                self.__by_mtime.setdefault(mtime, []).append((trackId, path, size))
+        # Rows scanned before sizes were stored match on the modification time alone.
+        return [
+            candidate
+            for candidate in self.__by_mtime.get(int(stat.st_mtime), [])
+            if candidate[2] is None or candidate[2] == stat.st_size
+        ]
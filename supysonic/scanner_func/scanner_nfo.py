@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
 
 from ..db import Album, AlbumArtist, Folder, Track, TrackArtist
 from ..nfo.nfo import NfoHandler
@@ -46,22 +47,79 @@ def readNfo(nfoPath: str) -> Dict[str, Any]:
     return nfoData
 
 
-def _loadAlbumNfo(scanner: Scanner, path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
-    nfoData = None
-    folderPath = None
+def _freezeNfo(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freezeNfo(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freezeNfo(item) for item in value)
+    return value
 
-    if not os.path.exists(path):
-        return None, None
+
+EMPTY_NFO: Mapping[str, Any] = MappingProxyType({})
+
+
+class NfoCache:
+    """Parsed ``album.nfo`` files shared by every track of a directory during a scan.
+
+    Hits are keyed by the file size and mtime so an edited file is parsed again.
+    Misses are remembered without a stat, callers expecting a new file (the
+    watcher) go through :meth:`discard` first.
+    """
+
+    def __init__(self) -> None:
+        self.__entries: Dict[str, Tuple[Optional[Tuple[int, int]], Mapping[str, Any]]] = {}
+
+    def read(self, nfoPath: str) -> Mapping[str, Any]:
+        entry = self.__entries.get(nfoPath)
+        if entry is not None and entry[0] is None:
+            return entry[1]
+
+        try:
+            st = os.stat(nfoPath)
+        except OSError:
+            self.__entries[nfoPath] = (None, EMPTY_NFO)
+            return EMPTY_NFO
+
+        signature = (st.st_mtime_ns, st.st_size)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        nfoData = _freezeNfo(readNfo(nfoPath))
+        self.__entries[nfoPath] = (signature, nfoData)
+        return nfoData
+
+    def discard(self, nfoPath: str) -> None:
+        self.__entries.pop(nfoPath, None)
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+
+def getNfoCache(scanner: Scanner) -> NfoCache:
+    if not hasattr(scanner, "nfo_cache"):
+        scanner.nfo_cache = NfoCache()
+    return scanner.nfo_cache
+
+
+def readCachedNfo(scanner: Scanner, nfoPath: str) -> Mapping[str, Any]:
+    return getNfoCache(scanner).read(nfoPath)
+
+
+def _loadAlbumNfo(scanner: Scanner, path: str) -> Tuple[Optional[Mapping[str, Any]], Optional[str]]:
     if os.path.isfile(path):
-        nfoData = readNfo(path)
+        nfoPath = path
         folderPath = os.path.dirname(path)
     elif os.path.isdir(path):
-        folderPath = path
         nfoPath = os.path.join(path, "album.nfo")
-        if os.path.exists(nfoPath):
-            nfoData = readNfo(nfoPath)
+        folderPath = path
+    else:
+        return None, None
 
-    return nfoData, folderPath
+    # The caller reacts to a change on disk, which may fall within the mtime
+    # resolution of the cached entry: always parse again.
+    cache = getNfoCache(scanner)
+    cache.discard(nfoPath)
+    return cache.read(nfoPath) or None, folderPath
 
 
 def _loadAlbumFolderState(folderPath: str) -> Tuple[Optional[Folder], Optional[Track], Optional[List[Track]]]:
@@ -80,7 +138,7 @@ def _loadAlbumFolderState(folderPath: str) -> Tuple[Optional[Folder], Optional[T
 def _renowAlbumMetadata(
     scanner: Scanner,
     albumElement: Album,
-    nfoData: Dict[str, Any],
+    nfoData: Mapping[str, Any],
     logger: logging.Logger,
 ) -> None:
     nfoYear = nfoData.get("album", {}).get("year", None)
@@ -129,7 +187,7 @@ def _validateTrackNumbers(allTracks: List[Track], logger: logging.Logger) -> boo
 def _renowTrackArtists(
     scanner: Scanner,
     albumElement: Album,
-    nfoData: Dict[str, Any],
+    nfoData: Mapping[str, Any],
     logger: logging.Logger,
 ) -> None:
     nfoTracks = nfoData.get("album", {}).get("track", [])
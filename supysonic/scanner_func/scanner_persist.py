@@ -50,8 +50,8 @@ def createOrUpdateTrack(
     artist: Artist,
 ) -> Optional[Track]:
     if track is None:
-        track_data["root_folder"] = findRootFolder(path)
-        track_data["folder"] = findFolder(path)
+        track_data["root_folder"] = findRootFolder(path, scanner)
+        track_data["folder"] = findFolder(path, scanner)
         track_data["album"] = album
         track_data["artist"] = artist
         track_data["created"] = datetime.fromtimestamp(mtime)
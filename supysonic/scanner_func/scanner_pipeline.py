@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import TYPE_CHECKING, Union
+import stat
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING, Union
 
+from .scanner_dirty import markTrackDirty
 from .scanner_file import (
     buildTrackData,
     getScanTargetInfo,
@@ -15,10 +17,12 @@ from .scanner_file import (
 from .scanner_persist import createOrUpdateTrack, resolveTrackArtists
 from .scanner_relations import replaceTrackArtists
 from .scanner_trace import logTrace
+from .scanner_types import ScanTarget
 
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
+    from ..db import Track
     from ..scanner import Scanner
 
 
@@ -57,31 +61,67 @@ def _getTrackArtistSource(nfo_data, track_data, track_artists, artists) -> str:
     return "resolver override"
 
 
-def processScanFile(scanner: Scanner, path_or_direntry: Union[str, os.DirEntry]) -> None:
+def _isRegularFile(target: ScanTarget) -> bool:
+    # Reuse the stat already taken for the target rather than hitting the disk again.
+    mode = getattr(target.stat, "st_mode", None)
+    if mode is None:
+        return os.path.isfile(target.path)
+    return stat.S_ISREG(mode)
+
+
+def openScanTarget(
+    scanner: Scanner,
+    path_or_direntry: Union[str, os.DirEntry],
+) -> Optional[Tuple[ScanTarget, int]]:
     target = getScanTargetInfo(path_or_direntry)
     if target is None:
-        return
+        return None
 
     path = target.path
-    basename = target.basename
-    stat = target.stat
     if not _validateScanPath(scanner, path):
-        return
+        return None
 
-    mtime = int(stat.st_mtime)
     # Keep the current FLAC bookkeeping intact while the scan pipeline is moved out.
-    if os.path.isfile(path) and ".flac" in path.lower():
+    if ".flac" in path.lower() and _isRegularFile(target):
         scanner.stats().existing_tracks += 1
 
-    track, tag, track_data = loadTrackForScan(scanner, path, mtime)
+    return target, int(target.stat.st_mtime)
+
+
+def processScanFile(scanner: Scanner, path_or_direntry: Union[str, os.DirEntry]) -> None:
+    opened = openScanTarget(scanner, path_or_direntry)
+    if opened is None:
+        return
+
+    target, mtime = opened
+    track, tag, track_data = loadTrackForScan(scanner, target.path, mtime, target.stat)
     if tag is None:
         return
 
+    persistScannedTrack(scanner, target.path, target.basename, mtime, track, tag, track_data)
+
+
+def persistScannedTrack(
+    scanner: Scanner,
+    path: str,
+    basename: str,
+    mtime: int,
+    track: Optional[Track],
+    tag: Any,
+    track_data: Dict[str, Any],
+    built_data: Optional[Dict[str, Any]] = None,
+) -> None:
     # Normalize metadata before persistence, then update artist relations last.
+    # Worker pools hand in ``built_data`` so tag parsing isn't repeated here.
     nfo_data, artists, album_id, album_context = resolveAlbumContext(scanner, path, tag)
-    track_data.update(buildTrackData(scanner, basename, mtime, tag))
+    if built_data is None:
+        built_data = buildTrackData(scanner, basename, mtime, tag)
+    track_data.update(built_data)
     track_data["_tag_artists"] = list(album_context.get("raw_artists", []))
     track_artists, track_artist = resolveTrackArtists(scanner, nfo_data, track_data, artists)
+    if track is not None:
+        # The album a retagged track leaves is repaired along with the one it joins.
+        markTrackDirty(scanner, track)
     track = createOrUpdateTrack(
         scanner,
         track,
@@ -94,6 +134,7 @@ def processScanFile(scanner: Scanner, path_or_direntry: Union[str, os.DirEntry])
     if track is None:
         return
 
+    markTrackDirty(scanner, track)
     replaceTrackArtists(scanner, track_artists, track)
     album_section = nfo_data.get("album", {})
     tag_artists = track_data.pop("_tag_artists", [])
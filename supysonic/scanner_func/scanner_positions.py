@@ -2,87 +2,160 @@
 
 from __future__ import annotations
 
-from typing import List, Tuple, TYPE_CHECKING
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, TYPE_CHECKING
 
-from ..db import Album, AlbumArtist, Artist, TrackArtist
+from peewee import Case, Tuple as RowValue, Value, fn
+
+from ..db import Album, AlbumArtist, Track, TrackArtist
+from .scanner_lookup import clearIdentityCache
 
 if TYPE_CHECKING:
     from ..scanner import Scanner
 
-def _album_artist_exists_in_tracks(album: Album, artist: Artist) -> bool:
-    for track in album.tracks:
-        if (
-            TrackArtist.select()
-            .where(
-                (TrackArtist.track_id == track)
-                & (TrackArtist.artist_id == artist)
-            )
-            .exists()
-        ):
-            return True
-    return False
+# Each CASE branch binds two parameters, keep statements under SQLite's
+# historical limit of 999 bound parameters.
+_CHUNK_SIZE = 250
+
+
+def _chunks(values: List[Any]) -> Iterable[List[Any]]:
+    for start in range(0, len(values), _CHUNK_SIZE):
+        yield values[start : start + _CHUNK_SIZE]
 
 
 def _remove_invalid_album_artist_relations() -> None:
-    relations = AlbumArtist.select().where(AlbumArtist.position == 0)
-    for relation in relations:
-        album = relation.album_id
-        artist = relation.artist_id
-        if not _album_artist_exists_in_tracks(album, artist):
-            relation.delete_instance()
-
-
-def _get_albums_needing_position_repair() -> List[Album]:
-    albums = []
-    seen_album_ids = set()
-    for relation in AlbumArtist.select().where(AlbumArtist.position == 0):
-        album = relation.album_id
-        if album.id in seen_album_ids:
-            continue
-        seen_album_ids.add(album.id)
-        albums.append(album)
-    return albums
-
-
-def _count_album_track_artists(album: Album) -> List[Tuple[Artist, int]]:
-    artist_count = {}
-    for track in album.tracks:
-        for track_artist in track.track_artists:
-            artist = track_artist.artist_id
-            if artist not in artist_count:
-                artist_count[artist] = 0
-            artist_count[artist] += 1
-    return sorted(artist_count.items(), key=lambda item: item[1], reverse=True)
-
-
-def _apply_album_artist_positions(album: Album, sorted_artists: List[Tuple[Artist, int]]) -> None:
-    for position, element in enumerate(sorted_artists, start=1):
-        artist = element[0]
-        if position == 1:
-            album.artist = artist
-            album.save()
-
-        relation = AlbumArtist.get_or_none(album_id=album, artist_id=artist)
-        if relation is None:
-            continue
-        relation.position = position
-        relation.save()
-
-        if position == 1:
-            for track in album.tracks:
-                track.artist = artist
-                track.save()
-
-        for track_relation in artist.artist_tracks:
-            if track_relation.track_id.album == album:
-                track_relation.position = position
-                track_relation.save()
+    linked = (
+        TrackArtist.select(Track.album, TrackArtist.artist_id)
+        .join(Track, on=TrackArtist.track_id == Track.id)
+        .distinct()
+    )
+    AlbumArtist.delete().where(
+        (AlbumArtist.position == 0)
+        & RowValue(AlbumArtist.album_id, AlbumArtist.artist_id).not_in(linked)
+    ).execute()
+
+
+def _get_albums_needing_position_repair() -> List[Any]:
+    query = (
+        AlbumArtist.select(AlbumArtist.album_id)
+        .where(AlbumArtist.position == 0)
+        .distinct()
+        .tuples()
+    )
+    return [album_id for (album_id,) in query]
+
+
+def _rank_album_track_artists(album_ids: List[Any]) -> Dict[Any, List[Any]]:
+    """``album_id -> [artist_id, ...]`` ordered by how many of the album's tracks credit them.
+
+    Ties keep the order in which the artists were first linked to the album's tracks.
+    """
+    ranked = defaultdict(list)
+    for chunk in _chunks(album_ids):
+        query = (
+            TrackArtist.select(Track.album, TrackArtist.artist_id)
+            .join(Track, on=TrackArtist.track_id == Track.id)
+            .where(Track.album.in_(chunk))
+            .group_by(Track.album, TrackArtist.artist_id)
+            .order_by(Track.album, fn.COUNT(TrackArtist.id).desc(), fn.MIN(TrackArtist.id))
+            .tuples()
+        )
+        for album_id, artist_id in query:
+            ranked[album_id].append(artist_id)
+    return ranked
+
+
+def _bulk_set_by_album(field, ranked_values: Dict[Any, Any]) -> int:
+    model = field.model
+    key = model.id if model is Album else Track.album
+    updated = 0
+    for chunk in _chunks(list(ranked_values)):
+        case = Case(
+            key,
+            [
+                (
+                    Value(album_id, converter=Album.id.db_value),
+                    Value(ranked_values[album_id], converter=field.db_value),
+                )
+                for album_id in chunk
+            ],
+        )
+        updated += model.update({field: case}).where(key.in_(chunk), field != case).execute()
+    return updated
+
+
+def _bulk_set_positions(model, ids_by_position: Dict[int, List[int]]) -> None:
+    # Few distinct positions exist, so grouping by value keeps the statement count low.
+    for position, ids in ids_by_position.items():
+        for chunk in _chunks(ids):
+            model.update(position=position).where(model.id.in_(chunk)).execute()
+
+
+def _apply_album_artist_positions(ranked: Dict[Any, List[Any]]) -> int:
+    """Write the ranks as positions and promote each album's first artist.
+
+    Only artists already related to the album get positions, and the tracks
+    only follow the album's main artist when that artist is related too.
+    Returns the number of albums whose main artist changed.
+    """
+    album_ids = list(ranked)
+    ranks = {
+        (album_id, artist_id): position
+        for album_id, artists in ranked.items()
+        for position, artist_id in enumerate(artists, start=1)
+    }
+
+    album_positions = defaultdict(list)
+    related = set()
+    for chunk in _chunks(album_ids):
+        query = AlbumArtist.select(
+            AlbumArtist.id, AlbumArtist.album_id, AlbumArtist.artist_id, AlbumArtist.position
+        ).where(AlbumArtist.album_id.in_(chunk))
+        for relationId, album_id, artist_id, current in query.tuples():
+            position = ranks.get((album_id, artist_id))
+            if position is None:
+                continue
+            related.add((album_id, artist_id))
+            if position != current:
+                album_positions[position].append(relationId)
+
+    track_positions = defaultdict(list)
+    for chunk in _chunks(album_ids):
+        query = (
+            TrackArtist.select(TrackArtist.id, Track.album, TrackArtist.artist_id, TrackArtist.position)
+            .join(Track, on=TrackArtist.track_id == Track.id)
+            .where(Track.album.in_(chunk))
+        )
+        for relationId, album_id, artist_id, current in query.tuples():
+            if (album_id, artist_id) not in related:
+                continue
+            position = ranks[(album_id, artist_id)]
+            if position != current:
+                track_positions[position].append(relationId)
+
+    _bulk_set_positions(AlbumArtist, album_positions)
+    _bulk_set_positions(TrackArtist, track_positions)
+
+    main_artists = {album_id: artists[0] for album_id, artists in ranked.items() if artists}
+    changed = _bulk_set_by_album(Album.artist, main_artists)
+    _bulk_set_by_album(
+        Track.artist,
+        {
+            album_id: artist_id
+            for album_id, artist_id in main_artists.items()
+            if (album_id, artist_id) in related
+        },
+    )
+    return changed
 
 
 def decideAllPositions(scanner: Scanner) -> None:
-    # Keep the scanner argument so Scanner can delegate to a consistent
-    # helper interface even though this repair step currently only needs DB state.
     _remove_invalid_album_artist_relations()
-    for album in _get_albums_needing_position_repair():
-        sorted_artists = _count_album_track_artists(album)
-        _apply_album_artist_positions(album, sorted_artists)
+    album_ids = _get_albums_needing_position_repair()
+    if not album_ids:
+        return
+
+    ranked = _rank_album_track_artists(album_ids)
+    if _apply_album_artist_positions(ranked):
+        # Cached albums are keyed by their main artist.
+        clearIdentityCache(scanner)
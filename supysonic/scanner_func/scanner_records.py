@@ -5,10 +5,11 @@ from __future__ import annotations
 import logging
 
 from ..db import Track
-from ..tool import get_file_md5
+from .scanner_dirty import markTrackDirty
+from .scanner_hash import TrackHasher
 from .scanner_lookup import findFolder, findRootFolder
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..scanner import Scanner
@@ -18,10 +19,13 @@ def removeFile(scanner: Scanner, path: str) -> None:
         raise TypeError("Expecting string, got " + str(type(path)))
 
     try:
-        Track.get(path=path).delete_instance(recursive=True)
-        scanner.stats().deleted.tracks += 1
+        track = Track.get(path=path)
     except Track.DoesNotExist:
-        pass
+        return
+
+    markTrackDirty(scanner, track)
+    track.delete_instance(recursive=True)
+    scanner.stats().deleted.tracks += 1
 
 
 def moveFile(scanner: Scanner, src_path: str, dst_path: str) -> None:
@@ -47,21 +51,22 @@ def moveFile(scanner: Scanner, src_path: str, dst_path: str) -> None:
         track.root_folder = root
         track.folder = folder
     except Track.DoesNotExist:
-        root = findRootFolder(dst_path)
-        folder = findFolder(dst_path)
+        root = findRootFolder(dst_path, scanner)
+        folder = findFolder(dst_path, scanner)
         track.root_folder = root
         track.folder = folder
 
     track.path = dst_path
     track.save()
+    markTrackDirty(scanner, track)
 
 
-def renowTrackHash(logger: logging.Logger) -> None:
-    # Keep this utility near other Track row maintenance helpers.
-    for track in Track.select():
-        path = track.path
-        if track.content_hash == "NULL":
-            hashValue = get_file_md5(path)
-            track.content_hash = hashValue
-            track.save()
-            logger.info(f"renow track {track.title} hash to {hashValue}")
+def renowTrackHash(
+    logger: logging.Logger, jobs: Optional[int] = None, algorithm: Optional[str] = None
+) -> TrackHasher:
+    # Only files whose size or mtime changed since their last hash are read again.
+    hasher = TrackHasher(jobs=jobs, algorithm=algorithm)
+    hasher.hash_tracks()
+    stats = hasher.stats()
+    logger.info(f"renewed {stats.hashed} of {stats.checked} track hashes with {hasher.algorithm}")
+    return hasher
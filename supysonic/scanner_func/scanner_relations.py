@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-from peewee import IntegrityError
-from typing import Iterable, List, Optional, Tuple, TYPE_CHECKING, Union
+from contextlib import nullcontext
+from peewee import IntegrityError, Model
+from typing import Iterable, List, Optional, Tuple, TYPE_CHECKING, Type, Union
 
 from ..db import Album, AlbumArtist, Artist, Track, TrackArtist
 from .scanner_common import sanitizeString
-from .scanner_lookup import findArtist
+from .scanner_lookup import clearIdentityCache, findArtist, getOrCreateAlbum
 from .scanner_review_tasks import rememberNewAlbum
 
 if TYPE_CHECKING:
@@ -21,6 +22,53 @@ def _normalize_artist_names(scanner: Scanner, artists: Iterable[Optional[str]])
     return artist_names
 
 
+def _linkArtistsOneByOne(
+    scanner: Scanner,
+    model: Type[Model],
+    owner: str,
+    target: Model,
+    artists: List[Artist],
+) -> None:
+    for artist in artists:
+        try:
+            model.get_or_create(**{owner: target, "artist_id": artist})
+        except IntegrityError:
+            refreshed_artist = Artist.get_or_none(Artist.id == artist.id)
+            if refreshed_artist is None:
+                refreshed_artist = findArtist(scanner, artist.name)
+            model.get_or_create(**{owner: target, "artist_id": refreshed_artist})
+
+
+def _linkArtists(
+    scanner: Scanner,
+    model: Type[Model],
+    owner: str,
+    target: Model,
+    artists: List[Artist],
+) -> List[Model]:
+    owner_field = getattr(model, owner)
+    linked = {
+        relation.artist_id_id: relation
+        for relation in model.select().where(owner_field == target, model.artist_id.in_([a.id for a in artists]))
+    }
+    missing = [artist for artist in dict.fromkeys(artists) if artist.id not in linked]
+    if missing:
+        try:
+            with model._meta.database.atomic():
+                model.insert_many(
+                    [{owner_field: target, model.artist_id: artist} for artist in missing]
+                ).execute()
+        except IntegrityError:
+            # An artist row went away since it was resolved, e.g. merged by the metadata editor.
+            clearIdentityCache(scanner)
+            _linkArtistsOneByOne(scanner, model, owner, target, missing)
+        linked = {
+            relation.artist_id_id: relation
+            for relation in model.select().where(owner_field == target)
+        }
+    return [linked[artist.id] for artist in artists if artist.id in linked]
+
+
 def recordAlbumArtists(
     scanner: Scanner,
     artists: Iterable[Optional[str]],
@@ -28,7 +76,12 @@ def recordAlbumArtists(
     main_artist: Optional[Union[Artist, str]] = None,
 ) -> Tuple[List[AlbumArtist], Album, Artist]:
     artist_names = _normalize_artist_names(scanner, artists)
-    with Artist._meta.database.atomic():
+    # Batched scans already run each file in its own savepoint.
+    if getattr(scanner, "scan_batch", None) is not None:
+        transaction = nullcontext()
+    else:
+        transaction = Artist._meta.database.atomic()
+    with transaction:
         resolved_artists = [findArtist(scanner, name) for name in artist_names]
 
         if main_artist is None:
@@ -38,24 +91,11 @@ def recordAlbumArtists(
         else:
             main = findArtist(scanner, main_artist)
 
-        album_row, created = Album.get_or_create(name=album, artist=main)
+        album_row, created = getOrCreateAlbum(scanner, album, main)
         if created:
-            scanner.stats().added.albums += 1
             rememberNewAlbum(scanner, album_row)
 
-        relations = []
-        for artist in resolved_artists:
-            try:
-                relation, _ = AlbumArtist.get_or_create(album_id=album_row, artist_id=artist)
-            except IntegrityError:
-                refreshed_artist = Artist.get_or_none(Artist.id == artist.id)
-                if refreshed_artist is None:
-                    refreshed_artist = findArtist(scanner, artist.name)
-                relation, _ = AlbumArtist.get_or_create(
-                    album_id=album_row,
-                    artist_id=refreshed_artist,
-                )
-            relations.append(relation)
+        relations = _linkArtists(scanner, AlbumArtist, "album_id", album_row, resolved_artists)
     return relations, album_row, resolved_artists[0]
 
 
@@ -66,19 +106,7 @@ def recordTrackArtists(
 ) -> Tuple[List[TrackArtist], Artist]:
     artist_names = _normalize_artist_names(scanner, artists)
     resolved_artists = [findArtist(scanner, name) for name in artist_names]
-    relations = []
-    for artist in resolved_artists:
-        try:
-            relation, _ = TrackArtist.get_or_create(track_id=track, artist_id=artist)
-        except IntegrityError:
-            refreshed_artist = Artist.get_or_none(Artist.id == artist.id)
-            if refreshed_artist is None:
-                refreshed_artist = findArtist(scanner, artist.name)
-            relation, _ = TrackArtist.get_or_create(
-                track_id=track,
-                artist_id=refreshed_artist,
-            )
-        relations.append(relation)
+    relations = _linkArtists(scanner, TrackArtist, "track_id", track, resolved_artists)
     return relations, resolved_artists[0]
 
 
@@ -7,7 +7,7 @@ import logging
 from datetime import timedelta
 from typing import TYPE_CHECKING
 
-from ..db import Album, Artist, ReviewTask, close_connection, open_connection, now
+from ..db import Album, Artist, ReviewTask, connection_context, now
 from ..logging_utils import format_log_event
 
 if TYPE_CHECKING:
@@ -615,13 +615,10 @@ def createReviewTaskBootstrap() -> int:
 
 
 def runReviewTaskBootstrap() -> int:
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         created = createReviewTaskBootstrap()
         logPendingReviewTasks("bootstrap")
         return created
-    finally:
-        close_connection()
 
 
 def createReviewTaskMaintenance() -> int:
@@ -636,18 +633,12 @@ def createReviewTaskMaintenance() -> int:
 
 
 def runReviewTaskMaintenance() -> int:
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         updated = createReviewTaskMaintenance()
         logPendingReviewTasks("maintenance", include_details=False)
         return updated
-    finally:
-        close_connection()
 
 
 def runMissingYearAlbumReviewBootstrap() -> int:
-    open_connection(reuse=True)
-    try:
+    with connection_context():
         return createMissingYearAlbumReviewTasks()
-    finally:
-        close_connection()
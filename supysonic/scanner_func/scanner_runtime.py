@@ -3,41 +3,189 @@
 from __future__ import annotations
 
 import logging
+import os
 
-from ..db import Album, Artist, Folder, close_connection, open_connection
+from ..db import (
+    Album,
+    AlbumStats,
+    Artist,
+    ArtistStats,
+    Folder,
+    SearchIndex,
+    Track,
+    bump_library_generation,
+    close_connection,
+    db,
+    open_connection,
+)
 from ..logging_utils import format_log_event
+from .scanner_checkpoint import SCAN_STAGES, ScanCheckpointer, openScanCheckpoint
+from .scanner_dirty import chunkIds, getDirtySet
+from .scanner_lookup import clearIdentityCache, findDirectoryFolder, findRootFolder
 from .scanner_review_tasks import createReviewTasks
+from .scanner_timing import formatStageTimings, getStageTimings, timedStage
 
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..scanner import Scanner
 
-def _scanQueuedFolders(scanner: Scanner) -> None:
+
+def _resolveQueuedFolder(scanner: Scanner, folderName: str) -> Optional[Folder]:
+    try:
+        return Folder.get(name=folderName, root=True)
+    except Folder.DoesNotExist:
+        pass
+
+    # Subtree scans are queued by the absolute path of their directory.
+    if not os.path.isabs(folderName) or not os.path.isdir(folderName):
+        return None
+    try:
+        findRootFolder(os.path.join(folderName, ""), scanner)
+    except Exception:
+        return None
+    return findDirectoryFolder(folderName, scanner)
+
+
+def _scanQueuedFolders(scanner: Scanner, checkpoint: Optional[ScanCheckpointer] = None) -> None:
     while not scanner.stop_requested:
         folderName = scanner.next_queued_folder()
         if folderName is None:
             break
 
-        try:
-            folder = Folder.get(name=folderName, root=True)
-        except Folder.DoesNotExist:
+        folder = _resolveQueuedFolder(scanner, folderName)
+        if folder is None:
             continue
 
+        if checkpoint is not None:
+            checkpoint.start_root(folderName)
         scanner.scan_folder(folder)
+        if checkpoint is not None and not scanner.stop_requested:
+            checkpoint.finish_root()
 
 
 def pruneLibrary(scanner: Scanner) -> None:
     if scanner.stop_requested:
         return
 
-    scanner.stats().deleted.albums += Album.prune()
-    scanner.stats().deleted.artists += Artist.prune()
-    Folder.prune()
+    # The albums left without tracks go away below, keep the artists they
+    # credited so that their album counts are refreshed.
+    dirty = getDirtySet(scanner)
+    dirty.artists.update(dirty.artist_ids())
+    with db.atomic():
+        albums = Album.prune()
+        artists = Artist.prune()
+        folders = Folder.prune()
+    scanner.stats().deleted.albums += albums
+    scanner.stats().deleted.artists += artists
+    clearIdentityCache(scanner)
+    with timedStage(scanner, "album_stats"):
+        refreshed = refreshAlbumStats(scanner)
+    with timedStage(scanner, "artist_stats"):
+        refreshed = refreshArtistStats(scanner) or refreshed
+    with timedStage(scanner, "search_index"):
+        refreshed = refreshSearchIndex(scanner) or refreshed
+
+    # What the API built from the library, like the artist indexes, is out of date.
+    if refreshed or albums or artists or folders:
+        bump_library_generation()
+
+
+def refreshAlbumStats(scanner: Scanner) -> bool:
+    # The dirty set is left for repair. Albums without statistics yet, from a
+    # library scanned before they existed, are filled in on the way.
+    album_ids = set(getDirtySet(scanner).albums)
+    album_ids.update(AlbumStats.missing())
+    with db.atomic():
+        AlbumStats.refresh(album_ids)
+    return bool(album_ids)
+
+
+def refreshArtistStats(scanner: Scanner) -> bool:
+    # The artists of the dirty albums are included, their album counts may have moved.
+    artist_ids = set(getDirtySet(scanner).artist_ids())
+    artist_ids.update(ArtistStats.missing())
+    with db.atomic():
+        ArtistStats.refresh(artist_ids)
+    return bool(artist_ids)
+
+
+def refreshSearchIndex(scanner: Scanner) -> bool:
+    # Folder names never change, a renamed directory is a new folder. The
+    # tracks of the dirty albums are those added or changed.
+    dirty = getDirtySet(scanner)
+    album_ids = set(dirty.albums)
+    track_ids = set()
+    for chunk in chunkIds(album_ids):
+        track_ids.update(t for (t,) in Track.select(Track.id).where(Track.album.in_(chunk)).tuples())
+    targets = (
+        (SearchIndex.folder, set()),
+        (SearchIndex.artist, set(dirty.artist_ids())),
+        (SearchIndex.album, album_ids),
+        (SearchIndex.track, track_ids),
+    )
+    refreshed = False
+    with db.atomic():
+        for field, ids in targets:
+            ids.update(SearchIndex.missing(field))
+            SearchIndex.refresh(field, ids)
+            refreshed = refreshed or bool(ids)
+    return refreshed
+
+
+def _runRepair(scanner: Scanner, logger: logging.Logger) -> None:
+    logger.info(format_log_event("scanner", "repair_start"))
+    scanner.find_lost_information()
+
+
+def _runReviewTasks(scanner: Scanner, logger: logging.Logger) -> None:
+    created_review_tasks = createReviewTasks(scanner)
+    logger.info(
+        format_log_event("scanner", "review_tasks_created", count=created_review_tasks)
+    )
+
+
+def _runPostScanStages(
+    scanner: Scanner, checkpoint: Optional[ScanCheckpointer], logger: logging.Logger
+) -> bool:
+    # Queue processing finishes first. The remaining steps depend on
+    # having a complete view of the library state after traversal.
+    stages = {
+        "positions": lambda: scanner.decideAllPositions(),
+        "prune": lambda: pruneLibrary(scanner),
+        "repair": lambda: _runRepair(scanner, logger),
+        "review_tasks": lambda: _runReviewTasks(scanner, logger),
+    }
+    for stage in list(checkpoint.stages if checkpoint is not None else SCAN_STAGES):
+        if scanner.stop_requested:
+            return False
+        with timedStage(scanner, stage):
+            stages[stage]()
+        # A stage cut short by a stop request is run again on resume.
+        if checkpoint is not None and not scanner.stop_requested:
+            checkpoint.finish_stage(stage)
+    return not scanner.stop_requested
+
+
+def _logStopped(scanner: Scanner, logger: logging.Logger) -> None:
+    stats_getter = getattr(scanner, "stats", None)
+    stats = stats_getter() if callable(stats_getter) else None
+    logger.info(
+        format_log_event(
+            "scanner",
+            "run_stopped",
+            scanned=getattr(stats, "scanned", "-"),
+            existing_tracks=getattr(stats, "existing_tracks", "-"),
+            result="stopped",
+        )
+    )
 
 
 def runScanner(scanner: Scanner, logger: logging.Logger) -> None:
     opened = open_connection(True)
+    timings = getStageTimings(scanner)
+    if timings is not None:
+        timings.start()
     try:
         logger.info(
             format_log_event(
@@ -47,31 +195,25 @@ def runScanner(scanner: Scanner, logger: logging.Logger) -> None:
                 follow_symlinks=getattr(scanner, "follow_symlinks", "-"),
             )
         )
-        _scanQueuedFolders(scanner)
-        if scanner.stop_requested:
-            stats_getter = getattr(scanner, "stats", None)
-            stats = stats_getter() if callable(stats_getter) else None
+        checkpoint = openScanCheckpoint(scanner)
+        if checkpoint is not None and checkpoint.resumed:
             logger.info(
                 format_log_event(
                     "scanner",
-                    "run_stopped",
-                    scanned=getattr(stats, "scanned", "-"),
-                    existing_tracks=getattr(stats, "existing_tracks", "-"),
-                    result="stopped",
+                    "run_resumed",
+                    scanned=scanner.stats().scanned,
+                    folders=len(scanner.queued_folders()),
+                    stages=",".join(checkpoint.stages) or "-",
                 )
             )
+
+        _scanQueuedFolders(scanner, checkpoint)
+        if scanner.stop_requested or not _runPostScanStages(scanner, checkpoint, logger):
+            _logStopped(scanner, logger)
             return
 
-        # Queue processing finishes first. The remaining steps depend on
-        # having a complete view of the library state after traversal.
-        scanner.decideAllPositions()
-        pruneLibrary(scanner)
-        logger.info(format_log_event("scanner", "repair_start"))
-        scanner.find_lost_information()
-        created_review_tasks = createReviewTasks(scanner)
-        logger.info(
-            format_log_event("scanner", "review_tasks_created", count=created_review_tasks)
-        )
+        if checkpoint is not None:
+            checkpoint.clear()
         stats = scanner.stats()
         logger.info(
             format_log_event(
@@ -85,11 +227,14 @@ def runScanner(scanner: Scanner, logger: logging.Logger) -> None:
                 deleted_artists=stats.deleted.artists,
                 deleted_albums=stats.deleted.albums,
                 deleted_tracks=stats.deleted.tracks,
+                moved_tracks=stats.moved,
                 errors=len(stats.errors),
                 result="completed",
+                stages=formatStageTimings(timings.snapshot() if timings is not None else None),
             )
         )
         scanner.handle_done()
     finally:
+        scanner.scan_checkpoint = None
         if opened:
             close_connection()
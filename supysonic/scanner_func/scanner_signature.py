@@ -0,0 +1,82 @@
+"""Fingerprint directory listings so unchanged directories can skip their files."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+from ..db import Folder, db, path_hash
+
+if TYPE_CHECKING:
+    from ..scanner import Scanner
+
+
+def directorySignature(path: str, entry_count: int, media: List[os.DirEntry]) -> Optional[str]:
+    """Digest of the directory mtime, its entry count and its media files' size and mtime.
+
+    Adding, removing or renaming an entry bumps the directory mtime, rewriting
+    a file in place changes its own size or mtime.
+    """
+    try:
+        digest = hashlib.sha1(f"{os.stat(path).st_mtime_ns}:{entry_count}".encode())
+        for entry in sorted(media, key=lambda e: e.name):
+            stat = entry.stat()
+            line = f"\0{entry.name}\0{stat.st_size}\0{stat.st_mtime_ns}"
+            digest.update(line.encode("utf-8", "surrogateescape"))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class FolderSignatures:
+    """Signatures stored for the directories of one root folder, and those met by the current walk."""
+
+    def __init__(self, scanner: Scanner, folder: Folder) -> None:
+        self.__force = getattr(scanner, "force_scan", False)
+        query = (
+            Folder.select(Folder.path, Folder.scan_signature)
+            .where(
+                ((Folder.id == folder.id) | Folder.path.startswith(folder.path + os.sep))
+                & Folder.scan_signature.is_null(False)
+            )
+            .tuples()
+        )
+        self.__known: Dict[str, str] = dict(query)
+        self.__pending: Dict[str, str] = {}
+
+    def check(self, path: str, entry_count: int, media: List[os.DirEntry]) -> bool:
+        """Record the directory's current signature and tell whether it is unchanged."""
+        signature = directorySignature(path, entry_count, media)
+        if signature is None:
+            return False
+        if self.__known.get(path) == signature:
+            return not self.__force
+
+        self.__pending[path] = signature
+        return False
+
+    def save(self, failed_dirs: Iterable[str]) -> None:
+        # A directory holding a file that failed to scan must be retried next time.
+        for path in failed_dirs:
+            self.__pending.pop(path, None)
+
+        with db.atomic():
+            for path, signature in self.__pending.items():
+                Folder.update(scan_signature=signature).where(
+                    Folder._path_hash == path_hash(path)
+                ).execute()
+        self.__pending.clear()
+
+
+@contextmanager
+def openFolderSignatures(scanner: Scanner, folder: Folder) -> Iterator[FolderSignatures]:
+    errors = scanner.stats().errors
+    first_error = len(errors)
+    signatures = FolderSignatures(scanner, folder)
+    yield signatures
+
+    # Only a walk that ran to the end, and whose files were all persisted, is trusted.
+    if not scanner.stop_requested:
+        signatures.save(os.path.dirname(path) for path in errors[first_error:])
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 from queue import Queue
-from typing import Optional
+from typing import List, Optional
+
+from .scanner_timing import StageTimings
 
 
 class StatsDetails:
@@ -17,6 +19,7 @@ class Stats:
     def __init__(self) -> None:
         self.scanned = 0
         self.existing_tracks = 0
+        self.moved = 0
         self.added = StatsDetails()
         self.deleted = StatsDetails()
         self.errors = []
@@ -24,6 +27,7 @@ class Stats:
         self.lost_covers_albums = {}
         self.lost_covers_artists = []
         self.lost_year_albums = {}
+        self.timings = StageTimings()
 
 
 class ScanQueue(Queue):
@@ -38,3 +42,7 @@ class ScanQueue(Queue):
     def _get(self) -> str:
         self.__last_got = self.queue.pop()
         return self.__last_got
+
+    def snapshot(self) -> List[str]:
+        with self.mutex:
+            return list(self.queue)
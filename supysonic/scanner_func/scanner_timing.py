@@ -0,0 +1,128 @@
+"""Accumulate wall time and call counts per scan stage."""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager, nullcontext
+from threading import Lock, local
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..scanner import Scanner
+
+# Reporting order, stages missing from a run are left out. Providers are
+# timed as ``provider.<name>`` inside the stage calling them.
+STAGE_NAMES = (
+    "tags",
+    "nfo",
+    "db",
+    "covers",
+    "positions",
+    "prune",
+    "album_stats",
+    "artist_stats",
+    "search_index",
+    "repair",
+    "review_tasks",
+)
+
+StageTiming = Tuple[float, int]
+
+
+class StageTimings:
+    """Wall time and calls per stage, shared by the scanner thread and its workers.
+
+    Time is exclusive: a stage measured inside another one is taken off its
+    parent, so the stages of a thread add up to at most the time it ran.
+    """
+
+    def __init__(self) -> None:
+        self.__lock = Lock()
+        self.__stages: Dict[str, List[Any]] = {}
+        self.__local = local()
+        self.__started: Optional[float] = None
+
+    def start(self) -> None:
+        self.__started = time.monotonic()
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        if self.__started is None:
+            return None
+        return time.monotonic() - self.__started
+
+    def add(self, stage: str, seconds: float, calls: int = 1) -> None:
+        with self.__lock:
+            timing = self.__stages.setdefault(stage, [0.0, 0])
+            timing[0] += seconds
+            timing[1] += calls
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        stack = getattr(self.__local, "stack", None)
+        if stack is None:
+            stack = self.__local.stack = []
+        frame = [time.perf_counter(), 0.0]
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.add(stage, elapsed - frame[1])
+            if stack:
+                stack[-1][1] += elapsed
+
+    def snapshot(self) -> Dict[str, StageTiming]:
+        with self.__lock:
+            stages = {name: (timing[0], timing[1]) for name, timing in self.__stages.items()}
+        order = {name: i for i, name in enumerate(STAGE_NAMES)}
+        return dict(sorted(stages.items(), key=lambda item: (order.get(item[0], len(order)), item[0])))
+
+
+def formatStageTimings(timings: Optional[Dict[str, StageTiming]]) -> Optional[str]:
+    """``stage:seconds/calls`` pairs for log events, ``None`` when nothing was timed."""
+    if not timings:
+        return None
+    return ",".join(f"{name}:{seconds:.3f}/{calls}" for name, (seconds, calls) in timings.items())
+
+
+def getStageTimings(scanner: Scanner) -> Optional[StageTimings]:
+    stats = getattr(scanner, "stats", None)
+    if not callable(stats):
+        return None
+    return getattr(stats(), "timings", None)
+
+
+def timedStage(scanner: Scanner, stage: str) -> ContextManager[None]:
+    timings = getStageTimings(scanner)
+    if timings is None:
+        return nullcontext()
+    return timings.measure(stage)
+
+
+class TimedClient:
+    """Time every method call of an external metadata client as ``provider.<name>``."""
+
+    def __init__(self, client: Any, timings: StageTimings, provider: str) -> None:
+        self.__client = client
+        self.__timings = timings
+        self.__stage = f"provider.{provider}"
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self.__client, name)
+        if not callable(value):
+            return value
+
+        def timed(*args, **kwargs):
+            with self.__timings.measure(self.__stage):
+                return value(*args, **kwargs)
+
+        return timed
+
+
+def timedClient(scanner: Scanner, client: Any, provider: str) -> Any:
+    timings = getStageTimings(scanner)
+    if client is None or timings is None:
+        return client
+    return TimedClient(client, timings, provider)
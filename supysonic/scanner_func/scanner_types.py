@@ -1,7 +1,8 @@
 """Define lightweight shared data structures used by scanner helper modules."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from os import stat_result
+from typing import Set
 
 
 @dataclass(frozen=True)
@@ -9,3 +10,13 @@ class ScanTarget:
     path: str
     basename: str
     stat: stat_result
+
+
+@dataclass
+class SeenEntries:
+    """Media files (by path hash) and directories met while walking a root folder."""
+
+    files: Set[bytes] = field(default_factory=set)
+    folders: Set[str] = field(default_factory=set)
+    # Directories whose signature matched, their files and cover were left alone.
+    unchanged: Set[str] = field(default_factory=set)
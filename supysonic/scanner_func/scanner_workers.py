@@ -0,0 +1,215 @@
+"""Read media tags on a worker pool while the scanner thread persists results."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING, Union
+
+import mediafile
+
+from .scanner_batch import batchedFile
+from .scanner_common import tryLoadTag
+from .scanner_file import buildTrackData, findTrackForScan, newTrackData, refreshTrackStat
+from .scanner_pipeline import openScanTarget, persistScannedTrack
+from .scanner_timing import getStageTimings
+from .scanner_types import ScanTarget
+
+if TYPE_CHECKING:
+    from ..db import Track
+    from ..scanner import Scanner
+
+logger = logging.getLogger(__name__)
+
+WORKER_MODES = ("thread", "process")
+
+# Keep a few results queued per worker so the writer never waits on an idle pool.
+IN_FLIGHT_PER_WORKER = 4
+
+
+@dataclass(frozen=True)
+class TagSnapshot:
+    """Picklable subset of ``mediafile.MediaFile`` consumed by the scan pipeline."""
+
+    title: Optional[str]
+    album: Optional[str]
+    artist: Optional[str]
+    artists: Optional[List[str]]
+    albumartist: Optional[str]
+    albumartists: Optional[List[str]]
+    disc: Optional[int]
+    track: Optional[int]
+    year: Optional[int]
+    genre: Optional[str]
+    length: float
+    bitrate: int
+    images: bool
+    mgfile: Dict[str, Any] = field(default_factory=dict)
+
+
+def _snapshotRawTags(tag: mediafile.MediaFile) -> Dict[str, Any]:
+    raw = getattr(tag, "mgfile", None)
+    if not hasattr(raw, "get"):
+        return {}
+
+    values = {}
+    for key in ("artist", "albumartist"):
+        value = raw.get(key)
+        if value is not None:
+            values[key] = list(value) if isinstance(value, (list, tuple)) else value
+    return values
+
+
+def snapshotTag(tag: mediafile.MediaFile) -> TagSnapshot:
+    return TagSnapshot(
+        title=tag.title,
+        album=tag.album,
+        artist=tag.artist,
+        artists=list(tag.artists) if tag.artists else None,
+        albumartist=tag.albumartist,
+        albumartists=list(tag.albumartists) if tag.albumartists else None,
+        disc=tag.disc,
+        track=tag.track,
+        year=tag.year,
+        genre=tag.genre,
+        length=tag.length,
+        bitrate=tag.bitrate,
+        images=bool(tag.images),
+        mgfile=_snapshotRawTags(tag),
+    )
+
+
+def readScanTags(path: str, basename: str, mtime: int) -> Optional[Tuple[TagSnapshot, Dict[str, Any]]]:
+    # Runs on pool workers: no database access and only picklable results.
+    tag = tryLoadTag(path)
+    if tag is None:
+        return None
+    return snapshotTag(tag), buildTrackData(None, basename, mtime, tag)
+
+
+def timedReadScanTags(
+    path: str, basename: str, mtime: int
+) -> Tuple[float, Optional[Tuple[TagSnapshot, Dict[str, Any]]]]:
+    # Process workers can't reach the scanner's timings, the writer records them.
+    start = time.perf_counter()
+    result = readScanTags(path, basename, mtime)
+    return time.perf_counter() - start, result
+
+
+@dataclass
+class _PendingScan:
+    target: ScanTarget
+    mtime: int
+    track: Optional[Track]
+
+
+class ScanWorkerPool:
+    """Fan tag reads out to ``jobs`` workers and persist results on the calling thread.
+
+    Database lookups and writes stay on the thread that owns the pool, so the
+    database keeps seeing a single writer whatever the pool size.
+    """
+
+    def __init__(self, scanner: Scanner, jobs: int, mode: str = "thread") -> None:
+        if mode not in WORKER_MODES:
+            raise ValueError(f"Unsupported scanner worker mode: {mode}")
+
+        self.__scanner = scanner
+        self.__window = max(1, jobs) * IN_FLIGHT_PER_WORKER
+        self.__pending: Dict[Future, _PendingScan] = {}
+        if mode == "process":
+            self.__executor: Executor = ProcessPoolExecutor(
+                max_workers=jobs,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self.__executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="scan-worker")
+
+    def submit(self, path_or_direntry: Union[str, os.DirEntry]) -> None:
+        opened = openScanTarget(self.__scanner, path_or_direntry)
+        if opened is None:
+            return
+
+        target, mtime = opened
+        track, needs_scan = findTrackForScan(self.__scanner, target.path, mtime)
+        if not needs_scan:
+            with batchedFile(self.__scanner, target.path):
+                refreshTrackStat(self.__scanner, target.path, target.stat, track)
+            return
+
+        future = self.__executor.submit(timedReadScanTags, target.path, target.basename, mtime)
+        self.__pending[future] = _PendingScan(target, mtime, track)
+        if len(self.__pending) >= self.__window:
+            self.__persistCompleted()
+
+    def drain(self) -> None:
+        while self.__pending:
+            self.__persistCompleted()
+
+    def close(self) -> None:
+        try:
+            if self.__scanner.stop_requested:
+                for future in list(self.__pending):
+                    if future.cancel():
+                        del self.__pending[future]
+            self.drain()
+        finally:
+            self.__executor.shutdown(wait=True)
+
+    def __persistCompleted(self) -> None:
+        done, _ = wait(list(self.__pending), return_when=FIRST_COMPLETED)
+        for future in done:
+            self.__persist(future, self.__pending.pop(future))
+
+    def __persist(self, future: Future, pending: _PendingScan) -> None:
+        path = pending.target.path
+        try:
+            elapsed, result = future.result()
+        except Exception:
+            # A file a worker choked on mustn't abort the scan of the others.
+            logger.exception("Failed to read tags of %s", path)
+            self.__scanner.stats().errors.append(path)
+            return
+
+        timings = getStageTimings(self.__scanner)
+        if timings is not None:
+            timings.add("tags", elapsed)
+
+        with batchedFile(self.__scanner, path):
+            if result is None:
+                if pending.track is not None:
+                    self.__scanner.remove_file(path)
+                return
+
+            tag, built_data = result
+            persistScannedTrack(
+                self.__scanner,
+                path,
+                pending.target.basename,
+                pending.mtime,
+                pending.track,
+                tag,
+                newTrackData(pending.track, path, pending.target.stat),
+                built_data,
+            )
+
+
+@contextmanager
+def openScanWorkerPool(scanner: Scanner) -> Iterator[Optional[ScanWorkerPool]]:
+    jobs = getattr(scanner, "scan_jobs", 1)
+    if jobs <= 1:
+        yield None
+        return
+
+    pool = ScanWorkerPool(scanner, jobs, getattr(scanner, "scan_worker_mode", "thread"))
+    scanner.scan_pool = pool
+    try:
+        yield pool
+    finally:
+        scanner.scan_pool = None
+        pool.close()
@@ -0,0 +1,12 @@
+CREATE TABLE IF NOT EXISTS scan_checkpoint (
+    name VARCHAR(32) PRIMARY KEY,
+    forced BOOLEAN NOT NULL,
+    current_root VARCHAR(256),
+    queue_json TEXT NOT NULL,
+    cursor_json TEXT NOT NULL,
+    root_scanned INTEGER NOT NULL,
+    scanned INTEGER NOT NULL,
+    stages_json TEXT NOT NULL,
+    dirty_json TEXT NOT NULL,
+    updated DATETIME NOT NULL
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
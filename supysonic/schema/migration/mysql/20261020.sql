@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS cover_candidate (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,
+    folder_id INTEGER NOT NULL,
+    name VARCHAR(256) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    valid BOOLEAN NOT NULL,
+    score INTEGER NOT NULL,
+    FOREIGN KEY (folder_id) REFERENCES folder(id) ON DELETE CASCADE,
+    UNIQUE KEY index_cover_candidate_folder_name (folder_id, name)
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
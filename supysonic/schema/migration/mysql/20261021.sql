@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS track_hash (
+    track_id CHAR(32) PRIMARY KEY,
+    algorithm VARCHAR(16) NOT NULL,
+    digest VARCHAR(64) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    updated DATETIME NOT NULL,
+    FOREIGN KEY (track_id) REFERENCES track(id) ON DELETE CASCADE
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
@@ -0,0 +1,3 @@
+ALTER TABLE track ADD COLUMN size BIGINT NULL;
+ALTER TABLE track ADD COLUMN mtime_ns BIGINT NULL;
+UPDATE folder SET scan_signature = NULL;
@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS album_stats (
+    album_id CHAR(32) PRIMARY KEY,
+    song_count INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    created DATETIME NOT NULL,
+    min_year INTEGER,
+    genres TEXT,
+    cover_art VARCHAR(36),
+    FOREIGN KEY (album_id) REFERENCES album(id) ON DELETE CASCADE
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS artist_stats (
+    artist_id CHAR(32) PRIMARY KEY,
+    album_count INTEGER NOT NULL,
+    FOREIGN KEY (artist_id) REFERENCES artist(id) ON DELETE CASCADE
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
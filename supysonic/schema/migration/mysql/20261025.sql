@@ -0,0 +1,13 @@
+CREATE TABLE IF NOT EXISTS search_index (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,
+    folder_id INTEGER,
+    artist_id CHAR(32),
+    album_id CHAR(32),
+    track_id CHAR(32),
+    terms TEXT NOT NULL,
+    FOREIGN KEY (folder_id) REFERENCES folder(id) ON DELETE CASCADE,
+    FOREIGN KEY (artist_id) REFERENCES artist(id) ON DELETE CASCADE,
+    FOREIGN KEY (album_id) REFERENCES album(id) ON DELETE CASCADE,
+    FOREIGN KEY (track_id) REFERENCES track(id) ON DELETE CASCADE,
+    FULLTEXT KEY index_search_index_terms (terms)
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
@@ -0,0 +1 @@
+ALTER TABLE folder ADD COLUMN IF NOT EXISTS scan_signature VARCHAR(40);
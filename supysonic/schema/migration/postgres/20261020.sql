@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS cover_candidate (
+    id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    folder_id INTEGER NOT NULL REFERENCES folder(id) ON DELETE CASCADE,
+    name VARCHAR(256) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    valid BOOLEAN NOT NULL,
+    score INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS index_cover_candidate_folder_name ON cover_candidate(folder_id, name);
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS track_hash (
+    track_id UUID PRIMARY KEY REFERENCES track(id) ON DELETE CASCADE,
+    algorithm VARCHAR(16) NOT NULL,
+    digest VARCHAR(64) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    updated TIMESTAMP NOT NULL
+);
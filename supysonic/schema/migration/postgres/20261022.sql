@@ -0,0 +1,3 @@
+ALTER TABLE track ADD COLUMN IF NOT EXISTS size BIGINT;
+ALTER TABLE track ADD COLUMN IF NOT EXISTS mtime_ns BIGINT;
+UPDATE folder SET scan_signature = NULL;
@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS search_index (
+    id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    folder_id INTEGER REFERENCES folder(id) ON DELETE CASCADE,
+    artist_id UUID REFERENCES artist(id) ON DELETE CASCADE,
+    album_id UUID REFERENCES album(id) ON DELETE CASCADE,
+    track_id UUID REFERENCES track(id) ON DELETE CASCADE,
+    terms TEXT NOT NULL,
+    document TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', terms)) STORED
+);
+CREATE INDEX IF NOT EXISTS index_search_index_folder_id_fk ON search_index(folder_id);
+CREATE INDEX IF NOT EXISTS index_search_index_artist_id_fk ON search_index(artist_id);
+CREATE INDEX IF NOT EXISTS index_search_index_album_id_fk ON search_index(album_id);
+CREATE INDEX IF NOT EXISTS index_search_index_track_id_fk ON search_index(track_id);
+CREATE INDEX IF NOT EXISTS index_search_index_document ON search_index USING GIN (document);
@@ -0,0 +1 @@
+ALTER TABLE folder ADD COLUMN scan_signature VARCHAR(40);
@@ -0,0 +1,3 @@
+ALTER TABLE track ADD COLUMN size BIGINT;
+ALTER TABLE track ADD COLUMN mtime_ns BIGINT;
+UPDATE folder SET scan_signature = NULL;
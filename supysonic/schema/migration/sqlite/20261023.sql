@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS album_stats (
+    album_id CHAR(36) PRIMARY KEY REFERENCES album(id) ON DELETE CASCADE,
+    song_count INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    created DATETIME NOT NULL,
+    min_year INTEGER,
+    genres TEXT,
+    cover_art VARCHAR(36)
+);
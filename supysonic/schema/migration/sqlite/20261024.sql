@@ -0,0 +1,4 @@
+CREATE TABLE IF NOT EXISTS artist_stats (
+    artist_id CHAR(36) PRIMARY KEY REFERENCES artist(id) ON DELETE CASCADE,
+    album_count INTEGER NOT NULL
+);
@@ -0,0 +1,12 @@
+CREATE TABLE IF NOT EXISTS search_index (
+    id INTEGER NOT NULL PRIMARY KEY,
+    folder_id INTEGER REFERENCES folder(id) ON DELETE CASCADE,
+    artist_id CHAR(36) REFERENCES artist(id) ON DELETE CASCADE,
+    album_id CHAR(36) REFERENCES album(id) ON DELETE CASCADE,
+    track_id CHAR(36) REFERENCES track(id) ON DELETE CASCADE,
+    terms TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS index_search_index_folder_id_fk ON search_index(folder_id);
+CREATE INDEX IF NOT EXISTS index_search_index_artist_id_fk ON search_index(artist_id);
+CREATE INDEX IF NOT EXISTS index_search_index_album_id_fk ON search_index(album_id);
+CREATE INDEX IF NOT EXISTS index_search_index_track_id_fk ON search_index(track_id);
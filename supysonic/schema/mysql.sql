@@ -7,6 +7,7 @@ CREATE TABLE IF NOT EXISTS folder (
     created DATETIME NOT NULL,
     cover_art VARCHAR(256),
     last_scan INTEGER NOT NULL,
+    scan_signature VARCHAR(40),
     parent_id INTEGER REFERENCES folder(id)
 ) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 CREATE INDEX index_folder_parent_id_fk ON folder(parent_id);
@@ -44,6 +45,8 @@ CREATE TABLE IF NOT EXISTS track (
     path_hash BINARY(20) UNIQUE NOT NULL,
     created DATETIME NOT NULL,
     last_modification INTEGER NOT NULL,
+    size BIGINT,
+    mtime_ns BIGINT,
     play_count INTEGER NOT NULL,
     play_count_web INTEGER NOT NULL,
     last_play DATETIME,
@@ -334,3 +337,69 @@ CREATE TABLE IF NOT EXISTS radio_station (
     homepage_url VARCHAR(256),
     created DATETIME NOT NULL
 ) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS scan_checkpoint (
+    name VARCHAR(32) PRIMARY KEY,
+    forced BOOLEAN NOT NULL,
+    current_root VARCHAR(256),
+    queue_json TEXT NOT NULL,
+    cursor_json TEXT NOT NULL,
+    root_scanned INTEGER NOT NULL,
+    scanned INTEGER NOT NULL,
+    stages_json TEXT NOT NULL,
+    dirty_json TEXT NOT NULL,
+    updated DATETIME NOT NULL
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS cover_candidate (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,
+    folder_id INTEGER NOT NULL,
+    name VARCHAR(256) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    valid BOOLEAN NOT NULL,
+    score INTEGER NOT NULL,
+    FOREIGN KEY (folder_id) REFERENCES folder(id) ON DELETE CASCADE,
+    UNIQUE KEY index_cover_candidate_folder_name (folder_id, name)
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS track_hash (
+    track_id CHAR(32) PRIMARY KEY,
+    algorithm VARCHAR(16) NOT NULL,
+    digest VARCHAR(64) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    updated DATETIME NOT NULL,
+    FOREIGN KEY (track_id) REFERENCES track(id) ON DELETE CASCADE
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS album_stats (
+    album_id CHAR(32) PRIMARY KEY,
+    song_count INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    created DATETIME NOT NULL,
+    min_year INTEGER,
+    genres TEXT,
+    cover_art VARCHAR(36),
+    FOREIGN KEY (album_id) REFERENCES album(id) ON DELETE CASCADE
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS artist_stats (
+    artist_id CHAR(32) PRIMARY KEY,
+    album_count INTEGER NOT NULL,
+    FOREIGN KEY (artist_id) REFERENCES artist(id) ON DELETE CASCADE
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS search_index (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,
+    folder_id INTEGER,
+    artist_id CHAR(32),
+    album_id CHAR(32),
+    track_id CHAR(32),
+    terms TEXT NOT NULL,
+    FOREIGN KEY (folder_id) REFERENCES folder(id) ON DELETE CASCADE,
+    FOREIGN KEY (artist_id) REFERENCES artist(id) ON DELETE CASCADE,
+    FOREIGN KEY (album_id) REFERENCES album(id) ON DELETE CASCADE,
+    FOREIGN KEY (track_id) REFERENCES track(id) ON DELETE CASCADE,
+    FULLTEXT KEY index_search_index_terms (terms)
+) DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
@@ -7,6 +7,7 @@ CREATE TABLE IF NOT EXISTS folder (
     created TIMESTAMP NOT NULL,
     cover_art VARCHAR(256),
     last_scan INTEGER NOT NULL,
+    scan_signature VARCHAR(40),
     parent_id INTEGER REFERENCES folder
 );
 CREATE INDEX IF NOT EXISTS index_folder_parent_id_fk ON folder(parent_id);
@@ -45,6 +46,8 @@ CREATE TABLE IF NOT EXISTS track (
     path_hash BYTEA UNIQUE NOT NULL,
     created TIMESTAMP NOT NULL,
     last_modification INTEGER NOT NULL,
+    size BIGINT,
+    mtime_ns BIGINT,
     play_count INTEGER NOT NULL,
     play_count_web INTEGER NOT NULL,
     last_play TIMESTAMP,
@@ -324,3 +327,66 @@ CREATE TABLE IF NOT EXISTS radio_station (
     homepage_url VARCHAR(256),
     created TIMESTAMP NOT NULL
 );
+
+CREATE TABLE IF NOT EXISTS scan_checkpoint (
+    name VARCHAR(32) PRIMARY KEY,
+    forced BOOLEAN NOT NULL,
+    current_root VARCHAR(256),
+    queue_json TEXT NOT NULL,
+    cursor_json TEXT NOT NULL,
+    root_scanned INTEGER NOT NULL,
+    scanned INTEGER NOT NULL,
+    stages_json TEXT NOT NULL,
+    dirty_json TEXT NOT NULL,
+    updated TIMESTAMP NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cover_candidate (
+    id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    folder_id INTEGER NOT NULL REFERENCES folder(id) ON DELETE CASCADE,
+    name VARCHAR(256) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    valid BOOLEAN NOT NULL,
+    score INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS index_cover_candidate_folder_name ON cover_candidate(folder_id, name);
+
+CREATE TABLE IF NOT EXISTS track_hash (
+    track_id UUID PRIMARY KEY REFERENCES track(id) ON DELETE CASCADE,
+    algorithm VARCHAR(16) NOT NULL,
+    digest VARCHAR(64) NOT NULL,
+    size BIGINT NOT NULL,
+    mtime_ns BIGINT NOT NULL,
+    updated TIMESTAMP NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS album_stats (
+    album_id UUID PRIMARY KEY REFERENCES album(id) ON DELETE CASCADE,
+    song_count INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    created TIMESTAMP NOT NULL,
+    min_year INTEGER,
+    genres TEXT,
+    cover_art VARCHAR(36)
+);
+
+CREATE TABLE IF NOT EXISTS artist_stats (
+    artist_id UUID PRIMARY KEY REFERENCES artist(id) ON DELETE CASCADE,
+    album_count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS search_index (
+    id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    folder_id INTEGER REFERENCES folder(id) ON DELETE CASCADE,
+    artist_id UUID REFERENCES artist(id) ON DELETE CASCADE,
+    album_id UUID REFERENCES album(id) ON DELETE CASCADE,
+    track_id UUID REFERENCES track(id) ON DELETE CASCADE,
+    terms TEXT NOT NULL,
+    document TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', terms)) STORED
+);
+CREATE INDEX IF NOT EXISTS index_search_index_folder_id_fk ON search_index(folder_id);
+CREATE INDEX IF NOT EXISTS index_search_index_artist_id_fk ON search_index(artist_id);
+CREATE INDEX IF NOT EXISTS index_search_index_album_id_fk ON search_index(album_id);
+CREATE INDEX IF NOT EXISTS index_search_index_track_id_fk ON search_index(track_id);
+CREATE INDEX IF NOT EXISTS index_search_index_document ON search_index USING GIN (document);
@@ -18,6 +18,8 @@ from . import covers
 from .db import Folder, Track, open_connection, close_connection
 from .logging_utils import format_log_event
 from .scanner import Scanner
+from .scanner_func.scanner_dirty import getDirtySet
+from .scanner_func.scanner_lookup import clearIdentityCache
 from .scanner_func.scanner_review_tasks import createReviewTasks
 from .nfo.nfo import NfoHandler
 
@@ -338,7 +340,10 @@ class ScannerProcessingQueue(Thread):
         if folder is not None:
             if folder.root:
                 return
+            # The statistics of what these tracks belonged to are refreshed on prune.
+            getDirtySet(scanner).mark_removed(_path_tree_condition(Track.path, folder.path))
             scanner.stats().deleted.tracks += folder.delete_hierarchy()
+            clearIdentityCache(scanner)
             return
 
         for track in list(Track.select().where(_path_tree_condition(Track.path, path))):
@@ -536,7 +541,7 @@ class SupysonicWatcher:
     def first_scanner(self):
         logger.info("Running first scanner")
         scanner = Scanner()
-        scanner.find_lost_information()
+        scanner.find_lost_information(full=True)
         stats = scanner.stats()
         logger.info(
             "Cover scan completed,results: lost artists: %d, lost albums: %d",
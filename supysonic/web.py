@@ -10,17 +10,27 @@
 import logging
 import mimetypes
 
-from flask import Flask
+from flask import Flask, request
 from os import makedirs, path
 from .    import TaskManger 
 from .config import IniConfig
-from .cache import Cache
-from .db import init_database, open_connection, close_connection, Folder
+from .cache import Cache, GenerationCache
+from .db import (
+    init_database,
+    open_connection,
+    close_connection,
+    begin_read_routing,
+    end_read_routing,
+    Folder,
+)
 from .logging_manager import build_web_logging_config, configure_web_logging, register_access_logging
 from .utils import get_secret_key
 from .recommend import create_recommend_playlist
 logger = logging.getLogger(__package__)
 
+# Blueprints whose SELECT queries go to the read-only connections with ``sqlite_read_routing``.
+READ_ROUTED_BLUEPRINTS = ("api", "frontend", "share", "emo")
+
 
 def create_application(config=None):
     global app
@@ -36,7 +46,7 @@ def create_application(config=None):
     register_access_logging(app, logger_name=logger.name)
 
     # Initialize database
-    init_database(app.config["BASE"]["database_uri"])
+    init_database(app.config["BASE"]["database_uri"], app.config["BASE"])
     if not app.testing:
 
         def open_conn():  # Just to discard the return value
@@ -44,6 +54,14 @@ def create_application(config=None):
 
         app.before_request(open_conn)
         app.teardown_request(lambda exc: close_connection())
+    if app.config["BASE"].get("sqlite_read_routing"):
+
+        def route_reads():
+            if request.blueprint in READ_ROUTED_BLUEPRINTS:
+                begin_read_routing()
+
+        app.before_request(route_reads)
+        app.teardown_request(lambda exc: end_read_routing())
 
     # Insert unknown mimetypes
     for k, v in app.config["MIMETYPES"].items():
@@ -58,6 +76,8 @@ def create_application(config=None):
     max_size_transcodes = app.config["WEBAPP"]["transcode_cache_size"] * 1024**2
     app.cache = Cache(path.join(cache_dir, "cache"), max_size_cache)
     app.transcode_cache = Cache(path.join(cache_dir, "transcodes"), max_size_transcodes)
+    # Artist indexes and the like, rebuilt when the library changes
+    app.index_cache = GenerationCache()
 
     # Test for the cache directory
     cache_path = app.config["WEBAPP"]["cache_dir"]
@@ -98,16 +98,12 @@ class ApiLoggingTestCase(unittest.TestCase):
         self.assertIn(f"request_id={request_id}", content)
 
     def test_logs_get_songs_item_errors_to_api_log(self):
-        fake_track = type(
-            "FakeTrack",
-            (),
-            {"as_subsonic_child": lambda self, user, client: {"id": "ok-track"}},
-        )()
+        track = self.createMediaTrack()
 
         def fake_get_entity_by_id(_cls, track_id, param="id"):
             if track_id == "bad-id":
                 raise ValueError("bad track id")
-            return fake_track
+            return track
 
         with patch("supysonic.api.browse.get_entity_by_id", side_effect=fake_get_entity_by_id):
             rv = self.client.post(
@@ -9,7 +9,7 @@ import time
 import unittest
 import uuid
 
-from supysonic.db import Folder, Artist, Album, Track
+from supysonic.db import Folder, Artist, Album, Track, bump_library_generation
 
 from .apitestbase import ApiTestBase
 
@@ -98,6 +98,35 @@ class BrowseTestCase(ApiTestBase):
             self.assertEqual(len(child[i]), 1)
             self.assertEqual(child[i][0].get("name"), letter + "rtist")
 
+    def test_get_indexes_serves_current_rows(self):
+        track = Track.create(
+            disc=1,
+            number=1,
+            title="Loose",
+            duration=2,
+            album=Album.get(name="AAlbum"),
+            artist=Artist.get(name="Artist"),
+            bitrate=320,
+            path="tests/assets/loose",
+            last_modification=0,
+            root_folder=self.root,
+            folder=self.root,
+        )
+        bump_library_generation()
+        rv, child = self._make_request(
+            "getIndexes", {"musicFolderId": str(self.root.id)}, tag="indexes"
+        )
+        self.assertIsNone(self._find(child, "./child").get("coverArt"))
+
+        # Cover art, like play counts, changes without a new library generation
+        track.has_art = True
+        track.save()
+        rv, child = self._make_request(
+            "getIndexes", {"musicFolderId": str(self.root.id)}, tag="indexes"
+        )
+        self.assertEqual(self._find(child, "./child").get("id"), str(track.id))
+        self.assertEqual(self._find(child, "./child").get("coverArt"), str(track.id))
+
     def test_get_music_directory(self):
         self._make_request("getMusicDirectory", error=10)
         self._make_request("getMusicDirectory", {"id": "id"}, error=0)
@@ -149,6 +178,22 @@ class BrowseTestCase(ApiTestBase):
         )
         self.assertEqual(len(child), 3)
 
+    def test_get_artists_cached_until_library_changes(self):
+        _, child = self._make_request("getArtists", tag="artists")
+        self.assertEqual(child[0][0].get("albumCount"), "2")
+
+        artist = Artist.create(name="Dartist")
+        Album.create(name="Another album", artist=Artist.get(name="Artist"))
+        _, child = self._make_request("getArtists", tag="artists")
+        self.assertEqual(len(child), 3)
+        self.assertEqual(child[0][0].get("albumCount"), "2")
+
+        bump_library_generation()
+        _, child = self._make_request("getArtists", tag="artists")
+        self.assertEqual(len(child), 4)
+        self.assertEqual(child[0][0].get("albumCount"), "3")
+        self.assertEqual(child[3][0].get("id"), str(artist.id))
+
     def test_get_artist(self):
         # dataset should be improved to have tracks by a different artist than the album's artist
         self._make_request("getArtist", error=10)
@@ -26,6 +26,9 @@ class ScanTestCase(ApiTestBase):
         self._make_request("startScan", error=0)
         self._make_request("getScanStatus", error=0)
 
+    def test_startScan_invalid_path(self):
+        self._make_request("startScan", {"path": "/nonexistent/path"}, error=0)
+
 
 class ScanWithDaemonTestCase(ApiTestBase):
     def setUp(self):
@@ -10,7 +10,7 @@ import unittest
 
 from unittest.mock import patch
 
-from supysonic.db import Folder, Artist, Album, Track
+from supysonic.db import Folder, Artist, Album, SearchIndex, Track
 
 from .apitestbase import ApiTestBase
 
@@ -62,6 +62,7 @@ class SearchTestCase(ApiTestBase):
         self.assertEqual(Artist.select().count(), 3)
         self.assertEqual(Album.select().count(), 6)
         self.assertEqual(Track.select().count(), 18)
+        SearchIndex.fill()
 
     def __track_as_pseudo_unique_str(self, elem):
         return elem.get("artist") + elem.get("album") + elem.get("title")
@@ -220,11 +221,14 @@ class SearchTestCase(ApiTestBase):
         self.assertEqual(len(self._xpath(child, "./song")), 0)
         self.assertEqual(child[0].get("name"), "Artist")
 
+        rv, child = self._make_request("search2", {"query": "art"}, tag="searchResult2")
+        self.assertEqual(len(child), 1)
+        self.assertEqual(len(self._xpath(child, "./artist")), 1)
+        self.assertEqual(child[0].get("name"), "Artist")
+
+        # words are matched from their start
         rv, child = self._make_request("search2", {"query": "rti"}, tag="searchResult2")
-        self.assertEqual(len(child), 3)
-        self.assertEqual(len(self._xpath(child, "./artist")), 3)
-        self.assertEqual(len(self._xpath(child, "./album")), 0)
-        self.assertEqual(len(self._xpath(child, "./song")), 0)
+        self.assertEqual(len(child), 0)
 
         # album search
         rv, child = self._make_request(
@@ -237,10 +241,10 @@ class SearchTestCase(ApiTestBase):
         self.assertEqual(child[0].get("title"), "AAlbum")
         self.assertEqual(child[0].get("artist"), "Artist")
 
-        rv, child = self._make_request("search2", {"query": "lbu"}, tag="searchResult2")
-        self.assertEqual(len(child), 6)
+        rv, child = self._make_request("search2", {"query": "aal"}, tag="searchResult2")
+        self.assertEqual(len(child), 1)
         self.assertEqual(len(self._xpath(child, "./artist")), 0)
-        self.assertEqual(len(self._xpath(child, "./album")), 6)
+        self.assertEqual(len(self._xpath(child, "./album")), 1)
         self.assertEqual(len(self._xpath(child, "./song")), 0)
 
         # song search
@@ -252,38 +256,38 @@ class SearchTestCase(ApiTestBase):
         for i in range(6):
             self.assertEqual(child[i].get("title"), "One")
 
-        rv, child = self._make_request("search2", {"query": "e"}, tag="searchResult2")
+        rv, child = self._make_request("search2", {"query": "t"}, tag="searchResult2")
         self.assertEqual(len(child), 12)
         self.assertEqual(len(self._xpath(child, "./artist")), 0)
         self.assertEqual(len(self._xpath(child, "./album")), 0)
         self.assertEqual(len(self._xpath(child, "./song")), 12)
 
         # any field search
-        rv, child = self._make_request("search2", {"query": "r"}, tag="searchResult2")
-        self.assertEqual(len(child), 9)
-        self.assertEqual(len(self._xpath(child, "./artist")), 3)
-        self.assertEqual(len(self._xpath(child, "./album")), 0)
-        self.assertEqual(len(self._xpath(child, "./song")), 6)
+        rv, child = self._make_request("search2", {"query": "a"}, tag="searchResult2")
+        self.assertEqual(len(child), 3)
+        self.assertEqual(len(self._xpath(child, "./artist")), 1)
+        self.assertEqual(len(self._xpath(child, "./album")), 2)
+        self.assertEqual(len(self._xpath(child, "./song")), 0)
 
         # paging
-        artists = []
-        for offset in range(0, 4, 2):
+        albums = []
+        for offset in range(0, 2):
             rv, child = self._make_request(
                 "search2",
-                {"query": "r", "artistCount": 2, "artistOffset": offset},
+                {"query": "a", "albumCount": 1, "albumOffset": offset},
                 tag="searchResult2",
             )
-            names = self._xpath(child, "./artist/@name")
-            self.assertLessEqual(len(names), 2)
+            names = self._xpath(child, "./album/@title")
+            self.assertEqual(len(names), 1)
             for name in names:
-                self.assertNotIn(name, artists)
-                artists.append(name)
+                self.assertNotIn(name, albums)
+                albums.append(name)
 
         songs = []
-        for offset in range(0, 6, 2):
+        for offset in range(0, 12, 2):
             rv, child = self._make_request(
                 "search2",
-                {"query": "r", "songCount": 2, "songOffset": offset},
+                {"query": "t", "songCount": 2, "songOffset": offset},
                 tag="searchResult2",
             )
             elems = self._xpath(child, "./song")
@@ -339,11 +343,14 @@ class SearchTestCase(ApiTestBase):
         self.assertEqual(len(self._xpath(child, "./song")), 0)
         self.assertEqual(child[0].get("name"), "Artist")
 
+        rv, child = self._make_request("search3", {"query": "art"}, tag="searchResult3")
+        self.assertEqual(len(child), 1)
+        self.assertEqual(len(self._xpath(child, "./artist")), 1)
+        self.assertEqual(child[0].get("name"), "Artist")
+
+        # words are matched from their start
         rv, child = self._make_request("search3", {"query": "rti"}, tag="searchResult3")
-        self.assertEqual(len(child), 3)
-        self.assertEqual(len(self._xpath(child, "./artist")), 3)
-        self.assertEqual(len(self._xpath(child, "./album")), 0)
-        self.assertEqual(len(self._xpath(child, "./song")), 0)
+        self.assertEqual(len(child), 0)
 
         # album search
         rv, child = self._make_request(
@@ -356,10 +363,10 @@ class SearchTestCase(ApiTestBase):
         self.assertEqual(child[0].get("name"), "AAlbum")
         self.assertEqual(child[0].get("artist"), "Artist")
 
-        rv, child = self._make_request("search3", {"query": "lbu"}, tag="searchResult3")
-        self.assertEqual(len(child), 6)
+        rv, child = self._make_request("search3", {"query": "aal"}, tag="searchResult3")
+        self.assertEqual(len(child), 1)
         self.assertEqual(len(self._xpath(child, "./artist")), 0)
-        self.assertEqual(len(self._xpath(child, "./album")), 6)
+        self.assertEqual(len(self._xpath(child, "./album")), 1)
         self.assertEqual(len(self._xpath(child, "./song")), 0)
 
         # song search
@@ -371,38 +378,38 @@ class SearchTestCase(ApiTestBase):
         for i in range(6):
             self.assertEqual(child[i].get("title"), "One")
 
-        rv, child = self._make_request("search3", {"query": "e"}, tag="searchResult3")
+        rv, child = self._make_request("search3", {"query": "t"}, tag="searchResult3")
         self.assertEqual(len(child), 12)
         self.assertEqual(len(self._xpath(child, "./artist")), 0)
         self.assertEqual(len(self._xpath(child, "./album")), 0)
         self.assertEqual(len(self._xpath(child, "./song")), 12)
 
         # any field search
-        rv, child = self._make_request("search3", {"query": "r"}, tag="searchResult3")
-        self.assertEqual(len(child), 9)
-        self.assertEqual(len(self._xpath(child, "./artist")), 3)
-        self.assertEqual(len(self._xpath(child, "./album")), 0)
-        self.assertEqual(len(self._xpath(child, "./song")), 6)
+        rv, child = self._make_request("search3", {"query": "a"}, tag="searchResult3")
+        self.assertEqual(len(child), 3)
+        self.assertEqual(len(self._xpath(child, "./artist")), 1)
+        self.assertEqual(len(self._xpath(child, "./album")), 2)
+        self.assertEqual(len(self._xpath(child, "./song")), 0)
 
         # paging
-        artists = []
-        for offset in range(0, 4, 2):
+        albums = []
+        for offset in range(0, 2):
             rv, child = self._make_request(
                 "search3",
-                {"query": "r", "artistCount": 2, "artistOffset": offset},
+                {"query": "a", "albumCount": 1, "albumOffset": offset},
                 tag="searchResult3",
             )
-            names = self._xpath(child, "./artist/@name")
-            self.assertLessEqual(len(names), 2)
+            names = self._xpath(child, "./album/@name")
+            self.assertEqual(len(names), 1)
             for name in names:
-                self.assertNotIn(name, artists)
-                artists.append(name)
+                self.assertNotIn(name, albums)
+                albums.append(name)
 
         songs = []
-        for offset in range(0, 6, 2):
+        for offset in range(0, 12, 2):
             rv, child = self._make_request(
                 "search3",
-                {"query": "r", "songCount": 2, "songOffset": offset},
+                {"query": "t", "songCount": 2, "songOffset": offset},
                 tag="searchResult3",
             )
             elems = self._xpath(child, "./song")
@@ -422,6 +429,43 @@ class SearchTestCase(ApiTestBase):
         )
         self.assertEqual(len(self._xpath(child, "./song")), 0)
 
+    def test_search3_full_text(self):
+        for name in ("Beyoncé", "周杰伦", "Sea", "Beyond the Sea"):
+            Artist.create(name=name)
+        SearchIndex.fill()
+
+        # accents and case are ignored
+        for query in ("beyonce", "BEYONCÉ", "Beyon"):
+            _, child = self._make_request(
+                "search3", {"query": query}, tag="searchResult3"
+            )
+            self.assertEqual(self._xpath(child, "./artist/@name")[0], "Beyoncé")
+
+        # any part of a CJK name
+        for query in ("周杰伦", "杰伦", "伦"):
+            _, child = self._make_request(
+                "search3", {"query": query}, tag="searchResult3"
+            )
+            self.assertEqual(self._xpath(child, "./artist/@name"), ["周杰伦"])
+
+        # every word must match, closest matches first
+        _, child = self._make_request(
+            "search3", {"query": "sea bey"}, tag="searchResult3"
+        )
+        self.assertEqual(self._xpath(child, "./artist/@name"), ["Beyond the Sea"])
+
+        _, child = self._make_request(
+            "search3", {"query": "sea"}, tag="searchResult3"
+        )
+        self.assertEqual(self._xpath(child, "./artist/@name"), ["Sea", "Beyond the Sea"])
+
+        _, child = self._make_request(
+            "search3",
+            {"query": "sea", "artistCount": 1, "artistOffset": 1},
+            tag="searchResult3",
+        )
+        self.assertEqual(self._xpath(child, "./artist/@name"), ["Beyond the Sea"])
+
     def test_search3_does_not_print_debug_output(self):
         with patch("builtins.print") as print_mock:
             _, child = self._make_request(
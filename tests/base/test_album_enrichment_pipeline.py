@@ -5,7 +5,7 @@ import unittest
 from typing import Any, Dict, Set
 from uuid import UUID
 
-from supysonic.db import Album, Artist, Folder, Track
+from supysonic.db import Album, AlbumStats, Artist, Folder, Track, get_library_generation
 from supysonic.scanner_func.scanner_album_enrich import (
     applyAlbumEnrichment,
     collectAlbumsNeedingEnrichment,
@@ -287,6 +287,43 @@ class AlbumEnrichmentPipelineTestCase(TestBase):
         self.assertIn(album.id, self.get_candidate_ids(discogs_enabled=False))
         self.assertIn(album.id, scanner.review_task_enriched_album_ids)
 
+    def test_album_enrichment_pass_refreshes_album_stats(self):
+        album = self.createAlbumFixture()
+        AlbumStats.refresh([album.id])
+        generation = get_library_generation()
+
+        class MusicBrainzClientStub:
+            def search_album(self, artist_name, album_name):
+                return {
+                    "title": album_name,
+                    "artist-credit": [{"artist": {"name": artist_name}}],
+                    "date": "2024-03-15",
+                }
+
+        class DiscogsClientStub:
+            def is_enabled(self):
+                return True
+
+            def search_album(self, artist_name, album_name):
+                return {
+                    "title": "Enrichment Artist - Enrichment Album",
+                    "genres": ["Rock"],
+                }
+
+        scanner = type("ScannerStub", (), {})()
+        with self.assertLogs("supysonic.scanner_func.scanner_album_enrich", level="INFO"):
+            runAlbumEnrichmentPass(
+                scanner,
+                albums=[album],
+                musicbrainz_client=MusicBrainzClientStub(),
+                discogs_client=DiscogsClientStub(),
+            )
+
+        stats = AlbumStats[album.id]
+        self.assertEqual(stats.min_year, 2024)
+        self.assertEqual(stats.genres, "Rock")
+        self.assertNotEqual(get_library_generation(), generation)
+
     def test_album_enrichment_pass_continues_when_discogs_enabled_check_fails(self):
         album = self.createAlbumFixture()
 
@@ -86,6 +86,63 @@ class CLITestCase(unittest.TestCase):
                 self.__invoke("folder scan")
                 self.__invoke("folder scan tmpfolder nonexistent")
 
+    def test_folder_scan_jobs(self):
+        with tempfile.TemporaryDirectory() as d:
+            self.__add_folder("tmpfolder", d)
+            with patch("supysonic.cli.Scanner") as scanner, patch(
+                "supysonic.cli.DaemonClient"
+            ) as daemon_client:
+                daemon_client.return_value.get_scanning_progress.return_value = None
+                scanner.return_value.stats.return_value = SimpleNamespace(
+                    added=SimpleNamespace(artists=0, albums=0, tracks=0),
+                    deleted=SimpleNamespace(artists=0, albums=0, tracks=0),
+                    moved=0,
+                    errors=[],
+                )
+                self.__invoke("folder scan --foreground --jobs 4 tmpfolder")
+                self.__invoke("folder scan --foreground --jobs 0 tmpfolder", True)
+
+            self.assertEqual(scanner.call_args.kwargs["jobs"], 4)
+
+    def test_folder_scan_path(self):
+        with tempfile.TemporaryDirectory() as d:
+            self.__add_folder("tmpfolder", d)
+            os.mkdir(os.path.join(d, "album"))
+            with patch("supysonic.cli.Scanner") as scanner, patch(
+                "supysonic.cli.DaemonClient"
+            ) as daemon_client:
+                daemon_client.return_value.get_scanning_progress.return_value = None
+                scanner.return_value.stats.return_value = SimpleNamespace(
+                    added=SimpleNamespace(artists=0, albums=0, tracks=0),
+                    deleted=SimpleNamespace(artists=0, albums=0, tracks=0),
+                    moved=0,
+                    errors=[],
+                )
+                self.__invoke(f"folder scan --foreground --path {shlex.quote(os.path.join(d, 'album'))}")
+                with tempfile.TemporaryDirectory() as outside:
+                    self.__invoke(f"folder scan --foreground --path {shlex.quote(outside)}", True)
+
+            scanner.return_value.queue_path.assert_called_once_with(os.path.join(d, "album"))
+            scanner.return_value.queue_folder.assert_not_called()
+
+    def test_folder_hash(self):
+        with tempfile.TemporaryDirectory() as d:
+            self.__add_folder("tmpfolder", d)
+            self.__invoke("folder hash --foreground --jobs 1 --algorithm md5")
+            self.__invoke("folder hash --foreground --algorithm sha0", True)
+
+    def test_folder_repair_runs_full_sweep(self):
+        with patch("supysonic.cli.Scanner") as scanner:
+            scanner.return_value.stats.return_value = SimpleNamespace(
+                lost_covers=SimpleNamespace(artists=1, albums=2),
+                lost_year_albums={"Album": "/music/album"},
+            )
+            rv = self.__invoke("folder repair")
+
+        scanner.return_value.find_lost_information.assert_called_once_with(full=True)
+        self.assertIn("Missing covers: 2 albums, 1 artists", rv.output)
+        self.assertIn("Missing years: 1 albums", rv.output)
+
     def test_foreground_scan_initializes_managed_logging(self):
         with tempfile.TemporaryDirectory() as d, tempfile.TemporaryDirectory() as log_dir:
             self.__conf.WEBAPP["log_dir"] = log_dir
@@ -103,6 +160,7 @@ class CLITestCase(unittest.TestCase):
                     "stats": lambda self: SimpleNamespace(
                         added=SimpleNamespace(artists=0, albums=0, tracks=0),
                         deleted=SimpleNamespace(artists=0, albums=0, tracks=0),
+                        moved=0,
                         errors=[],
                     ),
                 },
@@ -143,6 +201,7 @@ class CLITestCase(unittest.TestCase):
                     "stats": lambda self: SimpleNamespace(
                         added=SimpleNamespace(artists=0, albums=0, tracks=0),
                         deleted=SimpleNamespace(artists=0, albums=0, tracks=0),
+                        moved=0,
                         errors=[],
                     ),
                 },
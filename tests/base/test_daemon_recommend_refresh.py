@@ -104,6 +104,59 @@ class DaemonRecommendRefreshTestCase(unittest.TestCase):
         self.assertEqual(second_call.args[2], 120)
         self.assertTrue(second_call.kwargs["enabled"])
 
+    def test_configure_scheduler_registers_library_repair(self):
+        daemon = self.createDaemon(library_repair=True, library_repair_interval=60)
+        scheduler = Mock()
+        daemon._Daemon__scheduler = scheduler
+
+        daemon._Daemon__configure_scheduler()
+
+        repair_call = scheduler.register.call_args_list[2]
+        self.assertEqual(repair_call.args[0], "library-repair")
+        self.assertEqual(repair_call.args[2], 3600)
+        self.assertFalse(repair_call.kwargs["run_immediately"])
+        self.assertTrue(repair_call.kwargs["enabled"])
+
+    def test_configure_scheduler_registers_database_maintenance(self):
+        daemon = self.createDaemon(database_maintenance=True, database_maintenance_interval=10)
+        scheduler = Mock()
+        daemon._Daemon__scheduler = scheduler
+
+        daemon._Daemon__configure_scheduler()
+
+        maintenance_call = scheduler.register.call_args_list[3]
+        self.assertEqual(maintenance_call.args[0], "database-maintenance")
+        self.assertEqual(maintenance_call.args[2], 60)
+        self.assertFalse(maintenance_call.kwargs["run_immediately"])
+        self.assertTrue(maintenance_call.kwargs["enabled"])
+
+    def test_database_maintenance_keeps_the_log_during_scans(self):
+        daemon = self.createDaemon()
+        daemon._Daemon__scanner = Mock(**{"is_alive.return_value": True})
+
+        with patch("supysonic.daemon.server.open_connection", return_value=True), patch(
+            "supysonic.daemon.server.close_connection"
+        ), patch("supysonic.daemon.server.optimize_database", return_value=12) as optimize:
+            self.assertTrue(daemon._Daemon__run_database_maintenance())
+
+        optimize.assert_called_once_with(truncate_wal=False)
+
+    def test_library_repair_runs_full_sweep(self):
+        daemon = self.createDaemon()
+
+        with patch("supysonic.daemon.server.open_connection", return_value=True), patch(
+            "supysonic.daemon.server.close_connection"
+        ), patch("supysonic.daemon.server.Scanner") as scanner, patch(
+            "supysonic.daemon.server.createReviewTasks"
+        ):
+            scanner.return_value.stats.return_value = SimpleNamespace(
+                lost_covers=SimpleNamespace(artists=0, albums=0),
+                lost_year_albums={},
+            )
+            self.assertTrue(daemon._Daemon__run_library_repair())
+
+        scanner.return_value.find_lost_information.assert_called_once_with(full=True)
+
 
 if __name__ == "__main__":
     unittest.main()
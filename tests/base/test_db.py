@@ -5,12 +5,15 @@
 #
 # Distributed under terms of the GNU AGPLv3 license.
 
+import os.path
 import re
+import tempfile
 import unittest
 import uuid
 
 from collections import namedtuple
-from peewee import IntegrityError
+from peewee import IntegrityError, OperationalError
+from playhouse.pool import PooledDatabase
 
 from supysonic import db
 
@@ -220,6 +223,93 @@ class DbTestCase(unittest.TestCase):
         self.assertRegex(album_dict["created"], date_regex)
         self.assertRegex(album_dict["starred"], date_regex)
 
+    def test_album_stats(self):
+        artist = db.Artist.create(name="Test Artist")
+        album = db.Album.create(artist=artist, name="Test Album")
+        root_folder, folder_art, folder_noart = self.create_some_folders()
+        track1 = self.create_track_in(folder_noart, root_folder, artist=artist, album=album)
+        track1.genre, track1.year = "Rock", 2004
+        track1.path = "tests/assets/formats/silence.mp3"
+        track1.save()
+        track2 = self.create_track_in(folder_art, root_folder, artist=artist, album=album, has_art=False)
+        track2.genre, track2.year = "Jazz", 1999
+        track2.path = "tests/assets/formats/silence.ogg"
+        track2.save()
+
+        self.assertEqual(db.AlbumStats.missing(), [album.id])
+        db.AlbumStats.refresh(db.AlbumStats.missing())
+        stats = db.AlbumStats[album.id]
+        self.assertEqual(stats.song_count, 2)
+        self.assertEqual(stats.duration, 10)
+        self.assertEqual(stats.min_year, 1999)
+        self.assertEqual(stats.genres, "Jazz, Rock")
+        self.assertEqual(stats.cover_art, str(folder_art.id))
+        self.assertEqual(album.sort_key(), "1999test album")
+
+        user = self.create_user()
+        other = db.Album.create(artist=artist, name="Other Album")
+        self.create_track_in(folder_noart, root_folder, artist=artist, album=other)
+        albums = db.Album.as_subsonic_albums([other, album], user)
+        self.assertEqual([a["id"] for a in albums], [str(other.id), str(album.id)])
+        self.assertEqual(albums[0]["songCount"], 1)
+        self.assertEqual(albums[1]["coverArt"], str(folder_art.id))
+        self.assertEqual(albums[1]["genre"], "Jazz, Rock")
+
+        db.Track.delete_by_ids([track1.id, track2.id])
+        db.AlbumStats.refresh([album.id])
+        self.assertIsNone(db.AlbumStats.get_or_none(album=album))
+
+    def test_artist_stats(self):
+        artist = db.Artist.create(name="Test Artist")
+        guest = db.Artist.create(name="Guest Artist")
+        album = db.Album.create(artist=artist, name="Test Album")
+        db.Album.create(artist=artist, name="Other Album")
+        db.AlbumArtist.create(album_id=album, artist_id=artist, position=1)
+        db.AlbumArtist.create(album_id=album, artist_id=guest, position=2)
+
+        self.assertCountEqual(db.ArtistStats.missing(), [artist.id, guest.id])
+        db.ArtistStats.refresh([artist.id, guest.id, uuid.uuid4()])
+        self.assertEqual(db.ArtistStats[artist.id].album_count, 2)
+        self.assertEqual(db.ArtistStats[guest.id].album_count, 1)
+        self.assertEqual(db.ArtistStats.select().count(), 2)
+
+        user = self.create_user()
+        db.StarredArtist.create(user=user, starred=guest)
+        lonely = db.Artist.create(name="Lonely Artist")
+        artists = db.Artist.as_subsonic_artists([guest, artist, lonely], user)
+        self.assertEqual([a["albumCount"] for a in artists], [1, 2, 0])
+        self.assertRegex(artists[0]["starred"], date_regex)
+        self.assertNotIn("starred", artists[1])
+
+    def test_search_index(self):
+        self.assertEqual(db.search_terms("Déjà Vu (Live)"), ["deja", "vu", "live"])
+        self.assertEqual(db.search_terms("周杰伦"), ["周杰", "杰伦", "伦"])
+        self.assertEqual(db.search_terms("周杰伦", query=True), ["周杰", "杰伦"])
+
+        track1, track2 = self.create_some_tracks()
+        self.assertCountEqual(db.SearchIndex.missing(db.SearchIndex.track), [track1.id, track2.id])
+        db.SearchIndex.fill()
+        self.assertEqual(db.SearchIndex.missing(db.SearchIndex.track), [])
+        self.assertEqual([t.id for t in db.SearchIndex.search(db.Track, "one")], [track2.id])
+
+        track2.title = "Other"
+        track2.save()
+        db.SearchIndex.refresh(db.SearchIndex.track, [track2.id])
+        self.assertEqual(list(db.SearchIndex.search(db.Track, "one")), [])
+        self.assertIsNone(db.SearchIndex.search(db.Track, "..."))
+
+        # Rows go away with what they index.
+        db.Track.delete_by_ids([track1.id, track2.id])
+        self.assertEqual(db.SearchIndex.select().where(db.SearchIndex.track.is_null(False)).count(), 0)
+
+    def test_library_generation(self):
+        self.assertEqual(db.get_library_generation(), (None, None))
+        db.bump_library_generation()
+        generation = db.get_library_generation()
+        self.assertIsNotNone(generation[0])
+        db.bump_identity_generation()
+        self.assertNotEqual(db.get_library_generation(), generation)
+
     def test_track(self):
         track1, track2 = self.create_some_tracks()
 
@@ -244,6 +334,44 @@ class DbTestCase(unittest.TestCase):
         self.assertEqual(track2_dict["coverArt"], track2_dict["parent"])
         # ... we'll test the rest against the API XSD.
 
+    def test_track_list(self):
+        track1, track2 = self.create_some_tracks()
+        real = db.Artist.create(name="Real artist")
+        track2.artist.real_artist = real
+        track2.artist.save()
+        user = self.create_user()
+        other = self.create_user("Other User")
+        db.StarredTrack.create(user=user, starred=track2)
+        db.RatingTrack.create(user=user, rated=track2, rating=2)
+        db.RatingTrack.create(user=other, rated=track2, rating=5)
+        track1.size = 1234
+        track1.save()
+
+        queries = []
+        execute_sql = db.db.obj.execute_sql
+        db.db.obj.execute_sql = lambda *args, **kwargs: queries.append(args) or execute_sql(
+            *args, **kwargs
+        )
+        try:
+            tracks = db.Track.as_subsonic_children([track1, track2], user, None)
+            count = len(queries)
+            db.Track.as_subsonic_children([track1, track2] * 20, user, None)
+        finally:
+            del db.db.obj.execute_sql
+
+        self.assertEqual(len(queries), count * 2)
+        self.assertEqual([t["id"] for t in tracks], [str(track1.id), str(track2.id)])
+        self.assertEqual(tracks[1]["artist"], "Real artist")
+        self.assertEqual(tracks[1]["path"], "assets/23bytes")
+        self.assertEqual(tracks[0]["size"], 1234)
+        self.assertEqual(tracks[1]["size"], 23)
+        self.assertRegex(tracks[1]["starred"], date_regex)
+        self.assertEqual(tracks[1]["userRating"], 2)
+        self.assertEqual(tracks[1]["averageRating"], 3.5)
+        self.assertNotIn("starred", tracks[0])
+        self.assertNotIn("averageRating", tracks[0])
+        self.assertEqual(db.Track.as_subsonic_children([], user, None), [])
+
     def test_user(self):
         user = self.create_user()
 
@@ -345,6 +473,21 @@ class DbTestCase(unittest.TestCase):
         self.assertEqual(db.StarredFolder.select().count(), 0)
         self.assertEqual(db.RatingFolder.select().count(), 0)
 
+    def test_folder_prune_removes_empty_subtrees(self):
+        root, child, child_noart = self.create_some_folders()
+        nested = db.Folder.create(root=False, name="Nested", path="tests/formats/a", parent=child_noart)
+        deeper = db.Folder.create(root=False, name="Deeper", path="tests/formats/a/b", parent=nested)
+        user = self.create_user()
+        db.StarredFolder.create(user=user, starred=deeper)
+        self.create_track_in(child, root)
+
+        self.assertEqual(db.Folder.prune(), 3)
+        self.assertEqual(
+            {f.id for f in db.Folder.select()}, {root.id, child.id}
+        )
+        self.assertFalse(db.StarredFolder.select().exists())
+        self.assertEqual(db.Folder.prune(), 0)
+
     def test_album_prune_cleans_orphan_annotations_and_relations(self):
         root, child, _ = self.create_some_folders()
         artist = db.Artist.create(name="Kept Artist")
@@ -387,5 +530,154 @@ class DbTestCase(unittest.TestCase):
         self.assertFalse(db.StarredArtist.select().exists())
 
 
+class SqliteProfileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.TemporaryDirectory()
+        self.uri = "sqlite:///" + os.path.join(self.__dir.name, "profile.db")
+
+    def tearDown(self):
+        db.release_database()
+        self.__dir.cleanup()
+
+    def pragma(self, name):
+        return db.db.execute_sql(f"PRAGMA {name}").fetchone()[0]
+
+    def test_performance_profile(self):
+        db.init_database(
+            self.uri, {"sqlite_profile": "performance", "sqlite_busy_timeout": 1000}
+        )
+
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        self.assertEqual(self.pragma("synchronous"), 1)
+        self.assertEqual(self.pragma("foreign_keys"), 1)
+        self.assertEqual(self.pragma("busy_timeout"), 1000)
+        self.assertEqual(db.optimize_database(truncate_wal=True), 0)
+
+    def test_compatible_profile(self):
+        db.init_database(self.uri, {"sqlite_profile": "performance"})
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        db.release_database()
+
+        # The default, WAL mode is only used when asked for
+        db.init_database(self.uri)
+
+        self.assertEqual(self.pragma("journal_mode"), "delete")
+        self.assertEqual(self.pragma("foreign_keys"), 1)
+
+    def test_unknown_profile(self):
+        self.assertRaises(RuntimeError, db.init_database, self.uri, {"sqlite_profile": "fast"})
+        db.init_database("sqlite:")
+
+
+class SearchIndexMigrationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.TemporaryDirectory()
+        self.uri = "sqlite:///" + os.path.join(self.__dir.name, "search.db")
+        db.init_database(self.uri)
+
+    def tearDown(self):
+        db.release_database()
+        self.__dir.cleanup()
+
+    def reopen(self):
+        db.release_database()
+        db.init_database(self.uri)
+
+    def test_index_is_filled_by_the_migration_only(self):
+        folder = db.Folder.create(root=True, name="Root", path="/root")
+        db.Meta.update(value="20261024").where(db.Meta.key == "schema_version").execute()
+
+        self.reopen()
+        self.assertEqual(db.SearchIndex.missing(db.SearchIndex.folder), [])
+        self.assertEqual([f.id for f in db.SearchIndex.search(db.Folder, "root")], [folder.id])
+
+        other = db.Folder.create(root=True, name="Other", path="/other")
+        self.reopen()
+        self.assertEqual(db.SearchIndex.missing(db.SearchIndex.folder), [other.id])
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.TemporaryDirectory()
+        self.uri = "sqlite:///" + os.path.join(self.__dir.name, "pool.db")
+
+    def tearDown(self):
+        db.release_database()
+        self.__dir.cleanup()
+
+    def test_file_database_is_pooled(self):
+        db.init_database(self.uri, {"database_pool": True, "database_max_connections": 4})
+
+        self.assertIsInstance(db.db.obj, PooledDatabase)
+        self.assertEqual(db.db.obj._max_connections, 4)
+        self.assertEqual(db.Folder.select().count(), 0)
+
+    def test_pool_disabled_by_default(self):
+        db.init_database(self.uri)
+
+        self.assertNotIsInstance(db.db.obj, PooledDatabase)
+
+    def test_memory_database_is_not_pooled(self):
+        db.init_database("sqlite:", {"database_pool": True})
+
+        self.assertNotIsInstance(db.db.obj, PooledDatabase)
+
+    def test_connection_context(self):
+        db.init_database(self.uri, {"database_pool": True})
+        db.close_connection()
+
+        with db.connection_context():
+            self.assertFalse(db.db.is_closed())
+        self.assertTrue(db.db.is_closed())
+
+        db.open_connection()
+        with db.connection_context():
+            pass
+        self.assertFalse(db.db.is_closed())
+
+
+class ReadRoutingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.TemporaryDirectory()
+        db.init_database(
+            "sqlite:///" + os.path.join(self.__dir.name, "routing.db"),
+            {"sqlite_read_routing": True},
+        )
+        self.reader = db.db.obj.reader
+
+    def tearDown(self):
+        db.end_read_routing()
+        db.release_database()
+        self.__dir.cleanup()
+
+    def test_reads_are_routed(self):
+        db.Folder.create(root=True, name="Root", path="/root")
+        self.assertTrue(self.reader.is_closed())
+
+        db.begin_read_routing()
+        self.assertEqual(db.Folder.select().count(), 1)
+        self.assertFalse(self.reader.is_closed())
+        self.assertRaises(OperationalError, self.reader.execute_sql, "DELETE FROM folder")
+
+        db.Folder.create(root=True, name="Other", path="/other")
+        self.assertEqual(db.Folder.select().count(), 2)
+
+        db.end_read_routing()
+        self.assertTrue(self.reader.is_closed())
+
+    def test_transaction_reads_stay_on_writer(self):
+        db.begin_read_routing()
+        with db.db.atomic():
+            db.Folder.create(root=True, name="Root", path="/root")
+            self.assertEqual(db.Folder.select().count(), 1)
+        self.assertTrue(self.reader.is_closed())
+
+    def test_memory_database_is_not_routed(self):
+        db.release_database()
+        db.init_database("sqlite:", {"sqlite_read_routing": True})
+
+        self.assertIsNone(getattr(db.db.obj, "reader", None))
+
+
 if __name__ == "__main__":
     unittest.main()
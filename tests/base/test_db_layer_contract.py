@@ -41,12 +41,15 @@ class DbLayerContractTestCase(unittest.TestCase):
             "Image",
             "Folder",
             "Artist",
+            "ArtistStats",
             "Album",
             "ReviewTask",
             "AlbumReviewTask",
             "AlbumArtist",
+            "AlbumStats",
             "Track",
             "TrackArtist",
+            "SearchIndex",
             "User",
             "User_Play_Activity",
             "UserRecommendationFeedback",
@@ -71,6 +74,7 @@ class DbLayerContractTestCase(unittest.TestCase):
             "release_database",
             "open_connection",
             "close_connection",
+            "connection_context",
         ]
 
         for name in expected_names:
@@ -115,10 +119,14 @@ class DbLayerContractTestCase(unittest.TestCase):
         for name in (
             "serialize_folder_child",
             "serialize_folder_artist",
+            "serialize_folder_artists",
             "serialize_folder_directory",
             "serialize_artist",
+            "serialize_artists",
             "serialize_album",
+            "serialize_albums",
             "serialize_track_child",
+            "serialize_tracks",
             "serialize_user",
             "serialize_chat_message",
             "serialize_playlist",
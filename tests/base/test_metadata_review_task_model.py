@@ -127,18 +127,17 @@ class MetadataReviewTaskModelTestCase(unittest.TestCase):
     def test_missing_year_bootstrap_opens_and_closes_database_connection(self):
         from supysonic.scanner_func.scanner_review_tasks import runMissingYearAlbumReviewBootstrap
 
-        with patch("supysonic.scanner_func.scanner_review_tasks.open_connection") as open_connection, patch(
-            "supysonic.scanner_func.scanner_review_tasks.close_connection"
-        ) as close_connection, patch(
+        with patch("supysonic.scanner_func.scanner_review_tasks.connection_context") as connection_context, patch(
             "supysonic.scanner_func.scanner_review_tasks.createMissingYearAlbumReviewTasks",
             return_value=3,
         ) as create_missing_year:
             created_count = runMissingYearAlbumReviewBootstrap()
 
         self.assertEqual(created_count, 3)
-        open_connection.assert_called_once_with(reuse=True)
+        connection_context.assert_called_once_with()
+        connection_context.return_value.__enter__.assert_called_once_with()
         create_missing_year.assert_called_once_with()
-        close_connection.assert_called_once_with()
+        connection_context.return_value.__exit__.assert_called_once()
 
     def test_pending_review_task_uniqueness_is_enforced_by_database(self):
         artist = db.Artist.create(name="Unique Pending Artist")
@@ -5,6 +5,7 @@
 #
 # Distributed under terms of the GNU AGPLv3 license.
 
+import json
 import mutagen
 import os
 import os.path
@@ -13,10 +14,13 @@ import tempfile
 import unittest
 
 from contextlib import contextmanager
+from unittest.mock import patch
 
 from supysonic import db
 from supysonic.managers.folder import FolderManager
 from supysonic.scanner import Scanner
+from supysonic.scanner_func.scanner_checkpoint import SCAN_STAGES
+from supysonic.scanner_func.scanner_hash import TrackHasher, hashFile, resolveHashAlgorithm
 
 
 class ScannerTestCase(unittest.TestCase):
@@ -66,6 +70,248 @@ class ScannerTestCase(unittest.TestCase):
         self.__scan(True)
         self.assertEqual(db.Track.select().count(), 1)
 
+    def test_scan_records_stage_timings(self):
+        timings = self.scanner.timings.snapshot()
+
+        for stage in ("tags", "nfo", "db", "covers", "positions", "prune", "repair", "review_tasks"):
+            self.assertIn(stage, timings)
+        self.assertEqual(timings["tags"][1], 1)
+        self.assertIsNotNone(self.scanner.timings.elapsed)
+
+    def test_rescan_unchanged_skips_track_lookup(self):
+        with patch("supysonic.scanner_func.scanner_file.Track.get_or_none") as get_track:
+            self.__scan()
+
+        get_track.assert_not_called()
+        self.assertEqual(db.Track.select().count(), 1)
+
+    def test_rescan_unchanged_directory_skips_files(self):
+        self.assertIsNotNone(db.Folder.get(root=True).scan_signature)
+        with patch.object(Scanner, "scan_file") as scan_file, patch.object(
+            Scanner, "find_cover"
+        ) as find_cover:
+            self.__scan()
+
+        scan_file.assert_not_called()
+        find_cover.assert_not_called()
+        self.assertEqual(self.scanner.stats().scanned, 1)
+        self.assertEqual(db.Track.select().count(), 1)
+
+    def test_rescan_changed_directory_scans_files(self):
+        with self.__temporary_track_copy() as tf:
+            with patch.object(Scanner, "scan_file") as scan_file:
+                self.__scan()
+            scanned = {entry.path for (entry,), _ in scan_file.call_args_list}
+            self.assertIn(tf, scanned)
+
+        with patch.object(Scanner, "scan_file") as scan_file:
+            self.__scan(True)
+        scan_file.assert_called()
+
+    def test_scan_stores_file_size(self):
+        track = db.Track.get()
+        stat = os.stat(track.path)
+        self.assertEqual(track.size, stat.st_size)
+        self.assertEqual(track.mtime_ns, stat.st_mtime_ns)
+
+    def test_rescan_fills_missing_file_size(self):
+        db.Track.update(size=None, mtime_ns=None).execute()
+        db.Folder.update(scan_signature=None).execute()
+        with patch("supysonic.scanner_func.scanner_file.tryLoadTag") as load_tag:
+            self.__scan()
+
+        load_tag.assert_not_called()
+        track = db.Track.get()
+        self.assertEqual(track.size, os.path.getsize(track.path))
+
+    def test_rescan_updates_stale_file_size(self):
+        user = db.User.create(name="user", password="secret", salt="ABC+")
+        with self.__temporary_track_copy() as tf:
+            self.__scan()
+            track = db.Track.get(path=tf)
+            size = track.size
+            with open(tf, "ab") as f:
+                f.write(b"\0" * 16)
+            stat = os.stat(tf)
+            os.utime(tf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+            # Songs report the size of the last scan, they don't stat the file
+            child = db.Track[track.id].as_subsonic_child(user, None)
+            self.assertEqual(child["size"], size)
+
+            self.__scan()
+            track = db.Track[track.id]
+            self.assertEqual(track.size, size + 16)
+            self.assertEqual(track.as_subsonic_child(user, None)["size"], size + 16)
+
+    def test_scan_stores_album_stats(self):
+        track = db.Track.get()
+        stats = db.AlbumStats[track.album_id]
+        self.assertEqual(stats.song_count, 1)
+        self.assertEqual(stats.duration, track.duration)
+        self.assertEqual(stats.min_year, track.year)
+
+        with self.__temporary_track_copy():
+            self.__scan()
+            self.assertEqual(db.AlbumStats[track.album_id].song_count, 2)
+        self.__scan()
+        self.assertEqual(db.AlbumStats[track.album_id].song_count, 1)
+
+    def test_scan_stores_artist_stats(self):
+        artist = db.Album.get().artist
+        self.assertEqual(db.ArtistStats[artist.id].album_count, 1)
+
+        generation = db.get_library_generation()
+        self.assertIsNotNone(generation[0])
+        self.__scan()
+        self.assertEqual(db.get_library_generation(), generation)
+        with self.__temporary_track_copy():
+            self.__scan()
+        self.assertNotEqual(db.get_library_generation(), generation)
+
+    def test_scan_indexes_names(self):
+        track = db.Track.get()
+        self.assertIn(track, db.SearchIndex.search(db.Track, track.title))
+        self.assertIn(track.album, db.SearchIndex.search(db.Album, track.album.name))
+        self.assertIn(track.artist, db.SearchIndex.search(db.Artist, track.artist.name))
+        for field in (db.SearchIndex.folder, db.SearchIndex.artist, db.SearchIndex.album, db.SearchIndex.track):
+            self.assertEqual(db.SearchIndex.missing(field), [])
+
+    def test_rescan_unchanged_skips_repair(self):
+        with patch("supysonic.scanner_func.scanner_enrich.runAlbumEnrichmentPass") as enrich:
+            self.__scan()
+
+        enrich.assert_not_called()
+
+    def test_rescan_repairs_touched_album_only(self):
+        db.Album.create(name="Untouched", artist=db.Artist.get())
+        album = db.Track.get().album
+        with self.__temporary_track_copy(), patch(
+            "supysonic.scanner_func.scanner_enrich.runAlbumEnrichmentPass"
+        ) as enrich:
+            self.__scan()
+
+        self.assertEqual(enrich.call_args.kwargs["album_ids"], [album.id])
+
+    def __checkpoint(self, **values):
+        values.setdefault("stages_json", json.dumps(list(SCAN_STAGES)))
+        db.ScanCheckpoint.create(name="scanner", **values)
+
+    def test_stopped_scan_keeps_checkpoint(self):
+        self.assertEqual(db.ScanCheckpoint.select().count(), 0)
+
+        with patch.object(Scanner, "scan_file", side_effect=lambda entry: self.scanner.stop()):
+            self.__scan(True)
+
+        checkpoint = db.ScanCheckpoint.get()
+        self.assertEqual(checkpoint.current_root, "folder")
+        self.assertEqual(json.loads(checkpoint.stages_json), list(SCAN_STAGES))
+
+    def test_resumed_scan_skips_completed_directories(self):
+        self.__checkpoint(
+            forced=True,
+            current_root="folder",
+            cursor_json=json.dumps([db.Folder[self.folderid].path]),
+            root_scanned=1,
+            scanned=1,
+        )
+
+        with patch.object(Scanner, "scan_file") as scan_file:
+            self.__scan(True)
+
+        scan_file.assert_not_called()
+        self.assertEqual(self.scanner.stats().scanned, 1)
+        self.assertEqual(db.Track.select().count(), 1)
+        self.assertEqual(db.ScanCheckpoint.select().count(), 0)
+
+    def test_checkpoint_of_other_folders_is_discarded(self):
+        album = db.Track.get().album
+        self.__checkpoint(
+            current_root="other",
+            root_scanned=5,
+            scanned=5,
+            dirty_json=json.dumps({"albums": [str(album.id)], "artists": []}),
+        )
+
+        with patch("supysonic.scanner_func.scanner_enrich.runAlbumEnrichmentPass") as enrich:
+            self.__scan()
+
+        self.assertEqual(self.scanner.stats().scanned, 1)
+        self.assertEqual(db.ScanCheckpoint.select().count(), 0)
+        # The changes the interrupted scan committed are still followed up.
+        self.assertEqual(enrich.call_args.kwargs["album_ids"], [album.id])
+
+    def test_requested_resume_queues_checkpoint_folders(self):
+        self.__checkpoint(
+            forced=True,
+            current_root="folder",
+            cursor_json=json.dumps([db.Folder[self.folderid].path]),
+            root_scanned=1,
+            scanned=1,
+        )
+
+        scanner = Scanner(force=True, resume=True)
+        with patch.object(Scanner, "scan_file") as scan_file:
+            scanner.run()
+
+        scan_file.assert_not_called()
+        self.assertEqual(scanner.stats().scanned, 1)
+        self.assertEqual(db.ScanCheckpoint.select().count(), 0)
+
+    def test_resumed_scan_runs_pending_stages(self):
+        self.__checkpoint(stages_json=json.dumps(["review_tasks"]))
+
+        scanner = Scanner()
+        with patch.object(Scanner, "decideAllPositions") as positions, patch.object(
+            Scanner, "find_lost_information"
+        ) as repair, patch("supysonic.scanner_func.scanner_runtime.createReviewTasks") as review:
+            scanner.run()
+
+        positions.assert_not_called()
+        repair.assert_not_called()
+        review.assert_called_once_with(scanner)
+        self.assertEqual(db.ScanCheckpoint.select().count(), 0)
+
+    def test_parallel_scan(self):
+        with self.__temporary_track_copy() as tf:
+            scanner = Scanner(jobs=2)
+            scanner.queue_folder("folder")
+            scanner.run()
+
+            self.assertEqual(db.Track.select().count(), 2)
+            self.assertEqual(scanner.stats().added.tracks, 1)
+            copy = db.Track.get(path=tf)
+            self.assertEqual(copy.artist.name, "Some artist")
+            self.assertEqual(copy.album.name, "Awesome album")
+            self.assertEqual(copy.title, "[silence]")
+
+    def test_parallel_rescan_corrupt_file(self):
+        with self.__temporary_track_copy() as tf:
+            self.__scan()
+            self.assertEqual(db.Track.select().count(), 2)
+
+            with open(tf, "wb") as f:
+                f.write(b"\x00" * 4096)
+
+            scanner = Scanner(force=True, jobs=2)
+            scanner.queue_folder("folder")
+            scanner.run()
+            self.assertEqual(db.Track.select().count(), 1)
+
+    def test_parallel_scan_survives_worker_failure(self):
+        with self.__temporary_track_copy() as tf:
+            with patch(
+                "supysonic.scanner_func.scanner_workers.readScanTags",
+                side_effect=ValueError("unreadable"),
+            ):
+                scanner = Scanner(jobs=2)
+                scanner.queue_folder("folder")
+                with self.assertLogs("supysonic.scanner_func.scanner_workers", level="ERROR"):
+                    scanner.run()
+
+            self.assertIn(tf, scanner.stats().errors)
+            self.assertEqual(db.Track.select().count(), 1)
+
     def test_scan_file(self):
         self.scanner.scan_file("/some/inexistent/path")
         self.assertEqual(db.Track.select().count(), 1)
@@ -239,6 +485,28 @@ class ScannerDeletionsTestCase(unittest.TestCase):
         shutil.rmtree(self._firstsubdir)
         stats = self._scan()
         self._check_assertions(stats)
+        self.assertEqual(db.StarredFolder.select().count(), 0)
+        self.assertEqual(db.RatingFolder.select().count(), 0)
+        self.assertEqual(db.StarredTrack.select().count(), 0)
+        self.assertEqual(db.RatingTrack.select().count(), 0)
+        self.assertIsNone(db.User.get().last_play)
+
+    def test_unlisted_folder_is_kept(self):
+        trackdir = os.path.dirname(self._trackpath)
+        scandir = os.scandir
+
+        def failing_scandir(path):
+            if path == trackdir:
+                raise PermissionError(path)
+            return scandir(path)
+
+        with patch("supysonic.scanner_func.scanner_folder.os.scandir", failing_scandir):
+            stats = self._scan()
+
+        self.assertEqual(stats.errors, [trackdir])
+        self.assertEqual(stats.deleted.tracks, 0)
+        self.assertEqual(db.Track.select().count(), 1)
+        self.assertEqual(db.Folder.select().count(), 6)
 
     def test_track(self):
         os.remove(self._trackpath)
@@ -246,5 +514,277 @@ class ScannerDeletionsTestCase(unittest.TestCase):
         self._check_assertions(stats)
 
 
+class ScannerCoverIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        db.init_database("sqlite:")
+        FolderManager.add("folder", self.__dir)
+
+        shutil.copyfile("tests/assets/folder/silence.mp3", os.path.join(self.__dir, "silence.mp3"))
+        self._coverpath = os.path.join(self.__dir, "cover.jpg")
+        shutil.copyfile("tests/assets/cover.jpg", self._coverpath)
+        self._scan()
+
+    def tearDown(self):
+        db.release_database()
+        shutil.rmtree(self.__dir)
+
+    def _scan(self):
+        # Forced so the unchanged directory isn't skipped altogether.
+        scanner = Scanner(force=True)
+        scanner.queue_folder("folder")
+        scanner.run()
+
+    def test_cover_is_indexed(self):
+        candidate = db.CoverCandidate.get()
+        self.assertEqual(candidate.name, "cover.jpg")
+        self.assertTrue(candidate.valid)
+        self.assertEqual(db.Folder.get(root=True).cover_art, "cover.jpg")
+
+    def test_unchanged_cover_is_not_reopened(self):
+        with patch("supysonic.scanner_func.scanner_cover_index.is_valid_cover") as is_valid_cover:
+            self._scan()
+
+        is_valid_cover.assert_not_called()
+        self.assertEqual(db.Folder.get(root=True).cover_art, "cover.jpg")
+
+    def test_rewritten_cover_is_revalidated(self):
+        with open(self._coverpath, "wb") as f:
+            f.write(b"\x00" * 64)
+        self._scan()
+
+        self.assertFalse(db.CoverCandidate.get().valid)
+        self.assertIsNone(db.Folder.get(root=True).cover_art)
+
+    def test_removed_cover_is_dropped(self):
+        os.remove(self._coverpath)
+        self._scan()
+
+        self.assertEqual(db.CoverCandidate.select().count(), 0)
+        self.assertIsNone(db.Folder.get(root=True).cover_art)
+
+
+class ScannerSubtreeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        db.init_database("sqlite:")
+        FolderManager.add("folder", self.__dir)
+
+        for name in ("a", "b"):
+            os.mkdir(os.path.join(self.__dir, name))
+            shutil.copyfile(
+                "tests/assets/folder/silence.mp3", os.path.join(self.__dir, name, "silence.mp3")
+            )
+        scanner = Scanner()
+        scanner.queue_folder("folder")
+        scanner.run()
+
+    def tearDown(self):
+        db.release_database()
+        shutil.rmtree(self.__dir)
+
+    def _scan_path(self, path):
+        started = []
+        scanner = Scanner(on_folder_start=started.append)
+        scanner.queue_path(path)
+        scanner.run()
+        return scanner, started
+
+    def test_only_the_subtree_is_scanned(self):
+        os.remove(os.path.join(self.__dir, "b", "silence.mp3"))
+        newdir = os.path.join(self.__dir, "a", "new")
+        os.mkdir(newdir)
+        shutil.copyfile("tests/assets/folder/silence.mp3", os.path.join(newdir, "silence.mp3"))
+        # Not mistaken for the removed copy having moved.
+        os.utime(os.path.join(newdir, "silence.mp3"), (1000000000, 1000000000))
+
+        scanner, started = self._scan_path(os.path.join(self.__dir, "a"))
+
+        self.assertEqual(scanner.stats().scanned, 2)
+        self.assertEqual(scanner.stats().added.tracks, 1)
+        # The file removed outside the subtree is left for a later scan.
+        self.assertEqual(db.Track.select().count(), 3)
+        self.assertEqual([f.path for f in started], [self.__dir])
+
+    def test_deletions_inside_the_subtree(self):
+        os.remove(os.path.join(self.__dir, "a", "silence.mp3"))
+        os.rmdir(os.path.join(self.__dir, "a"))
+        os.mkdir(os.path.join(self.__dir, "a"))
+
+        scanner, _ = self._scan_path(os.path.join(self.__dir, "a"))
+
+        self.assertEqual(scanner.stats().deleted.tracks, 1)
+        self.assertEqual(
+            [t.path for t in db.Track.select()], [os.path.join(self.__dir, "b", "silence.mp3")]
+        )
+
+    def test_path_outside_folders_is_ignored(self):
+        with tempfile.TemporaryDirectory() as d:
+            scanner, started = self._scan_path(d)
+
+        self.assertEqual(scanner.stats().scanned, 0)
+        self.assertEqual(started, [])
+
+
+class TrackHasherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        db.init_database("sqlite:")
+        FolderManager.add("folder", self.__dir)
+
+        self._trackpath = os.path.join(self.__dir, "silence.mp3")
+        shutil.copyfile("tests/assets/folder/silence.mp3", self._trackpath)
+        scanner = Scanner()
+        scanner.queue_folder("folder")
+        scanner.run()
+
+    def tearDown(self):
+        db.release_database()
+        shutil.rmtree(self.__dir)
+
+    def _hash(self, algorithm="md5"):
+        hasher = TrackHasher(jobs=1, algorithm=algorithm)
+        hasher.hash_tracks()
+        return hasher.stats()
+
+    def test_hash(self):
+        stats = self._hash()
+        self.assertEqual((stats.checked, stats.hashed), (1, 1))
+
+        row = db.TrackHash.get()
+        self.assertEqual(row.algorithm, "md5")
+        self.assertEqual(row.digest, hashFile(self._trackpath, "md5")[0])
+        self.assertEqual(row.size, os.path.getsize(self._trackpath))
+
+    def test_unchanged_file_is_not_read(self):
+        self._hash()
+        with patch("supysonic.scanner_func.scanner_hash.hashFile") as hash_file:
+            stats = self._hash()
+
+        hash_file.assert_not_called()
+        self.assertEqual((stats.checked, stats.hashed), (1, 0))
+
+    def test_changed_file_or_algorithm_is_rehashed(self):
+        self._hash()
+        digest = db.TrackHash.get().digest
+        with open(self._trackpath, "ab") as f:
+            f.write(b"\x00" * 16)
+
+        self.assertEqual(self._hash().hashed, 1)
+        self.assertNotEqual(db.TrackHash.get().digest, digest)
+        self.assertEqual(self._hash("blake2b").hashed, 1)
+        self.assertEqual(db.TrackHash.select().count(), 1)
+        self.assertEqual(db.TrackHash.get().algorithm, "blake2b")
+
+    def test_deleted_track_drops_its_hash(self):
+        self._hash()
+        db.Track.delete_by_ids([db.Track.get().id])
+        self.assertEqual(db.TrackHash.select().count(), 0)
+
+    def test_algorithm_resolution(self):
+        self.assertIn(resolveHashAlgorithm("auto"), ("xxh3", "blake3", "blake2b"))
+        self.assertEqual(resolveHashAlgorithm("md5"), "md5")
+        self.assertRaises(ValueError, resolveHashAlgorithm, "sha0")
+        with patch("supysonic.scanner_func.scanner_hash.xxhash", None):
+            self.assertRaises(ValueError, resolveHashAlgorithm, "xxh3")
+
+
+class ScannerMovesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        db.init_database("sqlite:")
+        FolderManager.add("folder", self.__dir)
+
+        self._trackpath = os.path.join(self.__dir, "silence.mp3")
+        shutil.copyfile("tests/assets/folder/silence.mp3", self._trackpath)
+        self._scan()
+
+        self._track = db.Track.get()
+        self._track.play_count = 5
+        self._track.save()
+
+    def tearDown(self):
+        db.release_database()
+        shutil.rmtree(self.__dir)
+
+    def _scan(self):
+        scanner = Scanner()
+        scanner.queue_folder("folder")
+        scanner.run()
+        return scanner.stats()
+
+    def _move(self):
+        dst = os.path.join(self.__dir, "moved", "renamed.mp3")
+        os.mkdir(os.path.dirname(dst))
+        os.rename(self._trackpath, dst)
+        return dst
+
+    def test_moved_file_keeps_its_track(self):
+        dst = self._move()
+        stats = self._scan()
+
+        self.assertEqual(stats.moved, 1)
+        self.assertEqual(stats.deleted.tracks, 0)
+        track = db.Track.get()
+        self.assertEqual(track.id, self._track.id)
+        self.assertEqual(track.path, dst)
+        self.assertEqual(track.folder.path, os.path.dirname(dst))
+        self.assertEqual(track.play_count, 5)
+
+    def test_hashed_file_is_matched_without_reading_tags(self):
+        TrackHasher(jobs=1, algorithm="md5").hash_tracks()
+        self._move()
+        with patch("supysonic.scanner_func.scanner_moves.tryLoadTag") as load_tag:
+            stats = self._scan()
+
+        load_tag.assert_not_called()
+        self.assertEqual(stats.moved, 1)
+        self.assertEqual(db.Track.get().id, self._track.id)
+
+    def test_copied_file_is_a_new_track(self):
+        dst = os.path.join(self.__dir, "copy.mp3")
+        shutil.copy2(self._trackpath, dst)
+        stats = self._scan()
+
+        self.assertEqual(stats.moved, 0)
+        self.assertEqual(db.Track.select().count(), 2)
+        self.assertEqual(db.Track.get(path=self._trackpath).id, self._track.id)
+
+    def test_unmatched_file_is_scanned_from_tags_read_once(self):
+        dst = os.path.join(self.__dir, "other.mp3")
+        shutil.copyfile(self._trackpath, dst)
+        tags = mutagen.File(dst, easy=True)
+        tags["title"] = "Something else"
+        tags.save()
+        # Same size and mtime as the vanished track, different tags.
+        os.utime(dst, (self._track.last_modification, self._track.last_modification))
+        self._track.size = os.path.getsize(dst)
+        self._track.save()
+        os.remove(self._trackpath)
+
+        with patch("supysonic.scanner_func.scanner_file.tryLoadTag") as load_tag:
+            stats = self._scan()
+
+        load_tag.assert_not_called()
+        self.assertEqual(stats.moved, 0)
+        self.assertEqual(db.Track.get().title, "Something else")
+        self.assertNotEqual(db.Track.get().id, self._track.id)
+
+    def test_other_root_tracks_are_not_taken_over(self):
+        other = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, other)
+        FolderManager.add("other", other)
+        dst = os.path.join(other, "silence.mp3")
+        os.rename(self._trackpath, dst)
+
+        scanner = Scanner()
+        scanner.queue_folder("other")
+        scanner.run()
+
+        self.assertEqual(scanner.stats().moved, 0)
+        self.assertEqual(db.Track.get(path=dst).root_folder.name, "other")
+        self.assertEqual(db.Track.get(path=self._trackpath).id, self._track.id)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -7,16 +7,22 @@ import tempfile
 import unittest
 import json
 
+from peewee import IntegrityError
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 from supysonic import db
 from supysonic.scanner_func import scanner_folder
+from supysonic.scanner_func import scanner_nfo
 from supysonic.scanner_func import scanner_runtime
 from supysonic.scanner_func import Stats
+from supysonic.scanner_func.scanner_batch import ScanBatch, batchedFile, openScanBatch
 from supysonic.scanner_func.scanner_file import resolveAlbumContext
-from supysonic.scanner_func.scanner_lookup import findRootFolder
+from supysonic.scanner_func.scanner_lookup import findArtist, findFolder, findRootFolder
+from supysonic.scanner_func.scanner_nfo import NfoCache, readCachedNfo
 from supysonic.scanner_func.scanner_persist import resolveTrackArtists
+from supysonic.scanner_func.scanner_positions import decideAllPositions
+from supysonic.scanner_func.scanner_timing import StageTimings, formatStageTimings, timedClient
 
 
 class ScannerHelpersTestCase(unittest.TestCase):
@@ -74,7 +80,7 @@ class ScannerHelpersTestCase(unittest.TestCase):
             mgfile={},
         )
 
-        with patch("supysonic.scanner_func.scanner_file.readNfo", return_value={}), patch(
+        with patch("supysonic.scanner_func.scanner_file.readCachedNfo", return_value={}), patch(
             "supysonic.scanner_func.scanner_file.recordAlbumArtists",
             return_value=([], "album-row", "artist-row"),
         ):
@@ -83,6 +89,169 @@ class ScannerHelpersTestCase(unittest.TestCase):
         self.assertEqual(artists, ["Some artist"])
         self.assertEqual(context["raw_artists"], ["Some artist"])
 
+    def test_nfo_cache_parses_each_album_nfo_once(self):
+        album_dir = tempfile.mkdtemp()
+        try:
+            nfo_path = os.path.join(album_dir, "album.nfo")
+            with open(nfo_path, "w") as f:
+                f.write("<album><artist>A,B</artist><track><position>1</position></track></album>")
+
+            with patch(
+                "supysonic.scanner_func.scanner_nfo.readNfo",
+                wraps=scanner_nfo.readNfo,
+            ) as read_nfo:
+                first = readCachedNfo(self.scanner, nfo_path)
+                second = readCachedNfo(self.scanner, nfo_path)
+
+                self.assertIs(first, second)
+                self.assertEqual(read_nfo.call_count, 1)
+                self.assertEqual(first["album"]["artist"], ("A", "B"))
+                with self.assertRaises(TypeError):
+                    first["album"]["artist"] = []
+
+                stat = os.stat(nfo_path)
+                os.utime(nfo_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+                readCachedNfo(self.scanner, nfo_path)
+                self.assertEqual(read_nfo.call_count, 2)
+        finally:
+            shutil.rmtree(album_dir)
+
+    def test_nfo_cache_remembers_missing_files_until_discarded(self):
+        album_dir = tempfile.mkdtemp()
+        try:
+            nfo_path = os.path.join(album_dir, "album.nfo")
+            cache = NfoCache()
+
+            self.assertEqual(cache.read(nfo_path), {})
+            with open(nfo_path, "w") as f:
+                f.write("<album><year>2001</year></album>")
+            with patch("supysonic.scanner_func.scanner_nfo.os.stat") as stat:
+                self.assertEqual(cache.read(nfo_path), {})
+            stat.assert_not_called()
+
+            cache.discard(nfo_path)
+            self.assertEqual(cache.read(nfo_path)["album"]["year"], "2001")
+        finally:
+            shutil.rmtree(album_dir)
+
+    def test_scan_batch_rolls_back_only_the_failing_file(self):
+        scanner = SimpleNamespace(
+            stats=lambda: self.stats,
+            scan_batch_files=10,
+            scan_batch_interval=60000,
+        )
+
+        with openScanBatch(scanner) as batch:
+            self.assertIs(scanner.scan_batch, batch)
+            with batchedFile(scanner, "/music/a.flac"):
+                db.Artist.create(name="A")
+                self.stats.added.artists += 1
+            with batchedFile(scanner, "/music/b.flac"):
+                db.Artist.create(name="B")
+                self.stats.added.artists += 1
+                self.stats.deleted.tracks += 1
+                raise IntegrityError("duplicate")
+            with batchedFile(scanner, "/music/c.flac"):
+                db.Artist.create(name="C")
+                self.stats.added.artists += 1
+
+        self.assertIsNone(scanner.scan_batch)
+        self.assertEqual(sorted(a.name for a in db.Artist.select()), ["A", "C"])
+        self.assertEqual(self.stats.errors, ["/music/b.flac"])
+        self.assertEqual(self.stats.added.artists, 2)
+        self.assertEqual(self.stats.deleted.tracks, 0)
+
+    def test_scan_batch_disabled_with_zero_files(self):
+        scanner = SimpleNamespace(stats=lambda: self.stats, scan_batch_files=0)
+        with openScanBatch(scanner) as batch:
+            self.assertIsNone(batch)
+
+        scanner = SimpleNamespace(stats=lambda: self.stats, scan_batch_files=1, scan_batch_interval=60000)
+        with openScanBatch(scanner) as batch:
+            self.assertIsNotNone(batch)
+
+    def test_scan_batch_commits_every_n_files(self):
+        scanner = SimpleNamespace(
+            stats=lambda: self.stats,
+            scan_batch_files=2,
+            scan_batch_interval=60000,
+        )
+
+        with patch.object(ScanBatch, "commit", autospec=True, side_effect=ScanBatch.commit) as commit:
+            with openScanBatch(scanner):
+                for name in "ABCDE":
+                    with batchedFile(scanner, name):
+                        db.Artist.create(name=name)
+
+        self.assertEqual(commit.call_count, 2)
+        self.assertEqual(db.Artist.select().count(), 5)
+
+    def test_stage_timings_take_nested_stages_off_their_parent(self):
+        timings = StageTimings()
+        with patch("supysonic.scanner_func.scanner_timing.time.perf_counter", side_effect=[0.0, 1.0, 4.0, 10.0]):
+            with timings.measure("db"):
+                with timings.measure("nfo"):
+                    pass
+
+        self.assertEqual(timings.snapshot(), {"nfo": (3.0, 1), "db": (7.0, 1)})
+        self.assertEqual(list(timings.snapshot()), ["nfo", "db"])
+        self.assertEqual(formatStageTimings(timings.snapshot()), "nfo:3.000/1,db:7.000/1")
+        self.assertIsNone(formatStageTimings({}))
+
+    def test_timed_client_records_provider_calls(self):
+        client = Mock()
+        client.search_album.return_value = {"id": "release"}
+
+        timed = timedClient(self.scanner, client, "musicbrainz")
+
+        self.assertEqual(timed.search_album("Artist", "Album"), {"id": "release"})
+        client.search_album.assert_called_once_with("Artist", "Album")
+        self.assertEqual(self.stats.timings.snapshot()["provider.musicbrainz"][1], 1)
+        self.assertIsNone(timedClient(self.scanner, None, "discogs"))
+
+    def test_identity_cache_resolves_each_artist_once(self):
+        with patch(
+            "supysonic.scanner_func.scanner_lookup.Artist.get",
+            wraps=db.Artist.get,
+        ) as get_artist:
+            first = findArtist(self.scanner, "Artist")
+            second = findArtist(self.scanner, "Artist")
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(get_artist.call_count, 1)
+        self.assertEqual(self.stats.added.artists, 1)
+
+    def test_identity_cache_is_dropped_when_artists_are_merged(self):
+        alias = findArtist(self.scanner, "Alias")
+        primary = db.Artist.create(name="Primary")
+
+        alias.real_artist = primary
+        alias.save()
+        db.bump_identity_generation()
+        self.scanner.identity_cache.validate(force=True)
+
+        self.assertEqual(findArtist(self.scanner, "Alias").id, primary.id)
+
+    def test_identity_cache_reuses_folders_by_directory(self):
+        root_dir = tempfile.mkdtemp()
+        try:
+            album_dir = os.path.join(root_dir, "artist", "album")
+            os.makedirs(album_dir)
+            db.Folder.create(root=True, name="root", path=root_dir)
+
+            first = findFolder(os.path.join(album_dir, "1.flac"), self.scanner)
+            with patch("supysonic.scanner_func.scanner_lookup.Folder.get") as get_folder:
+                second = findFolder(os.path.join(album_dir, "2.flac"), self.scanner)
+                root = findRootFolder(os.path.join(album_dir, "2.flac"), self.scanner)
+                root_again = findRootFolder(os.path.join(album_dir, "3.flac"), self.scanner)
+
+            get_folder.assert_not_called()
+            self.assertEqual(first.id, second.id)
+            self.assertEqual(first.parent.parent.id, root.id)
+            self.assertIs(root, root_again)
+        finally:
+            shutil.rmtree(root_dir)
+
     def test_find_root_folder_does_not_match_by_partial_prefix(self):
         base_dir = tempfile.mkdtemp()
         try:
@@ -400,6 +569,7 @@ class ScannerHelpersTestCase(unittest.TestCase):
                 self._stats = SimpleNamespace(
                     added=SimpleNamespace(artists=1, albums=2, tracks=3),
                     deleted=SimpleNamespace(artists=4, albums=5, tracks=6),
+                    moved=9,
                     errors=["bad-file.mp3", "bad-folder"],
                     scanned=7,
                     existing_tracks=8,
@@ -452,7 +622,7 @@ class ScannerHelpersTestCase(unittest.TestCase):
             "scanner event=review_tasks_created count=3",
         )
         fake_logger.info.assert_any_call(
-            "scanner event=run_end scanned=7 existing_tracks=8 added_artists=1 added_albums=2 added_tracks=3 deleted_artists=4 deleted_albums=5 deleted_tracks=6 errors=2 result=completed",
+            "scanner event=run_end scanned=7 existing_tracks=8 added_artists=1 added_albums=2 added_tracks=3 deleted_artists=4 deleted_albums=5 deleted_tracks=6 moved_tracks=9 errors=2 result=completed stages=-",
         )
 
     def test_scan_folder_logs_start_and_end(self):
@@ -523,6 +693,45 @@ class ScannerHelpersTestCase(unittest.TestCase):
         finally:
             shutil.rmtree(root_dir)
 
+    def test_decide_all_positions_ranks_artists_by_track_credits(self):
+        root = db.Folder.create(root=True, name="root", path="/music")
+        guest = db.Artist.create(name="Guest")
+        main = db.Artist.create(name="Main")
+        stale = db.Artist.create(name="Stale")
+        album = db.Album.create(name="Album", artist=stale)
+        for artist in (guest, main, stale):
+            db.AlbumArtist.create(album_id=album, artist_id=artist)
+
+        for number, artists in enumerate(([guest, main], [main], [main, guest]), start=1):
+            track = db.Track.create(
+                disc=1,
+                number=number,
+                title=str(number),
+                duration=1,
+                has_art=False,
+                bitrate=128,
+                last_modification=0,
+                path=f"/music/{number}.mp3",
+                root_folder=root,
+                folder=root,
+                album=album,
+                artist=stale,
+            )
+            for artist in artists:
+                db.TrackArtist.create(track_id=track, artist_id=artist)
+
+        decideAllPositions(self.scanner)
+
+        self.assertEqual(db.Album[album.id].artist_id, main.id)
+        self.assertEqual(
+            {(r.artist_id_id, r.position) for r in db.AlbumArtist.select()},
+            {(main.id, 1), (guest.id, 2)},
+        )
+        self.assertEqual(
+            {(r.artist_id_id, r.position) for r in db.TrackArtist.select()},
+            {(main.id, 1), (guest.id, 2)},
+        )
+        self.assertEqual({t.artist_id for t in db.Track.select()}, {main.id})
 
 if __name__ == "__main__":
     unittest.main()
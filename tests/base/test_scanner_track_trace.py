@@ -138,7 +138,7 @@ class ScannerTrackTraceTestCase(unittest.TestCase):
         scanner = SimpleNamespace()
         tag = SimpleNamespace(album="Album", mgfile={"artist": ["Tag Artist"], "albumartist": []})
 
-        with patch("supysonic.scanner_func.scanner_file.readNfo", return_value={}), patch(
+        with patch("supysonic.scanner_func.scanner_file.readCachedNfo", return_value={}), patch(
             "supysonic.scanner_func.scanner_file.recordAlbumArtists",
             return_value=(None, "album-row", None),
         ), patch(
@@ -16,7 +16,7 @@ from hashlib import sha1
 from types import SimpleNamespace
 from unittest.mock import patch
 
-from supysonic.db import Album, AlbumReviewTask, init_database, release_database, Track, Artist, Folder, Image
+from supysonic.db import Album, AlbumReviewTask, ArtistStats, init_database, release_database, Track, Artist, Folder, Image
 from supysonic.managers.folder import FolderManager
 from supysonic.watcher import (
     FLAG_CREATE,
@@ -365,6 +365,25 @@ class AudioWatcherTestCase(WatcherTestCase):
         )
         self.assertTrackCountEqual(0)
 
+    def test_directory_delete_refreshes_artist_album_count(self):
+        first_dir = os.path.join(self._rootdir(), "first")
+        second_dir = os.path.join(self._rootdir(), "second")
+        self._add_file_to_dir(first_dir)
+        path = self._add_file_to_dir(second_dir)
+        tags = mutagen.File(path, easy=True)
+        tags["album"] = "Second album"
+        tags.save()
+        self._queue().put(first_dir, OP_SCAN | FLAG_CREATE | FLAG_DIRECTORY)
+        self._queue().put(second_dir, OP_SCAN | FLAG_CREATE | FLAG_DIRECTORY)
+
+        artist_counts = lambda: [stats.album_count for stats in ArtistStats.select()]
+        self.assertTrue(self._wait_until(lambda: artist_counts() == [2]))
+
+        # Left on disk so that the observer doesn't queue the removal of its files.
+        self._queue().put(second_dir, OP_REMOVE | FLAG_DIRECTORY)
+
+        self.assertTrue(self._wait_until(lambda: Album.select().count() == 1 and artist_counts() == [1]))
+
     def test_directory_rename(self):
         path = self._addfile(depth=1)
         self._sleep()
@@ -4,10 +4,13 @@ import io
 import json
 import shutil
 import tempfile
+import uuid
 from pathlib import Path
 
 from PIL import Image
 
+from supysonic import db
+
 
 modulePath = Path(__file__).resolve().parents[2] / "supysonic" / "frontend" / "metadata_actions.py"
 moduleSpec = importlib.util.spec_from_file_location("metadata_actions", modulePath)
@@ -46,6 +49,7 @@ class DummyRelation(DummyRecord):
 class DummyArtist(DummyRecord):
     def __init__(self, name, realArtist=None):
         super().__init__()
+        self.id = uuid.uuid4()
         self.name = name
         self.real_artist = realArtist
         self.albums = []
@@ -56,6 +60,7 @@ class DummyArtist(DummyRecord):
 
 class MetadataActionsTestCase(unittest.TestCase):
     def setUp(self):
+        db.init_database("sqlite:")
         self.tempDir = tempfile.mkdtemp()
         self.config = {
             "WEBAPP": {"cache_dir": self.tempDir},
@@ -64,6 +69,7 @@ class MetadataActionsTestCase(unittest.TestCase):
 
     def tearDown(self):
         shutil.rmtree(self.tempDir)
+        db.release_database()
 
     def test_assign_primary_artist_migrates_existing_relations(self):
         oldArtist = DummyArtist("Alias")
@@ -76,6 +82,7 @@ class MetadataActionsTestCase(unittest.TestCase):
         oldArtist.tracks = [track]
         oldArtist.artist_albums = [albumRelation]
         oldArtist.artist_tracks = [trackRelation]
+        generation = db.get_identity_generation()
 
         assignPrimaryArtist(oldArtist, primaryArtist)
 
@@ -84,6 +91,7 @@ class MetadataActionsTestCase(unittest.TestCase):
         self.assertIs(albumRelation.artist_id, primaryArtist)
         self.assertIs(trackRelation.artist_id, primaryArtist)
         self.assertIs(oldArtist.real_artist, primaryArtist)
+        self.assertNotEqual(db.get_identity_generation(), generation)
 
     def test_assign_primary_artist_uses_root_primary_artist(self):
         rootArtist = DummyArtist("Root")
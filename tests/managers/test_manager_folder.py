@@ -9,7 +9,9 @@
 from supysonic.db import (
     Folder,
     Album,
+    AlbumStats,
     Artist,
+    ArtistStats,
     RatingFolder,
     RatingTrack,
     StarredAlbum,
@@ -18,6 +20,7 @@ from supysonic.db import (
     StarredTrack,
     Track,
     User,
+    get_library_generation,
     init_database,
     release_database,
 )
@@ -159,6 +162,37 @@ class FolderManagerTestCase(unittest.TestCase):
         # Even if we have only 2 root folders, non-root should never exist and be cleaned anyway
         self.assertEqual(Folder.select().count(), 0)
 
+    def test_delete_folder_refreshes_statistics(self):
+        self.create_folders()
+        music = Folder.get(name="music", root=True)
+        artist = Artist.get(name="Artist")
+        shared = Album.get(name="Album")
+        other = Album.create(name="Other album", artist=artist)
+        for album in (shared, other):
+            Track.create(
+                title="Music track",
+                artist=artist,
+                album=album,
+                disc=1,
+                number=1,
+                path=os.path.join(self.music_dir, album.name),
+                folder=music,
+                root_folder=music,
+                duration=3,
+                bitrate=320,
+                last_modification=0,
+            )
+        AlbumStats.refresh([shared.id, other.id])
+        ArtistStats.refresh([artist.id])
+        generation = get_library_generation()
+
+        FolderManager.delete_by_name("music")
+
+        self.assertEqual(AlbumStats[shared.id].song_count, 1)
+        self.assertIsNone(AlbumStats.get_or_none(AlbumStats.album == other.id))
+        self.assertEqual(ArtistStats[artist.id].album_count, 1)
+        self.assertNotEqual(get_library_generation(), generation)
+
     def test_delete_by_name(self):
         self.create_folders()
 